@@ -1,87 +1,17 @@
 import pandas as pd
-import numpy as np
 import matplotlib.pyplot as plt
 import seaborn as sns
 import os
 from typing import Dict, List
 
+from enviroinfo.cpu import calculate_cpu_usage
+
 work_dir = "./"
 run_location_x86 = "_CPU100\\06-06-202512-59-33"
 #run_location_x86 = "-DISABLED_TURBO_CPU100\\06-06-202516-20-40"
 run_location_risc = "_CPU100\\06-06-202512-59-33"
 #run_location_risc = "_CORE-LIMITED-CPU-4\\03-06-202523-12-41"
 
-def calculate_cpu_usage(renaissance_file, procfs_file, benchmark_name, processor, benchmark_start_index=0):
-    try:
-        # Read Renaissance output CSV
-        ren_df = pd.read_csv(renaissance_file)
-
-        # Filter for the specific benchmark and start index
-        benchmark_data = ren_df[ren_df['benchmark'] == benchmark_name]
-        if benchmark_data.empty:
-            raise ValueError(f"Benchmark '{benchmark_name}' not found in data!")
-
-        # Ensure the start index is valid
-        if benchmark_start_index >= len(benchmark_data):
-            raise ValueError(f"Start index {benchmark_start_index} is too large for benchmark '{benchmark_name}'")
-
-        # Filter from the desired start index
-        benchmark_data = benchmark_data.iloc[benchmark_start_index:]
-
-        # Compute start and end time
-        start_time = benchmark_data.iloc[0]['vm_start_unix_ms'] + benchmark_data.iloc[0]['uptime_ns'] / 1_000_000
-        end_time = benchmark_data.iloc[-1]['vm_start_unix_ms'] + benchmark_data.iloc[-1]['uptime_ns'] / 1_000_000
-
-        # Read procfs results
-        proc_df = pd.read_csv(procfs_file)
-
-        # Filter for /proc/stat entries and time window
-        proc_df = proc_df[
-            (proc_df['SourceFile'].str.match(r'/proc/\d+/stat')) &
-            (proc_df['Timestamp'] >= start_time) &
-            (proc_df['Timestamp'] <= end_time)
-            ]
-
-        # Calculate CPU usage
-        cpu_cores = 8 if processor == 'RISC-V' else 4
-        ticks_per_second = 100
-
-        # Compute differences between consecutive measurements
-        proc_df['userTime_diff'] = proc_df['userTime (Ticks)'].diff()
-        proc_df['systemTime_diff'] = proc_df['systemTime (Ticks)'].diff()
-        proc_df['timestamp_diff'] = proc_df['Timestamp'].diff() / 1000
-
-        # Drop first row (NaN from diff)
-        proc_df = proc_df.dropna()
-
-        # Compute CPU utilization in percent
-        total_cpu_usage = ((proc_df['userTime_diff'] + proc_df['systemTime_diff']) /
-                           (proc_df['timestamp_diff'] * ticks_per_second * cpu_cores)) * 100
-
-        # Add CPU usage values to the DataFrame
-        proc_df['cpu_usage'] = total_cpu_usage
-
-        # Calculate relative seconds since start
-        proc_df['relative_seconds'] = np.floor((proc_df['Timestamp'] - proc_df['Timestamp'].iloc[0]) / 1000)
-
-        # Group values per second
-        cpu_per_second = proc_df.groupby('relative_seconds')['cpu_usage'].agg(list).reset_index()
-
-        return {
-            'benchmark': benchmark_name,
-            'start_index': benchmark_start_index,
-            'average_cpu_usage': total_cpu_usage.mean(),
-            'max_cpu_usage': total_cpu_usage.max(),
-            'min_cpu_usage': total_cpu_usage.min(),
-            'start_time': start_time,
-            'end_time': end_time,
-            'num_measurements': len(proc_df),
-            'cpu_values_per_second': [val for sublist in cpu_per_second['cpu_usage'].tolist() for val in sublist]
-        }
-    except Exception as e:
-        print(f"Error while processing benchmark {benchmark_name}: {str(e)}")
-        return None
-
 def plot_cpu_usage_boxplots_comparison(all_results: List[Dict]):
     """
     Creates boxplots for each benchmark in the style of the visualizeDurationAsBoxplots script.
@@ -0,0 +1,3 @@
+"""
+Helpers shared by the analysis scripts to locate and evaluate the result data in this repository.
+"""
@@ -0,0 +1,218 @@
+"""
+Command line entry point of the analysis package with one subcommand per task.
+
+Usage: python -m enviroinfo [--profile [TRACE]] [--no-cache] {catalog,cpu,duration,power,energy,report,cache,run} [--work-dir ./] [selection] [--output FILE]
+
+The runs are selected with --benchmark, --configuration, --arch, --timestamp and --latest. Only the
+catalog module is imported at start-up, pandas, matplotlib and the evaluation modules are imported by
+the subcommands that need them, so listing runs does not pay for the plotting stack.
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+from enviroinfo import cache, profiling
+from enviroinfo.catalog import ARCHITECTURES, STEADY_STATE_START, discover_runs, select_runs
+
+EXPERIMENT_AUTOMATION_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                                         'experiment_automation')
+RUN_KEYS = ['benchmark', 'configuration', 'timestamp', 'processor']
+
+
+def _selected_runs(args):
+    runs = select_runs(discover_runs(args.work_dir), args.benchmark, args.configuration, args.arch,
+                       args.timestamp, args.latest)
+    if not runs:
+        raise SystemExit("No runs match the selection.")
+    return runs
+
+
+def _output_rows(rows, output):
+    import pandas as pd
+
+    from enviroinfo.metrics import write_table
+
+    df = pd.DataFrame(rows)
+    pd.set_option('display.width', 250)
+    print(df.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    if output:
+        write_table(df, output)
+        print(f"Table was successfully saved: {output}")
+
+
+def catalog(args):
+    runs = _selected_runs(args)
+    widths = [max(len(run[key]) for run in runs) for key in RUN_KEYS]
+    for run in runs:
+        recorded = ' '.join(kind for kind, file in run['files'].items() if file)
+        print('  '.join(run[key].ljust(width) for key, width in zip(RUN_KEYS, widths)) + '  ' + recorded)
+    print(f"{len(runs)} runs")
+
+
+def cpu(args):
+    from enviroinfo.cpu import calculate_cpu_usage
+
+    rows = []
+    for run in _selected_runs(args):
+        if not run['files']['renaissance'] or not run['files']['procfs']:
+            continue
+        result = calculate_cpu_usage(run['files']['renaissance'], run['files']['procfs'], run['benchmark'],
+                                     run['processor'], STEADY_STATE_START.get(run['benchmark'], 0),
+                                     ARCHITECTURES[run['arch']]['cores'])
+        if result:
+            rows.append({**{key: run[key] for key in RUN_KEYS},
+                         **{key: result[key] for key in ('average_cpu_usage', 'min_cpu_usage', 'max_cpu_usage',
+                                                         'num_measurements')}})
+    _output_rows(rows, args.output)
+
+
+def duration(args):
+    from enviroinfo.metrics import steady_state_iterations
+
+    rows = []
+    for run in _selected_runs(args):
+        iterations = steady_state_iterations(run)
+        if iterations is None:
+            continue
+        durations = iterations['duration_s']
+        rows.append({**{key: run[key] for key in RUN_KEYS}, 'iterations': len(durations),
+                     'median_duration_s': durations.median(), 'mean_duration_s': durations.mean(),
+                     'std_duration_s': durations.std(), 'min_duration_s': durations.min(),
+                     'max_duration_s': durations.max()})
+    _output_rows(rows, args.output)
+
+
+def power(args):
+    from enviroinfo.energy import baseline_power
+    from enviroinfo.resample import aligned_run
+
+    if args.baseline:
+        rows = [{'processor': ARCHITECTURES[arch]['processor'], **values}
+                for arch, values in baseline_power(args.work_dir).items()]
+        _output_rows(rows, args.output)
+        return
+    if args.phases:
+        from enviroinfo.energy import phase_energy
+
+        rows = []
+        for run in _selected_runs(args):
+            phases = phase_energy(run)
+            if phases is not None:
+                rows.extend({**{key: run[key] for key in RUN_KEYS}, **phase}
+                            for phase in phases.drop(columns=['wall_start', 'wall_end']).to_dict('records'))
+        if not rows:
+            raise SystemExit("None of the selected runs has a phase timeline.")
+        _output_rows(rows, args.output)
+        return
+    rows = []
+    for run in _selected_runs(args):
+        frame = aligned_run(run)
+        if frame.empty or not frame['steady_state'].any():
+            continue
+        steady = frame[frame['steady_state']]
+        row = {key: run[key] for key in RUN_KEYS}
+        for column in ('shelly_power_w', 'rapl_power_w', 'system_cpu_usage'):
+            row[f'mean_{column}'] = steady[column].mean() if column in steady else float('nan')
+        rows.append(row)
+    _output_rows(rows, args.output)
+
+
+def energy(args):
+    from enviroinfo.energy import baseline_power
+    from enviroinfo.metrics import run_metrics
+    from enviroinfo.powermodel import fit_power_models
+
+    baselines = baseline_power(args.work_dir)
+    models = fit_power_models(args.work_dir, rapl=True) if args.fill_gaps else {}
+    rows = [m for m in (run_metrics(run, baselines, models.get(run['arch'])) for run in _selected_runs(args)) if m]
+    _output_rows(rows, args.output)
+
+
+def report(args):
+    from enviroinfo.report import render_reports
+
+    index = render_reports(args.work_dir, args.output_dir, args.max_points, args.workers)
+    print(f"Reports were successfully saved: {index}")
+    if args.figures:
+        from enviroinfo.figures import render_figures
+
+        for path in render_figures(args.work_dir, args.output_dir, workers=args.workers):
+            print(f"Boxplot was successfully saved as PDF: {path}")
+
+
+def cache_command(args):
+    if args.clear:
+        cache.clear()
+    info = cache.cache_info()
+    print(f"{info['directory']}: {info['entries']} entries, {info['bytes'] / 2 ** 20:.1f} of "
+          f"{info['max_bytes'] / 2 ** 20:.0f} MB{'' if info['enabled'] else ' (disabled)'}")
+
+
+def run(args):
+    arguments = args.arguments[1:] if args.arguments[:1] == ['--'] else args.arguments
+    return subprocess.call([sys.executable, 'benchmarkscript.py'] + arguments, cwd=EXPERIMENT_AUTOMATION_DIR)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(prog='python -m enviroinfo', description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--profile', metavar='TRACE', nargs='?', const='profileTrace.json',
+                        help='record stage timings and memory and write them as Chrome trace JSON')
+    parser.add_argument('--no-cache', action='store_true', help='recompute all derived results')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    selection = argparse.ArgumentParser(add_help=False)
+    selection.add_argument('--work-dir', default='./', help='directory containing the result folders')
+    selection.add_argument('--benchmark', nargs='+', help='benchmark names, e.g. akka-uct')
+    selection.add_argument('--configuration', nargs='+', help='run configurations, e.g. CPU100')
+    selection.add_argument('--arch', nargs='+', choices=list(ARCHITECTURES))
+    selection.add_argument('--timestamp', help='run folder name, e.g. 06-06-202512-59-33')
+    selection.add_argument('--latest', action='store_true',
+                           help='only the latest run per benchmark, configuration and architecture')
+    table = argparse.ArgumentParser(add_help=False)
+    table.add_argument('--output', help='also write the table, .csv, .parquet or .tex')
+
+    subparsers.add_parser('catalog', parents=[selection], help='list the recorded runs').set_defaults(func=catalog)
+    subparsers.add_parser('cpu', parents=[selection, table],
+                          help='steady-state CPU utilization of the benchmark process').set_defaults(func=cpu)
+    subparsers.add_parser('duration', parents=[selection, table],
+                          help='steady-state iteration durations').set_defaults(func=duration)
+    parser_power = subparsers.add_parser('power', parents=[selection, table],
+                                         help='mean steady-state wall and RAPL power')
+    parser_power.add_argument('--baseline', action='store_true', help='power of the baseline measurements instead')
+    parser_power.add_argument('--phases', action='store_true',
+                              help='energy of the worker phases (startup, benchmark, shutdown, ...) instead')
+    parser_power.set_defaults(func=power)
+    parser_energy = subparsers.add_parser('energy', parents=[selection, table], help='energy-efficiency metrics')
+    parser_energy.add_argument('--fill-gaps', action='store_true',
+                               help='estimate the energy of iterations without Shelly data with a power model')
+    parser_energy.set_defaults(func=energy)
+    parser_report = subparsers.add_parser('report', help='HTML reports of all runs')
+    parser_report.add_argument('--work-dir', default='./', help='directory containing the result folders')
+    parser_report.add_argument('--output-dir', default='reports', help='directory for the pages and figures')
+    parser_report.add_argument('--max-points', type=int, default=1000, help='points per series after downsampling')
+    parser_report.add_argument('--workers', type=int, help='parallel processes (default: number of CPUs)')
+    parser_report.add_argument('--figures', action='store_true', help='also render the boxplot figures')
+    parser_report.set_defaults(func=report)
+    parser_cache = subparsers.add_parser('cache', help='size of the derived-results cache')
+    parser_cache.add_argument('--clear', action='store_true', help='remove all entries')
+    parser_cache.set_defaults(func=cache_command)
+    parser_run = subparsers.add_parser('run', help='start a campaign with experiment_automation/benchmarkscript.py')
+    parser_run.add_argument('arguments', nargs=argparse.REMAINDER, help='arguments passed to benchmarkscript.py')
+    parser_run.set_defaults(func=run)
+    return parser.parse_args(argv)
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.no_cache:
+        cache.configure(enabled=False)
+    if args.profile:
+        profiling.enable()
+    with profiling.span(f'enviroinfo {args.command}', category='command'):
+        code = args.func(args) or 0
+    if args.profile:
+        print(profiling.format_summary())
+        profiling.write_trace(args.profile)
+        print(f"Trace was successfully saved as JSON: {args.profile}")
+    sys.exit(code)
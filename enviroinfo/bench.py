@@ -0,0 +1,221 @@
+"""
+Benchmarks the stages of the analysis pipeline on synthetic runs of growing size and tracks them across commits.
+
+Synthetic runs are generated (enviroinfo.synthetic) at every --scales factor of the template run into
+--data-dir, once per scale and reused by later invocations. Every stage (loaders, CPU utilization, streaming,
+aligned frame, run metrics, boxplot statistics, figure rendering) is timed --repeat times with the disk cache
+disabled and the in-process caches cleared, the median wall and CPU time are reported together with the peak
+traced memory (tracemalloc) of one additional call. The results are appended to --results with the git commit,
+so a later invocation shows the change of every stage against the latest results of an earlier commit and
+flags changes beyond --threshold.
+
+Usage: python -m enviroinfo.bench [--work-dir ./] [--scales 1 100 10000] [--stages ...] [--repeat 3]
+                                  [--results benchmarkResults.jsonl] [--threshold 10] [--check]
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+import pandas as pd
+
+from enviroinfo import cache, figures, resample
+from enviroinfo.catalog import ARCHITECTURES, STEADY_STATE_START, discover_runs
+from enviroinfo.cpu import calculate_cpu_usage
+from enviroinfo.energy import baseline_power
+from enviroinfo.loaders import read_procfs, read_rapl, read_renaissance, read_shelly, read_timer
+from enviroinfo.metrics import run_metrics
+from enviroinfo.streaming import stream_cpu_usage
+from enviroinfo.synthetic import DEFAULT_SCALES, DEFAULT_TEMPLATE, generate_dataset
+
+DATA_DIR = '.enviroinfo-bench'
+RESULTS_FILE = 'benchmarkResults.jsonl'
+REPEAT = 3
+THRESHOLD_PERCENT = 10.0
+
+
+def _cpu_usage(dataset):
+    run = dataset['run']
+    return calculate_cpu_usage(run['files']['renaissance'], run['files']['procfs'], run['benchmark'],
+                               run['processor'], STEADY_STATE_START.get(run['benchmark'], 0),
+                               ARCHITECTURES[run['arch']]['cores'])
+
+
+def _stream_cpu_usage(dataset):
+    run = dataset['run']
+    start_s, end_s = read_timer(run['files']['timer'])
+    return stream_cpu_usage(run['files']['procfs'], start_s * 1000, end_s * 1000, ARCHITECTURES[run['arch']]['cores'],
+                            window_s=1)
+
+
+def _boxplot_stats(dataset):
+    return figures.figure_variants(dataset['work_dir'])
+
+
+def _render(dataset):
+    variant = figures.figure_variants(dataset['work_dir'], metrics=('duration',))[0]
+    with tempfile.TemporaryDirectory() as output_dir:
+        return figures.render_figure(variant, output_dir)
+
+
+# Stage name -> function of the dataset (work_dir, the x86 run and the baselines of the scale)
+STAGES = {
+    'loaders.read_renaissance': lambda d: read_renaissance(d['run']['files']['renaissance'], d['run']['benchmark']),
+    'loaders.read_procfs': lambda d: read_procfs(d['run']['files']['procfs']),
+    'loaders.read_shelly': lambda d: read_shelly(d['run']['files']['shelly']),
+    'loaders.read_rapl': lambda d: read_rapl(d['run']['files']['rapl']),
+    'cpu.calculate_cpu_usage': _cpu_usage,
+    'streaming.stream_cpu_usage': _stream_cpu_usage,
+    'resample.aligned_run': lambda d: resample.aligned_run(d['run']),
+    'metrics.run_metrics': lambda d: run_metrics(d['run'], d['baselines']),
+    'figures.boxplot_stats': _boxplot_stats,
+    'figures.render': _render,
+}
+
+
+def _clear_caches():
+    resample._aligned_run.cache_clear()
+    figures._group_stats.cache_clear()
+
+
+def _count_rows(path):
+    with open(path, 'rb') as f:
+        return sum(1 for _ in f)
+
+
+def git_commit():
+    """Short hash of HEAD with a '+' if the package has uncommitted changes, None outside a git checkout."""
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=package_dir, capture_output=True,
+                                text=True, check=True).stdout.strip()
+        changes = subprocess.run(['git', 'status', '--porcelain', '--', '.'], cwd=package_dir, capture_output=True,
+                                 text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return commit + ('+' if changes else '')
+
+
+def prepare_datasets(work_dir='./', data_dir=DATA_DIR, scales=DEFAULT_SCALES, template=DEFAULT_TEMPLATE):
+    """
+    Synthetic runs per scale (generated on first use), as dict scale -> dataset.
+    """
+    datasets = {}
+    for scale in scales:
+        scale_dir = os.path.join(data_dir, f'{scale}x')
+        if not os.path.isdir(scale_dir) or not discover_runs(scale_dir):
+            generate_dataset(work_dir, scale_dir, [scale], *template)
+        runs = [run for run in discover_runs(scale_dir) if run['arch'] == 'X86']
+        run = runs[-1]
+        datasets[scale] = {
+            'work_dir': scale_dir,
+            'run': run,
+            'baselines': baseline_power(work_dir),
+            'rows': sum(_count_rows(file) for file in run['files'].values() if file),
+        }
+    return datasets
+
+
+def measure(stage, dataset, repeat=REPEAT):
+    """
+    Median wall and CPU time of repeat calls of a stage and the peak traced memory of one more call.
+    """
+    cache.configure(enabled=False)
+    walls, cpus = [], []
+    for _ in range(repeat):
+        _clear_caches()
+        wall_start, cpu_start = time.perf_counter(), time.process_time()
+        STAGES[stage](dataset)
+        walls.append(time.perf_counter() - wall_start)
+        cpus.append(time.process_time() - cpu_start)
+    _clear_caches()
+    tracemalloc.start()
+    try:
+        STAGES[stage](dataset)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    return {'wall_ms': round(statistics.median(walls) * 1000, 3), 'wall_min_ms': round(min(walls) * 1000, 3),
+            'cpu_ms': round(statistics.median(cpus) * 1000, 3), 'peak_memory_mb': round(peak / 2 ** 20, 3)}
+
+
+def run_benchmarks(datasets, stages=tuple(STAGES), repeat=REPEAT):
+    """One result per scale and stage, tagged with the commit, code version and host."""
+    tags = {'commit': git_commit(), 'code_version': cache.code_version()[:12], 'host': platform.node(),
+            'python': platform.python_version(), 'date': datetime.now().isoformat(timespec='seconds')}
+    results = []
+    for scale, dataset in datasets.items():
+        for stage in stages:
+            result = {**tags, 'scale': scale, 'stage': stage, 'rows': dataset['rows'], 'repeat': repeat,
+                      **measure(stage, dataset, repeat)}
+            print(f"{stage:<28} {scale:>6}x {result['wall_ms']:>10.1f} ms {result['peak_memory_mb']:>9.1f} MB")
+            results.append(result)
+    return results
+
+
+def read_results(path):
+    if not os.path.exists(path):
+        return []
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+def append_results(results, path):
+    with open(path, 'a') as f:
+        f.writelines(json.dumps(result) + '\n' for result in results)
+
+
+def compare(results, history, threshold=THRESHOLD_PERCENT):
+    """
+    Change of wall time and peak memory of every result against the latest result of the same stage, scale
+    and host recorded for another code version.
+    """
+    rows = []
+    for result in results:
+        previous = [h for h in history if h['stage'] == result['stage'] and h['scale'] == result['scale']
+                    and h['host'] == result['host'] and h['code_version'] != result['code_version']]
+        row = {key: result[key] for key in ('stage', 'scale', 'rows', 'wall_ms', 'cpu_ms', 'peak_memory_mb')}
+        row.update({'previous_commit': None, 'wall_change_pct': float('nan'), 'memory_change_pct': float('nan'),
+                    'flag': ''})
+        if previous:
+            before = previous[-1]
+            row['previous_commit'] = before['commit']
+            row['wall_change_pct'] = (result['wall_ms'] / before['wall_ms'] - 1) * 100 if before['wall_ms'] else 0.0
+            row['memory_change_pct'] = ((result['peak_memory_mb'] / before['peak_memory_mb'] - 1) * 100
+                                        if before['peak_memory_mb'] else 0.0)
+            if row['wall_change_pct'] > threshold or row['memory_change_pct'] > threshold:
+                row['flag'] = 'regression'
+            elif row['wall_change_pct'] < -threshold:
+                row['flag'] = 'faster'
+        rows.append(row)
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--work-dir', default='./', help='directory containing the result folders')
+    parser.add_argument('--data-dir', default=DATA_DIR, help='directory for the synthetic runs')
+    parser.add_argument('--scales', nargs='+', type=int, default=list(DEFAULT_SCALES))
+    parser.add_argument('--stages', nargs='+', choices=list(STAGES), default=list(STAGES))
+    parser.add_argument('--repeat', type=int, default=REPEAT, help='timed calls per stage and scale')
+    parser.add_argument('--results', default=RESULTS_FILE, help='JSON lines file the results are appended to')
+    parser.add_argument('--threshold', type=float, default=THRESHOLD_PERCENT,
+                        help='change of wall time or peak memory in percent that is flagged')
+    parser.add_argument('--check', action='store_true', help='exit with status 1 if a stage regressed')
+    args = parser.parse_args()
+
+    history = read_results(args.results)
+    results = run_benchmarks(prepare_datasets(args.work_dir, args.data_dir, args.scales), args.stages, args.repeat)
+    append_results(results, args.results)
+    comparison = compare(results, history, args.threshold)
+    pd.set_option('display.width', 250)
+    print(comparison.to_string(index=False, float_format=lambda v: f"{v:.1f}"))
+    print(f"Benchmark results were successfully saved: {args.results}")
+    if args.check and (comparison['flag'] == 'regression').any():
+        raise SystemExit(1)
@@ -0,0 +1,141 @@
+"""
+On-disk memoization of derived results (CPU utilization windows, iteration statistics, energy sums, aligned frames).
+
+A result is stored under a key built from the content hash of its input files, the remaining arguments and
+the code version (a hash of the source files of this package, so any change of the analysis code invalidates
+all entries). Entries are pickled into ENVIROINFO_CACHE_DIR (default .enviroinfo-cache in the working
+directory), a hit refreshes the modification time of its file and the least recently used entries are
+removed once the cache exceeds ENVIROINFO_CACHE_SIZE_MB (default 512). Set ENVIROINFO_CACHE=0 or pass
+--no-cache to python -m enviroinfo to disable the cache.
+"""
+import functools
+import glob
+import hashlib
+import inspect
+import os
+import pickle
+import tempfile
+
+DEFAULT_CACHE_DIR = '.enviroinfo-cache'
+DEFAULT_CACHE_SIZE_MB = 512
+_HASH_BLOCK = 1 << 20
+
+_settings = {
+    'enabled': os.environ.get('ENVIROINFO_CACHE', '1') != '0',
+    'directory': os.environ.get('ENVIROINFO_CACHE_DIR', DEFAULT_CACHE_DIR),
+    'max_bytes': int(float(os.environ.get('ENVIROINFO_CACHE_SIZE_MB', DEFAULT_CACHE_SIZE_MB)) * 2 ** 20),
+}
+_file_hashes = {}  # (path, size, mtime) -> content hash, files are only hashed once per process
+_code_version = []
+
+
+def configure(enabled=None, directory=None, max_size_mb=None):
+    if enabled is not None:
+        _settings['enabled'] = enabled
+    if directory is not None:
+        _settings['directory'] = directory
+    if max_size_mb is not None:
+        _settings['max_bytes'] = int(max_size_mb * 2 ** 20)
+
+
+def code_version():
+    """Hash of all source files of the enviroinfo package."""
+    if not _code_version:
+        digest = hashlib.sha256()
+        for source in sorted(glob.glob(os.path.join(os.path.dirname(os.path.abspath(__file__)), '*.py'))):
+            with open(source, 'rb') as f:
+                digest.update(f.read())
+        _code_version.append(digest.hexdigest())
+    return _code_version[0]
+
+
+def file_hash(path):
+    """Content hash of a file, None for missing files."""
+    if path is None or not os.path.exists(path):
+        return None
+    stat = os.stat(path)
+    key = (os.path.realpath(path), stat.st_size, stat.st_mtime_ns)
+    if key not in _file_hashes:
+        digest = hashlib.sha256()
+        with open(path, 'rb') as f:
+            for block in iter(lambda: f.read(_HASH_BLOCK), b''):
+                digest.update(block)
+        _file_hashes[key] = digest.hexdigest()
+    return _file_hashes[key]
+
+
+def _entry_path(key):
+    return os.path.join(_settings['directory'], key[:2], f'{key}.pkl')
+
+
+def _evict():
+    entries = []
+    for path in glob.glob(os.path.join(_settings['directory'], '*', '*.pkl')):
+        try:
+            stat = os.stat(path)
+        except FileNotFoundError:
+            continue
+        entries.append((stat.st_mtime, stat.st_size, path))
+    total = sum(size for _, size, _ in entries)
+    for _, size, path in sorted(entries):
+        if total <= _settings['max_bytes']:
+            break
+        try:
+            os.remove(path)
+        except FileNotFoundError:
+            pass
+        total -= size
+
+
+def disk_cached(input_files):
+    """
+    Decorator memoizing a function on disk.
+
+    :param input_files: Function of the bound arguments (dict name -> value) returning the paths of the
+                        files the result is derived from; their content is part of the key
+    """
+    def decorator(func):
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _settings['enabled']:
+                return func(*args, **kwargs)
+            bound = signature.bind(*args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            files = [file_hash(path) for path in input_files(arguments)]
+            key = hashlib.sha256(repr((func.__module__, func.__qualname__, code_version(), files,
+                                       sorted(arguments.items()))).encode()).hexdigest()
+            path = _entry_path(key)
+            try:
+                with open(path, 'rb') as f:
+                    result = pickle.load(f)
+                os.utime(path)
+                return result
+            except (OSError, EOFError, pickle.UnpicklingError):
+                pass
+
+            result = func(*args, **kwargs)
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            # written to a temporary file first, so parallel workers never read a partial entry
+            handle, temporary = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+            with os.fdopen(handle, 'wb') as f:
+                pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temporary, path)
+            _evict()
+            return result
+        return wrapper
+    return decorator
+
+
+def cache_info():
+    """Number of entries and size in bytes of the cache directory."""
+    sizes = [os.path.getsize(path) for path in glob.glob(os.path.join(_settings['directory'], '*', '*.pkl'))]
+    return {'directory': _settings['directory'], 'entries': len(sizes), 'bytes': sum(sizes),
+            'max_bytes': _settings['max_bytes'], 'enabled': _settings['enabled']}
+
+
+def clear():
+    for path in glob.glob(os.path.join(_settings['directory'], '*', '*.pkl')):
+        os.remove(path)
@@ -0,0 +1,160 @@
+import os
+import re
+from datetime import datetime
+
+# Result directories look like gpl-<benchmark>_<configuration> or gpl-<benchmark>-<CONFIGURATION>
+RUN_DIRECTORY_PATTERN = re.compile(
+    r"^gpl-(?P<benchmark>.+?)(?:_|-(?=[A-Z]))(?P<configuration>[A-Z][A-Z0-9_-]*)$"
+)
+
+# Folder name of the architecture -> processor label used in the figures, file postfix and core count
+ARCHITECTURES = {
+    'X86': {'processor': 'x86', 'postfix': '_x86', 'cores': 4},
+    'RISC': {'processor': 'RISC-V', 'postfix': '_risc', 'cores': 8},
+}
+
+# Number of warm-up iterations per benchmark, the steady-state starts at this index
+STEADY_STATE_START = {
+    'akka-uct': 24,
+    'fj-kmeans': 30,
+    'reactors': 10,
+    'future-genetic': 50,
+    'mnemonics': 16,
+    'par-mnemonics': 16,
+    'rx-scrabble': 80,
+    'scrabble': 50
+}
+
+TIMESTAMP_FORMAT = '%d-%m-%Y%H-%M-%S'
+
+BENCHMARK_ORDER = ['akka-uct', 'fj-kmeans', 'reactors', 'future-genetic', 'mnemonics', 'par-mnemonics',
+                   'rx-scrabble', 'scrabble']
+
+
+def parse_timestamp(timestamp):
+    """
+    Converts the name of a run folder (e.g. 06-06-202512-59-33) to a datetime, None for other names.
+    """
+    try:
+        return datetime.strptime(timestamp, TIMESTAMP_FORMAT)
+    except ValueError:
+        return None
+
+
+def run_files(path, arch):
+    """
+    Returns the paths of the result files of one architecture folder of a run.
+    Files that were not recorded (e.g. RAPL on RISC-V) are None.
+    """
+    postfix = ARCHITECTURES[arch]['postfix']
+    candidates = {
+        'renaissance': f'renaissanceOutput{postfix}.csv',
+        'procfs': f'procfsResults{postfix}',
+        'rapl': f'raplResults{postfix}',
+        'rapl_high_rate': f'raplHighRate{postfix}',
+        'shelly': f'shellyReaderResults{postfix}',
+        'timer': f'timer{postfix}.txt',
+        'timeline': f'timeline{postfix}.json',
+        'telemetry': f'telemetryResults{postfix}',
+        'gclog': f'gcLog{postfix}.log',
+        'jfr': f'jvmEvents{postfix}.jfr',
+        'colocation': f'colocation{postfix}.json',
+        'colocation_procfs': f'colocationProcfs{postfix}',
+        'colocation_pids': f'renaissancePids{postfix}',
+        'cpu_online': f'cpuOnline{postfix}.txt',
+    }
+    files = {}
+    for key, name in candidates.items():
+        file = os.path.join(path, name)
+        files[key] = file if os.path.exists(file) else None
+    return files
+
+
+def read_run_parameters(run_directory):
+    """
+    Returns the content of bm_params_sysinfo.txt (or bm_params.txt for older runs), empty if missing.
+    """
+    for name in ('bm_params_sysinfo.txt', 'bm_params.txt'):
+        file = os.path.join(run_directory, name)
+        if os.path.exists(file):
+            with open(file) as f:
+                return f.read()
+    return ''
+
+
+def discover_runs(work_dir='./', benchmarks=None, configurations=None, archs=None, timestamp=None):
+    """
+    Finds all benchmark runs below work_dir.
+
+    The optional criteria (None or empty matches everything) are checked against the folder names while
+    walking the tree, so folders of other runs are neither listed nor are their parameter files read.
+
+    :param work_dir: Directory containing the gpl-<benchmark>_<configuration> folders
+    :return: One dict per run and architecture, sorted by benchmark, configuration, timestamp and architecture
+    """
+    runs = []
+    for entry in sorted(os.listdir(work_dir)):
+        match = RUN_DIRECTORY_PATTERN.match(entry)
+        if not match or not os.path.isdir(os.path.join(work_dir, entry)):
+            continue
+        if (benchmarks and match['benchmark'] not in benchmarks) or \
+                (configurations and match['configuration'] not in configurations):
+            continue
+        timestamps = [t for t in os.listdir(os.path.join(work_dir, entry))
+                      if parse_timestamp(t) and (not timestamp or t == timestamp)]
+        for timestamp_folder in sorted(timestamps, key=parse_timestamp):
+            run_directory = os.path.join(work_dir, entry, timestamp_folder)
+            if not os.path.isdir(run_directory):
+                continue
+            parameters = None
+            for arch, info in ARCHITECTURES.items():
+                path = os.path.join(run_directory, arch)
+                if (archs and arch not in archs) or not os.path.isdir(path):
+                    continue
+                if parameters is None:
+                    parameters = read_run_parameters(run_directory)
+                runs.append({
+                    'benchmark': match['benchmark'],
+                    'configuration': match['configuration'],
+                    'timestamp': timestamp_folder,
+                    'arch': arch,
+                    'processor': info['processor'],
+                    'path': path,
+                    'parameters': parameters,
+                    'files': run_files(path, arch),
+                })
+    return runs
+
+
+def select_runs(runs, benchmarks=None, configurations=None, archs=None, timestamp=None, latest=False):
+    """
+    Filters runs as returned by discover_runs, None or empty criteria match everything.
+
+    :param latest: Keep only the latest of the matching runs per benchmark, configuration and architecture
+    """
+    selected = [run for run in runs
+                if (not benchmarks or run['benchmark'] in benchmarks)
+                and (not configurations or run['configuration'] in configurations)
+                and (not archs or run['arch'] in archs)
+                and (not timestamp or run['timestamp'] == timestamp)]
+    if latest:
+        newest = {}
+        for run in sorted(selected, key=lambda r: parse_timestamp(r['timestamp'])):
+            newest[(run['benchmark'], run['configuration'], run['arch'])] = run
+        selected = [run for run in selected if newest[(run['benchmark'], run['configuration'], run['arch'])] is run]
+    return selected
+
+
+def find_baseline(work_dir, name):
+    """
+    Returns the architecture folders of the latest run of a baseline measurement
+    (e.g. 'baseline-measurement_shelly-only') as dict arch -> path.
+    """
+    baseline_root = os.path.join(work_dir, name)
+    if not os.path.isdir(baseline_root):
+        return {}
+    timestamps = [t for t in os.listdir(baseline_root) if parse_timestamp(t)]
+    if not timestamps:
+        return {}
+    latest = os.path.join(baseline_root, max(timestamps, key=parse_timestamp))
+    return {arch: os.path.join(latest, arch) for arch in ARCHITECTURES if os.path.isdir(os.path.join(latest, arch))}
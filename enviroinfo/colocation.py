@@ -0,0 +1,224 @@
+"""
+Reports the interference and consolidated throughput of co-located benchmark JVMs (benchmarkscript.py --colocate).
+
+A run of the co-location mode (configuration COLOCATED-<level>_<configuration>) holds one Renaissance output per
+JVM (renaissanceOutput_*-<index>.csv), the ticks of the machine and of every JVM (colocationProcfs_*, the PIDs
+in start order in renaissancePids_*) and the placement of the JVMs (colocation_*.json). A run is evaluated over
+the window in which all of its JVMs are in their steady-state: the iterations completed in it (iterations
+crossing its boundaries count by their share inside), the CPU time of every JVM and the wall (Shelly) and RAPL
+energy. The slowdown of a JVM is its median steady-state iteration duration over the one of its benchmark
+running alone, taken from the runs with level 1 (or the plain runs of the configuration without them). The
+work of a JVM is counted in seconds of solo execution (iterations times the solo median), so the aggregate
+throughput of mixed benchmarks adds up: the weighted speedup is the solo work per second of the window,
+the energy per unit of work the energy per second of solo work.
+
+Usage: python -m enviroinfo.colocation [--work-dir ./] [--output colocation.csv]
+                                       [--instances colocationInstances.csv]
+"""
+import argparse
+import glob
+import json
+import os
+import re
+
+import numpy as np
+import pandas as pd
+
+from enviroinfo.catalog import ARCHITECTURES, STEADY_STATE_START, discover_runs, select_runs
+from enviroinfo.energy import counter_energy, counter_increase, interval_energy, rapl_counter
+from enviroinfo.loaders import read_procfs, read_renaissance, read_shelly, read_timer
+from enviroinfo.streaming import PROCESS_SOURCE, TICKS_PER_SECOND
+
+COLOCATED_CONFIGURATION = re.compile(r'^COLOCATED-(?P<level>\d+)_(?P<configuration>.+)$')
+INSTANCE_FILE = re.compile(r'renaissanceOutput_[a-z0-9]+-(?P<index>\d+)\.csv$')
+RUN_KEYS = ['benchmark', 'configuration', 'level', 'timestamp', 'processor']
+
+
+def colocation_level(run):
+    """Co-location level and configuration of the plain runs it compares with, (None, configuration) for them."""
+    match = COLOCATED_CONFIGURATION.match(run['configuration'])
+    if not match:
+        return None, run['configuration']
+    return int(match['level']), match['configuration']
+
+
+def instances(run):
+    """
+    JVMs of a run as dicts with index, Renaissance output and PID (None if unknown), plain runs have one JVM.
+    """
+    if colocation_level(run)[0] is None:
+        return [{'index': 0, 'renaissance': run['files']['renaissance'], 'pid': None}]
+    pids = []
+    if run['files']['colocation_pids']:
+        with open(run['files']['colocation_pids']) as f:
+            pids = [int(line) for line in f if line.strip().isdigit()]
+    found = []
+    postfix = ARCHITECTURES[run['arch']]['postfix']
+    for file in glob.glob(os.path.join(run['path'], f'renaissanceOutput{postfix}-*.csv')):
+        match = INSTANCE_FILE.search(file)
+        if match:
+            index = int(match['index'])
+            found.append({'index': index, 'renaissance': file, 'pid': pids[index] if index < len(pids) else None})
+    return sorted(found, key=lambda instance: instance['index'])
+
+
+def overlap_share(starts, ends, window_start, window_end):
+    """Share of each [start, end] interval inside the window."""
+    overlap = np.clip(np.minimum(ends, window_end) - np.maximum(starts, window_start), 0, None)
+    return np.divide(overlap, ends - starts, out=np.zeros(len(starts)), where=ends > starts)
+
+
+def tick_rate(procfs, source, start_ms, end_ms):
+    """
+    User and system ticks per second of one procfs source within the window, limited to the sampled part of
+    it (the samples of a JVM end when it exits), NaN if it is not sampled within the window.
+    """
+    rows = procfs[procfs['SourceFile'] == source].sort_values('Timestamp')
+    if len(rows) < 2:
+        return np.nan
+    start_ms = max(start_ms, rows['Timestamp'].iloc[0])
+    end_ms = min(end_ms, rows['Timestamp'].iloc[-1])
+    if end_ms <= start_ms:
+        return np.nan
+    ticks = rows['userTime (Ticks)'] + rows['systemTime (Ticks)']
+    return counter_increase(rows['Timestamp'] / 1000, ticks, [start_ms / 1000], [end_ms / 1000])[0] / \
+        ((end_ms - start_ms) / 1000)
+
+
+def colocated_run(run):
+    """
+    Steady-state window of one run with the iterations and CPU time of every JVM in it, None if a JVM has
+    no steady-state iterations.
+
+    :return: Tuple (summary dict of the run without the solo-relative columns, one dict per JVM)
+    """
+    level, configuration = colocation_level(run)
+    jvms = instances(run)
+    if not jvms or any(jvm['renaissance'] is None for jvm in jvms):
+        return None
+    iterations = []
+    for jvm in jvms:
+        benchmark = read_renaissance(jvm['renaissance'])['benchmark'].iloc[0] \
+            if level is not None else run['benchmark']
+        steady = read_renaissance(jvm['renaissance'], benchmark, STEADY_STATE_START.get(benchmark, 0))
+        if steady.empty:
+            return None
+        iterations.append((benchmark, steady))
+    window_start = max(steady['start_ms'].iloc[0] for _, steady in iterations)
+    window_end = min(steady['end_ms'].iloc[-1] for _, steady in iterations)
+    window_s = (window_end - window_start) / 1000 if window_end > window_start else np.nan
+
+    files = run['files']
+    procfs_file = files['colocation_procfs'] if level is not None else files['procfs']
+    procfs = read_procfs(procfs_file) if procfs_file else None
+    process_sources = [] if procfs is None else \
+        [source for source in procfs['SourceFile'].unique() if re.fullmatch(PROCESS_SOURCE, str(source))]
+    cores = ARCHITECTURES[run['arch']]['cores']
+    rows = []
+    for jvm, (benchmark, steady) in zip(jvms, iterations):
+        source = f"/proc/{jvm['pid']}/stat" if jvm['pid'] else (process_sources[0] if len(process_sources) == 1
+                                                                 else None)
+        rate = tick_rate(procfs, source, window_start, window_end) \
+            if procfs is not None and source and window_s > 0 else np.nan
+        rows.append({
+            'benchmark': run['benchmark'], 'configuration': configuration, 'level': level or 1,
+            'timestamp': run['timestamp'], 'processor': run['processor'], 'arch': run['arch'],
+            'instance': jvm['index'], 'instance_benchmark': benchmark, 'pid': jvm['pid'],
+            'steady_iterations': len(steady),
+            'median_duration_s': steady['duration_s'].median(),
+            'iterations_in_window': overlap_share(steady['start_ms'].to_numpy(), steady['end_ms'].to_numpy(),
+                                                  window_start, window_end).sum() if window_s > 0 else np.nan,
+            'cpu_cores_used': rate / TICKS_PER_SECOND,
+        })
+
+    summary = {key: rows[0][key] for key in RUN_KEYS + ['arch']}
+    summary.update({'jvms': len(jvms), 'placement': None, 'window_s': window_s, 'cpu_utilization': np.nan,
+                    'energy_j': np.nan, 'rapl_energy_j': np.nan})
+    if level is not None and files['colocation']:
+        with open(files['colocation']) as f:
+            summary['placement'] = json.load(f)['placement']
+    if not window_s > 0:
+        return summary, rows
+    if procfs is not None:
+        summary['cpu_utilization'] = tick_rate(procfs, '/proc/stat', window_start, window_end) / \
+            (TICKS_PER_SECOND * cores) * 100
+    if files['shelly']:
+        shelly = read_shelly(files['shelly'], read_timer(files['timer'])[0] if files['timer'] else None)
+        summary['energy_j'] = interval_energy(shelly['timestamp_s'], shelly['power'], [window_start / 1000],
+                                              [window_end / 1000])[0]
+    counter = rapl_counter(run)
+    if counter:
+        summary['rapl_energy_j'] = counter_energy(counter[0], counter[1], [window_start / 1000],
+                                                  [window_end / 1000])[0]
+    return summary, rows
+
+
+def colocation_runs(work_dir='./'):
+    """
+    Runs of the co-location mode and, for the benchmarks and configurations without a level 1 run, the latest
+    plain run of each benchmark, configuration and architecture as solo reference.
+    """
+    runs = discover_runs(work_dir)
+    colocated = [run for run in runs if colocation_level(run)[0] is not None]
+    solo = {(run['benchmark'], colocation_level(run)[1], run['arch'])
+            for run in colocated if colocation_level(run)[0] == 1}
+    references = {(benchmark, colocation_level(run)[1], run['arch'])
+                  for run in colocated for benchmark in run['benchmark'].split('+')} - solo
+    plain = [run for run in select_runs([run for run in runs if colocation_level(run)[0] is None], latest=True)
+             if (run['benchmark'], run['configuration'], run['arch']) in references]
+    return colocated + plain
+
+
+def collect_colocation(work_dir='./'):
+    """
+    Returns one row per run (level, throughput, slowdown, CPU and energy per unit of work) and one row per JVM.
+    """
+    summaries, rows = [], []
+    for run in colocation_runs(work_dir):
+        result = colocated_run(run)
+        if result is not None:
+            summaries.append(result[0])
+            rows.extend(result[1])
+    if not summaries:
+        return pd.DataFrame(), pd.DataFrame()
+    jvms = pd.DataFrame(rows)
+    solo = jvms[jvms['level'] == 1].groupby(['instance_benchmark', 'configuration', 'arch'])['median_duration_s'] \
+        .median().rename('solo_median_duration_s').reset_index()
+    jvms = jvms.merge(solo, on=['instance_benchmark', 'configuration', 'arch'], how='left')
+    jvms['slowdown'] = jvms['median_duration_s'] / jvms['solo_median_duration_s']
+    jvms['solo_work_s'] = jvms['iterations_in_window'] * jvms['solo_median_duration_s']
+
+    keys = RUN_KEYS + ['arch']
+    per_run = jvms.groupby(keys).agg(iterations=('iterations_in_window', 'sum'), solo_work_s=('solo_work_s', 'sum'),
+                                     mean_slowdown=('slowdown', 'mean'), max_slowdown=('slowdown', 'max'),
+                                     cpu_cores_used=('cpu_cores_used', 'sum')).reset_index()
+    summary = pd.DataFrame(summaries).merge(per_run, on=keys, how='left')
+    summary['throughput_iterations_per_s'] = summary['iterations'] / summary['window_s']
+    summary['weighted_speedup'] = summary['solo_work_s'] / summary['window_s']
+    summary['mean_power_w'] = summary['energy_j'] / summary['window_s']
+    summary['energy_per_iteration_j'] = summary['energy_j'] / summary['iterations']
+    summary['energy_per_solo_second_j'] = summary['energy_j'] / summary['solo_work_s']
+    summary['rapl_energy_per_solo_second_j'] = summary['rapl_energy_j'] / summary['solo_work_s']
+    summary = summary.sort_values(['benchmark', 'configuration', 'processor', 'level', 'timestamp'])
+    return summary.drop(columns='arch').reset_index(drop=True), jvms.drop(columns='arch')
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--work-dir', default='./', help='directory containing the result folders')
+    parser.add_argument('--output', default='colocation.csv', help='CSV file with one row per run')
+    parser.add_argument('--instances', default='colocationInstances.csv', help='CSV file with one row per JVM')
+    args = parser.parse_args()
+
+    summary, jvms = collect_colocation(args.work_dir)
+    if summary.empty:
+        print("No co-location runs (gpl-<benchmark>_COLOCATED-<level>_<configuration>) found.")
+    else:
+        pd.set_option('display.width', 250)
+        columns = ['benchmark', 'configuration', 'processor', 'level', 'window_s', 'throughput_iterations_per_s',
+                   'weighted_speedup', 'mean_slowdown', 'cpu_utilization', 'mean_power_w', 'energy_per_iteration_j',
+                   'energy_per_solo_second_j']
+        print(summary[columns].to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+        summary.to_csv(args.output, index=False)
+        jvms.to_csv(args.instances, index=False)
+        print(f"Co-location results were successfully saved as CSV: {args.output}, {args.instances}")
@@ -0,0 +1,123 @@
+"""
+Compares all run configurations of all benchmarks against a reference configuration in one pass.
+
+The steady-state samples (iteration durations, per-second CPU utilization, energy per iteration) of the
+latest run of every benchmark, configuration and architecture are collected into one long table, their
+medians are computed with one groupby and related to the median of the reference configuration on the
+same architecture. The result is written as one table and one faceted figure (a row per metric, a column
+per benchmark) instead of one PDF per pair of run locations.
+
+Usage: python -m enviroinfo.comparison [--work-dir ./] [--reference CPU100] [--output configurationComparison.csv]
+                                       [--figure configurationComparison.pdf]
+"""
+import argparse
+
+import matplotlib
+
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from enviroinfo.catalog import BENCHMARK_ORDER, discover_runs, select_runs  # noqa: E402
+from enviroinfo.figures import METRICS, metric_values  # noqa: E402
+from enviroinfo.metrics import write_table  # noqa: E402
+
+DEFAULT_REFERENCE = 'CPU100'
+PROCESSOR_COLORS = {'x86': '0.75', 'RISC-V': '0.35'}
+
+
+def collect_samples(work_dir='./', metrics=tuple(METRICS)):
+    """
+    Steady-state samples of the latest run of every benchmark, configuration and architecture as one long
+    DataFrame (benchmark, configuration, processor, timestamp, metric, value).
+    """
+    frames = []
+    for run in select_runs(discover_runs(work_dir), latest=True):
+        for metric in metrics:
+            values = metric_values(run, metric)
+            values = values[~np.isnan(values)]
+            if len(values):
+                frames.append(pd.DataFrame({'benchmark': run['benchmark'], 'configuration': run['configuration'],
+                                            'processor': run['processor'], 'timestamp': run['timestamp'],
+                                            'metric': metric, 'value': values}))
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(
+        columns=['benchmark', 'configuration', 'processor', 'timestamp', 'metric', 'value'])
+
+
+def compare_configurations(samples, reference=DEFAULT_REFERENCE):
+    """
+    Median, mean and IQR per benchmark, configuration, processor and metric and the relative change of the
+    median against the reference configuration of the same benchmark, processor and metric.
+    """
+    keys = ['benchmark', 'configuration', 'processor', 'metric']
+    grouped = samples.groupby(keys, observed=True)['value']
+    summary = grouped.agg(n='size', median='median', mean='mean')
+    summary['iqr'] = grouped.quantile(0.75) - grouped.quantile(0.25)
+    summary.insert(0, 'timestamp', samples.groupby(keys, observed=True)['timestamp'].first())
+    summary = summary.reset_index()
+
+    reference_medians = summary[summary['configuration'] == reference][['benchmark', 'processor', 'metric', 'median']]
+    summary = summary.merge(reference_medians.rename(columns={'median': 'reference_median'}),
+                            on=['benchmark', 'processor', 'metric'], how='left')
+    summary['delta'] = summary['median'] - summary['reference_median']
+    summary['delta_%'] = summary['delta'] / summary['reference_median'] * 100
+    order = {benchmark: i for i, benchmark in enumerate(BENCHMARK_ORDER)}
+    summary['_order'] = summary['benchmark'].map(order).fillna(len(order))
+    return summary.sort_values(['metric', '_order', 'benchmark', 'processor', 'configuration']) \
+        .drop(columns='_order').reset_index(drop=True)
+
+
+def plot_comparison(comparison, reference, output):
+    """
+    Faceted bar chart of the relative change per configuration, one row per metric and one column per benchmark.
+    """
+    others = comparison[comparison['configuration'] != reference].dropna(subset=['delta_%'])
+    metrics = [m for m in METRICS if m in set(others['metric'])]
+    benchmarks = [b for b in BENCHMARK_ORDER if b in set(others['benchmark'])] + \
+        sorted(set(others['benchmark']) - set(BENCHMARK_ORDER))
+    if not metrics or not benchmarks:
+        return None
+    variants = sorted({(p, c) for p, c in zip(others['processor'], others['configuration'])})
+    fig, axes = plt.subplots(len(metrics), len(benchmarks), figsize=(2.6 * len(benchmarks), 3.2 * len(metrics)),
+                             sharey='row', squeeze=False)
+    for row, metric in enumerate(metrics):
+        for col, benchmark in enumerate(benchmarks):
+            ax = axes[row][col]
+            panel = others[(others['metric'] == metric) & (others['benchmark'] == benchmark)] \
+                .set_index(['processor', 'configuration'])['delta_%']
+            values = [panel.get(variant, np.nan) for variant in variants]
+            ax.bar(range(len(variants)), values, color=[PROCESSOR_COLORS.get(p, '0.5') for p, _ in variants],
+                   edgecolor='black', linewidth=0.5)
+            ax.axhline(0, color='black', linewidth=0.8)
+            ax.yaxis.grid(True)
+            ax.set_xticks(range(len(variants)))
+            ax.set_xticklabels([f'{p}\n{c}' for p, c in variants] if row == len(metrics) - 1 else [],
+                               rotation=90, fontsize=8)
+            if row == 0:
+                ax.set_title(benchmark)
+            if col == 0:
+                ax.set_ylabel(f"{METRICS[metric]['label'].split(' (')[0]}\nchange vs. {reference} (%)")
+    fig.tight_layout()
+    fig.savefig(output, bbox_inches='tight', dpi=300)
+    plt.close(fig)
+    return output
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--work-dir', default='./', help='directory containing the result folders')
+    parser.add_argument('--reference', default=DEFAULT_REFERENCE, help='configuration the others are compared to')
+    parser.add_argument('--metrics', nargs='+', choices=list(METRICS), default=list(METRICS))
+    parser.add_argument('--output', default='configurationComparison.csv', help='table, .csv, .parquet or .tex')
+    parser.add_argument('--figure', default='configurationComparison.pdf', help='faceted figure')
+    args = parser.parse_args()
+
+    comparison = compare_configurations(collect_samples(args.work_dir, args.metrics), args.reference)
+    pd.set_option('display.width', 250)
+    print(comparison[comparison['configuration'] != args.reference]
+          .to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    write_table(comparison, args.output)
+    print(f"Comparison was successfully saved: {args.output}")
+    if plot_comparison(comparison, args.reference, args.figure):
+        print(f"Figure was successfully saved: {args.figure}")
@@ -0,0 +1,198 @@
+import logging
+
+import numpy as np
+
+from enviroinfo.catalog import ARCHITECTURES, find_baseline, run_files
+from enviroinfo.loaders import read_rapl, read_rapl_high_rate, read_shelly, read_timeline, read_timer
+from enviroinfo.profiling import profiled
+
+IDLE_BASELINE = 'baseline-measurement_shelly-only'
+MONITOR_BASELINE = 'baseline-measurement'
+# Samples of the baseline measurements used for the idle power: skip the first minute, use the next 8 minutes
+BASELINE_WINDOW = (60, 60 + 480)
+# Shelly samples every second, larger gaps between two samples are treated as missing data
+MAX_SAMPLE_GAP_S = 5
+# Phases of the timeline recorded as idle windows before and after the benchmark, and the seconds skipped
+# at their start (startup of the monitors, settling after the Renaissance teardown)
+IDLE_PHASES = ('idle_before', 'idle_after')
+IDLE_WINDOW_SKIP_S = 5
+
+
+@profiled()
+def interval_energy(timestamps_s, power_w, starts_s, ends_s, max_gap_s=MAX_SAMPLE_GAP_S):
+    """
+    Energy in joules of each [start, end] interval, from instantaneous power samples.
+
+    The power is integrated with the trapezoidal rule and the cumulative energy is interpolated
+    at the interval bounds, so all intervals are computed at once and intervals shorter than
+    the sampling period get their share of the surrounding samples. Intervals outside the
+    sampled range or overlapping a gap of more than max_gap_s between two samples are NaN.
+    """
+    timestamps_s = np.asarray(timestamps_s, dtype=float)
+    power_w = np.asarray(power_w, dtype=float)
+    starts_s = np.asarray(starts_s, dtype=float)
+    ends_s = np.asarray(ends_s, dtype=float)
+    if len(timestamps_s) < 2:
+        return np.full(starts_s.shape, np.nan)
+    steps = np.diff(timestamps_s)
+    cumulative = np.concatenate(([0.0], np.cumsum(steps * (power_w[1:] + power_w[:-1]) / 2)))
+    energy = np.interp(ends_s, timestamps_s, cumulative) - np.interp(starts_s, timestamps_s, cumulative)
+    # number of gaps among the sample steps up to each sample, an interval covers the steps first..last
+    gaps = np.concatenate(([0], np.cumsum(steps > max_gap_s)))
+    first = np.clip(np.searchsorted(timestamps_s, starts_s, side='right') - 1, 0, len(steps) - 1)
+    last = np.clip(np.searchsorted(timestamps_s, ends_s, side='left'), 1, len(steps))
+    in_gap = gaps[last] - gaps[first] > 0
+    outside = (starts_s < timestamps_s[0]) | (ends_s > timestamps_s[-1])
+    return np.where(outside | in_gap, np.nan, energy)
+
+
+def counter_increase(timestamps_s, counter, starts_s, ends_s):
+    """
+    Increase of a cumulative counter (e.g. RAPL energy or procfs ticks) within each [start, end] interval,
+    linearly interpolated between the samples. Intervals outside the sampled range or with a decreasing
+    counter (wrap-around, restart) are NaN.
+    """
+    timestamps_s = np.asarray(timestamps_s, dtype=float)
+    counter = np.asarray(counter, dtype=float)
+    starts_s = np.asarray(starts_s, dtype=float)
+    ends_s = np.asarray(ends_s, dtype=float)
+    if len(timestamps_s) < 2:
+        return np.full(starts_s.shape, np.nan)
+    increase = np.interp(ends_s, timestamps_s, counter) - np.interp(starts_s, timestamps_s, counter)
+    outside = (starts_s < timestamps_s[0]) | (ends_s > timestamps_s[-1])
+    return np.where(outside | (increase < 0), np.nan, increase)
+
+
+@profiled()
+def counter_energy(timestamps_s, counter_uj, starts_s, ends_s):
+    """
+    Energy in joules of each [start, end] interval from a cumulative energy counter in micro joules (RAPL).
+    """
+    return counter_increase(timestamps_s, counter_uj, starts_s, ends_s) / 1_000_000
+
+
+def rapl_counter(run):
+    """
+    Package energy counter of a run: the samples of rapl_sampler.py (raplHighRate_*, every package domain
+    summed) if recorded, the samples of powercap-reader otherwise.
+
+    :return: Tuple (timestamps in s, counter in micro joules, source 'high_rate' or 'reader'), None without RAPL
+    """
+    files = run['files']
+    if files.get('rapl_high_rate'):
+        samples = read_rapl_high_rate(files['rapl_high_rate'])
+        packages = [column for column in samples.columns if column.startswith('package')]
+        if packages and len(samples) > 1:
+            return samples['Timestamp'].to_numpy() / 1e9, samples[packages].sum(axis=1).to_numpy(), 'high_rate'
+    if files['rapl']:
+        rapl = read_rapl(files['rapl'])
+        return rapl['Timestamp'].to_numpy() / 1000, rapl['Energy (micro joules)'].to_numpy(), 'reader'
+    return None
+
+
+def phase_energy(run):
+    """
+    Wall energy of every phase of the benchmark worker (SSH connect, startup, benchmark, shutdown, transfer, ...),
+    None for runs recorded without a timeline.
+
+    :return: DataFrame of the timeline with energy_j and mean_power_w added (NaN where Shelly data is missing)
+    """
+    files = run['files']
+    if not files.get('timeline'):
+        return None
+    phases = read_timeline(files['timeline'])
+    phases['energy_j'] = np.nan
+    if files['shelly'] and not phases.empty:
+        timer_start = read_timer(files['timer'])[0] if files['timer'] else None
+        shelly = read_shelly(files['shelly'], timer_start)
+        phases['energy_j'] = interval_energy(shelly['timestamp_s'], shelly['power'],
+                                             phases['wall_start'].to_numpy(), phases['wall_end'].to_numpy())
+    phases['mean_power_w'] = phases['energy_j'] / (phases['wall_end'] - phases['wall_start'])
+    return phases
+
+
+def local_baseline(run):
+    """
+    Power during the idle windows recorded before and after the benchmark of a run (with the monitors running),
+    None for runs without idle windows.
+
+    :return: Dict {'static_w': wall power, 'rapl_idle_w': RAPL package power (NaN without RAPL),
+             'idle_before_w', 'idle_after_w': wall power of the single windows, to spot drift within the run}
+    """
+    files = run['files']
+    if not files.get('timeline') or not files['shelly']:
+        return None
+    phases = read_timeline(files['timeline'])
+    phases = phases[phases['phase'].isin(IDLE_PHASES)]
+    starts = phases['wall_start'].to_numpy() + IDLE_WINDOW_SKIP_S
+    ends = phases['wall_end'].to_numpy()
+    valid = ends > starts
+    if not valid.any():
+        if len(phases):
+            logging.warning(f"Idle windows of {run['path']} are not longer than the {IDLE_WINDOW_SKIP_S} s skipped "
+                            f"at their start, using the campaign baseline")
+        return None
+    phases, starts, ends = phases[valid], starts[valid], ends[valid]
+    durations = ends - starts
+    timer_start = read_timer(files['timer'])[0] if files['timer'] else None
+    shelly = read_shelly(files['shelly'], timer_start)
+    energy = interval_energy(shelly['timestamp_s'], shelly['power'], starts, ends)
+    measured = ~np.isnan(energy)
+    if not measured.any():
+        return None
+    window_power = dict(zip(phases['phase'], energy / durations))
+    baseline = {
+        'static_w': energy[measured].sum() / durations[measured].sum(),
+        'rapl_idle_w': np.nan,
+        'idle_before_w': window_power.get('idle_before', np.nan),
+        'idle_after_w': window_power.get('idle_after', np.nan),
+    }
+    counter = rapl_counter(run)
+    if counter:
+        rapl_energy = counter_energy(counter[0], counter[1], starts, ends)
+        rapl_measured = ~np.isnan(rapl_energy)
+        if rapl_measured.any():
+            baseline['rapl_idle_w'] = rapl_energy[rapl_measured].sum() / durations[rapl_measured].sum()
+    return baseline
+
+
+def _baseline_shelly_power(path, arch):
+    shelly_file = run_files(path, arch)['shelly']
+    if not shelly_file:
+        return np.nan
+    power = read_shelly(shelly_file)['power'].iloc[BASELINE_WINDOW[0]:BASELINE_WINDOW[1]]
+    return power.mean()
+
+
+def _baseline_rapl_power(path, arch):
+    rapl_file = run_files(path, arch)['rapl']
+    if not rapl_file:
+        return np.nan
+    rapl = read_rapl(rapl_file)
+    relative_s = (rapl['Timestamp'] - rapl['Timestamp'].min()) / 1000
+    rapl = rapl[(relative_s >= BASELINE_WINDOW[0]) & (relative_s <= BASELINE_WINDOW[1])]
+    if len(rapl) < 2:
+        return np.nan
+    duration_s = (rapl['Timestamp'].iloc[-1] - rapl['Timestamp'].iloc[0]) / 1000
+    return (rapl['Energy (micro joules)'].iloc[-1] - rapl['Energy (micro joules)'].iloc[0]) / 1_000_000 / duration_s
+
+
+def baseline_power(work_dir='./'):
+    """
+    Idle power per architecture from the baseline measurements.
+
+    :return: Dict arch -> {'idle_w': wall power without monitors, 'monitor_overhead_w': additional wall power
+             with the procfs (and RAPL) monitors running, 'rapl_idle_w': RAPL package power with monitors running}
+    """
+    idle = find_baseline(work_dir, IDLE_BASELINE)
+    monitored = find_baseline(work_dir, MONITOR_BASELINE)
+    baselines = {}
+    for arch in ARCHITECTURES:
+        idle_w = _baseline_shelly_power(idle[arch], arch) if arch in idle else np.nan
+        monitored_w = _baseline_shelly_power(monitored[arch], arch) if arch in monitored else np.nan
+        baselines[arch] = {
+            'idle_w': idle_w,
+            'monitor_overhead_w': monitored_w - idle_w,
+            'rapl_idle_w': _baseline_rapl_power(monitored[arch], arch) if arch in monitored else np.nan,
+        }
+    return baselines
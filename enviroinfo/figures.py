@@ -0,0 +1,191 @@
+"""
+Headless batch rendering of the x86 versus RISC-V boxplot figures for every pair of configurations.
+
+The boxplot statistics (quartiles, whiskers at 1.5 IQR, outliers, mean) are computed once per
+benchmark, configuration, architecture and metric with NumPy and cached, only these summaries are passed
+to the worker processes, which draw them with matplotlib's bxp on the Agg backend. For every combination
+of an x86 and a RISC-V configuration one figure per metric is written, in the layout of
+visualizeDurationAsBoxplots.py and calculateCpuUtilizationPerBenchmark.py.
+
+Usage: python -m enviroinfo.figures [--work-dir ./] [--output-dir figures] [--metrics duration cpu energy] [--workers N]
+"""
+import argparse
+import functools
+import itertools
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import matplotlib
+
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+
+from enviroinfo.catalog import (ARCHITECTURES, BENCHMARK_ORDER, STEADY_STATE_START, discover_runs,  # noqa: E402
+                               parse_timestamp, run_files)
+from enviroinfo.cpu import calculate_cpu_usage  # noqa: E402
+from enviroinfo import profiling  # noqa: E402
+from enviroinfo.cache import disk_cached  # noqa: E402
+from enviroinfo.metrics import shelly_iteration_energy, steady_state_iterations  # noqa: E402
+
+TITLE_SIZE = 20
+LABEL_SIZE = 20
+TICK_SIZE = 16
+# Colors of seaborn's two-color "Greys" palette used by the original scripts
+BOX_COLORS = ['#d9d9d9', '#737373']
+METRICS = {
+    'duration': {'label': 'Duration (s)', 'file': 'durationBoxplot', 'ylim': (0, None), 'sharey': False},
+    'cpu': {'label': 'CPU Utilization (%)', 'file': 'cpuUtilizationBoxplot', 'ylim': (0, 100), 'sharey': True},
+    'energy': {'label': 'Energy per Iteration (J)', 'file': 'energyBoxplot', 'ylim': (0, None), 'sharey': False},
+}
+
+
+def boxplot_stats(values, label, whis=1.5):
+    """
+    Boxplot statistics of values in the format of matplotlib's bxp, NaN values are ignored.
+    """
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return None
+    q1, median, q3 = np.percentile(values, [25, 50, 75])
+    iqr = q3 - q1
+    inside = values[(values >= q1 - whis * iqr) & (values <= q3 + whis * iqr)]
+    return {
+        'label': label,
+        'med': median,
+        'q1': q1,
+        'q3': q3,
+        'whislo': inside.min() if len(inside) else q1,
+        'whishi': inside.max() if len(inside) else q3,
+        'fliers': values[(values < q1 - whis * iqr) | (values > q3 + whis * iqr)],
+        'mean': values.mean(),
+        'n': len(values),
+    }
+
+
+@disk_cached(lambda a: a['run']['files'].values())
+def metric_values(run, metric):
+    """Steady-state samples of one run: iteration durations, per-second CPU utilization or iteration energy."""
+    iterations = steady_state_iterations(run)
+    if iterations is None:
+        return np.array([])
+    if metric == 'duration':
+        return iterations['duration_s'].to_numpy()
+    if metric == 'energy':
+        return shelly_iteration_energy(run, iterations)
+    if not run['files']['procfs']:
+        return np.array([])
+    cpu = calculate_cpu_usage(run['files']['renaissance'], run['files']['procfs'], run['benchmark'],
+                              run['processor'], STEADY_STATE_START.get(run['benchmark'], 0))
+    return np.asarray(cpu['cpu_values_per_second'] if cpu else [], dtype=float)
+
+
+@functools.lru_cache(maxsize=None)
+@profiling.profiled('figures.boxplot_stats', rows=None)
+def _group_stats(path, arch, benchmark, metric):
+    run = {'path': path, 'arch': arch, 'benchmark': benchmark, 'processor': ARCHITECTURES[arch]['processor'],
+           'files': run_files(path, arch)}
+    return boxplot_stats(metric_values(run, metric), run['processor'])
+
+
+def group_stats(run, metric):
+    """Cached boxplot statistics of one run and metric."""
+    return _group_stats(os.path.realpath(run['path']), run['arch'], run['benchmark'], metric)
+
+
+def latest_runs(runs):
+    """Latest run per benchmark, configuration and architecture as dict (arch, configuration) -> {benchmark: run}."""
+    latest = {}
+    for run in sorted(runs, key=lambda r: parse_timestamp(r['timestamp'])):
+        latest.setdefault((run['arch'], run['configuration']), {})[run['benchmark']] = run
+    return latest
+
+
+def figure_variants(work_dir='./', metrics=tuple(METRICS)):
+    """
+    Statistics of all figures, one per metric and pair of an x86 and a RISC-V configuration.
+    """
+    latest = latest_runs(discover_runs(work_dir))
+    x86_configurations = sorted(c for a, c in latest if a == 'X86')
+    risc_configurations = sorted(c for a, c in latest if a == 'RISC')
+    variants = []
+    for metric, x86, risc in itertools.product(metrics, x86_configurations, risc_configurations):
+        panels = []
+        for benchmark in BENCHMARK_ORDER:
+            stats = [group_stats(runs[benchmark], metric) for runs in (latest[('X86', x86)], latest[('RISC', risc)])
+                     if benchmark in runs]
+            stats = [s for s in stats if s]
+            if stats:
+                panels.append((benchmark, stats))
+        if panels:
+            variants.append({'metric': metric, 'x86': x86, 'risc': risc, 'panels': panels})
+    return variants
+
+
+def render_figure(variant, output_dir='figures', file_format='pdf'):
+    """
+    Draws one figure from precomputed statistics and returns its path.
+    """
+    with profiling.span('figures.render', metric=variant['metric'], x86=variant['x86'], risc=variant['risc']):
+        return _draw(variant, output_dir, file_format)
+
+
+def _draw(variant, output_dir, file_format):
+    metric = METRICS[variant['metric']]
+    plt.rcParams.update({'font.size': TICK_SIZE, 'axes.titlesize': TITLE_SIZE, 'axes.labelsize': LABEL_SIZE,
+                         'xtick.labelsize': TICK_SIZE, 'ytick.labelsize': TICK_SIZE})
+    fig, axes = plt.subplots(1, len(variant['panels']), figsize=(20, 6), sharey=metric['sharey'], squeeze=False)
+    for idx, (benchmark, stats) in enumerate(variant['panels']):
+        ax = axes[0][idx]
+        boxes = ax.bxp(stats, patch_artist=True, showfliers=True,
+                       medianprops={'color': 'black'}, flierprops={'marker': 'd', 'markersize': 4})
+        for patch, stat in zip(boxes['boxes'], stats):
+            patch.set_facecolor(BOX_COLORS[0] if stat['label'] == 'x86' else BOX_COLORS[1])
+        ax.set_ylim(*metric['ylim'])
+        ax.set_title(benchmark, fontsize=TITLE_SIZE, pad=15)
+        ax.set_ylabel(metric['label'] if idx == 0 else '', fontsize=LABEL_SIZE)
+        ax.tick_params(axis='x', rotation=45, labelsize=TICK_SIZE)
+        ax.tick_params(axis='y', labelsize=TICK_SIZE)
+        ax.yaxis.grid(True)
+    fig.tight_layout(pad=2.0)
+
+    path = os.path.join(output_dir, f"X86_{variant['x86']}_RISC_{variant['risc']}_{metric['file']}.{file_format}")
+    fig.savefig(path, format=file_format, bbox_inches='tight', dpi=300)
+    plt.close(fig)
+    return path
+
+
+def _render(arguments):
+    enabled, variant, output_dir, file_format = arguments
+    return profiling.traced_call(enabled, render_figure, variant, output_dir, file_format)
+
+
+def render_figures(work_dir='./', output_dir='figures', metrics=tuple(METRICS), file_format='pdf', workers=None):
+    """
+    Computes the statistics of all figure variants and renders them in parallel.
+
+    :return: Paths of the written figures
+    """
+    variants = figure_variants(work_dir, metrics)
+    os.makedirs(output_dir, exist_ok=True)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        results = list(executor.map(_render, [(profiling.is_enabled(), variant, output_dir, file_format)
+                                              for variant in variants]))
+    for _, recorded in results:
+        profiling.merge(recorded)
+    return [path for path, _ in results]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--work-dir', default='./', help='directory containing the result folders')
+    parser.add_argument('--output-dir', default='figures', help='directory for the figures')
+    parser.add_argument('--metrics', nargs='+', choices=list(METRICS), default=list(METRICS))
+    parser.add_argument('--format', default='pdf', help='file format understood by matplotlib (pdf, png, svg)')
+    parser.add_argument('--workers', type=int, help='parallel processes (default: number of CPUs)')
+    args = parser.parse_args()
+
+    paths = render_figures(args.work_dir, args.output_dir, args.metrics, args.format, args.workers)
+    for path in paths:
+        print(f"Boxplot was successfully saved as {args.format.upper()}: {path}")
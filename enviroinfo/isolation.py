@@ -0,0 +1,75 @@
+"""
+Compares throughput and CPU utilization of runs with pinned monitors (configuration PINNED_<configuration>,
+see CPU_PLACEMENT in experiment_automation/benchmarkscript.py) against the unpinned runs of the same configuration.
+
+Usage: python -m enviroinfo.isolation [work_dir]
+"""
+import sys
+
+import pandas as pd
+
+from enviroinfo.catalog import STEADY_STATE_START, discover_runs
+from enviroinfo.cpu import calculate_cpu_usage
+from enviroinfo.loaders import read_renaissance
+
+PINNED_PREFIX = 'PINNED_'
+
+
+def summarize_run(run):
+    """
+    Steady-state throughput and CPU utilization of the benchmark process for one run.
+    """
+    files = run['files']
+    if not (files['renaissance'] and files['procfs']):
+        return None
+    start_index = STEADY_STATE_START.get(run['benchmark'], 0)
+    iterations = read_renaissance(files['renaissance'], run['benchmark'], start_index)
+    if iterations.empty:
+        return None
+    cpu = calculate_cpu_usage(files['renaissance'], files['procfs'], run['benchmark'], run['processor'],
+                              benchmark_start_index=start_index)
+    return {
+        'benchmark': run['benchmark'],
+        'processor': run['processor'],
+        'configuration': run['configuration'].removeprefix(PINNED_PREFIX),
+        'isolated': run['configuration'].startswith(PINNED_PREFIX),
+        'timestamp': run['timestamp'],
+        'median_duration_s': iterations['duration_s'].median(),
+        'throughput_ops_per_s': len(iterations) / iterations['duration_s'].sum(),
+        'average_cpu_usage': cpu['average_cpu_usage'] if cpu else float('nan'),
+    }
+
+
+def compare_isolation(work_dir='./'):
+    """
+    Returns one row per benchmark, processor and configuration with the unpinned and pinned values
+    and their relative change in percent. Configurations without pinned runs are omitted.
+    """
+    summaries = [s for s in (summarize_run(run) for run in discover_runs(work_dir)) if s]
+    if not summaries:
+        return pd.DataFrame()
+    df = pd.DataFrame(summaries)
+    keys = ['benchmark', 'processor', 'configuration']
+    metrics = ['median_duration_s', 'throughput_ops_per_s', 'average_cpu_usage']
+    # several runs of the same kind are averaged
+    per_kind = df.groupby(keys + ['isolated'])[metrics].mean().unstack('isolated')
+    if True not in per_kind.columns.get_level_values('isolated'):
+        return pd.DataFrame()
+    per_kind = per_kind.dropna()
+    result = pd.DataFrame(index=per_kind.index)
+    for metric in metrics:
+        result[f'{metric}_unpinned'] = per_kind[(metric, False)]
+        result[f'{metric}_pinned'] = per_kind[(metric, True)]
+        result[f'{metric}_change_%'] = (per_kind[(metric, True)] / per_kind[(metric, False)] - 1) * 100
+    return result.reset_index()
+
+
+if __name__ == "__main__":
+    comparison = compare_isolation(sys.argv[1] if len(sys.argv) > 1 else './')
+    if comparison.empty:
+        print("No runs with pinned monitors found (run the orchestrator with CPU_PLACEMENT set).")
+    else:
+        pd.set_option('display.width', 200)
+        print(comparison.to_string(index=False, float_format=lambda v: f"{v:.2f}"))
+        comparison.to_csv('cpuIsolationComparison.csv', index=False)
+        print("Comparison was successfully saved as CSV: cpuIsolationComparison.csv")
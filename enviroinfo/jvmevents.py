@@ -0,0 +1,297 @@
+"""
+Attributes the time and energy of the benchmark runs to GC pauses, safepoints and JIT compilation.
+
+The events are read from the unified GC log (gcLog_*.log, benchmarkscript.py with GC_LOGGING) and from the JFR
+recording (jvmEvents_*.jfr, JFR_RECORDING, converted with the jfr tool of a local JDK). They are placed on the
+time axis of the iterations through the JVM uptime (or the wall clock decorator), overlapping events of one
+kind are merged. For every iteration the time spent in each kind of event and the wall (Shelly) and RAPL
+energy drawn during it are computed; compilations run concurrently with the benchmark, so their energy is the
+energy drawn while compiling, not the energy of the compiler threads alone. An iteration is slow if it takes
+SLOW_THRESHOLD longer than the steady-state median of its run and is attributed to GC or JIT if that kind
+covers at least EXPLAINED_SHARE of the excess. Shelly samples above the 95th percentile of the steady-state
+are counted as power spikes together with the events overlapping their sampling interval.
+
+Usage: python -m enviroinfo.jvmevents [--work-dir ./] [--output iterationJvmEvents.csv]
+"""
+import argparse
+import json
+import logging
+import shutil
+import subprocess
+
+import numpy as np
+import pandas as pd
+
+from enviroinfo.catalog import STEADY_STATE_START, discover_runs
+from enviroinfo.energy import counter_energy, interval_energy, rapl_counter
+from enviroinfo.loaders import read_gc_log, read_renaissance, read_shelly, read_timer
+from enviroinfo.telemetry import SLOW_THRESHOLD
+
+EVENT_KINDS = ['gc_pause', 'gc_concurrent', 'safepoint', 'jit']
+# Kinds a slow iteration can be attributed to, the pause kinds stop the benchmark threads
+CAUSES = {'gc': ['gc_pause', 'safepoint'], 'jit': ['jit']}
+EXPLAINED_SHARE = 0.5
+SPIKE_PERCENTILE = 95
+JFR_EVENTS = ['jdk.Compilation', 'jdk.GarbageCollection']
+
+
+def read_jfr(jfr_file):
+    """
+    Compilations and garbage collections of a JFR recording, None if no jfr tool (JDK 11+) is on the PATH.
+
+    :return: DataFrame with kind ('jit' or 'gc_pause'), name, duration_ms and start_ms (unix ms)
+    """
+    jfr = shutil.which('jfr')
+    if jfr is None:
+        return None
+    output = subprocess.run([jfr, 'print', '--json', '--events', ','.join(JFR_EVENTS), jfr_file],
+                            capture_output=True, text=True, check=True).stdout
+    rows = []
+    for event in json.loads(output)['recording']['events']:
+        values = event['values']
+        if event['type'] == 'jdk.Compilation':
+            method = values.get('method') or {}
+            declaring = (method.get('type') or {}).get('name', '')
+            name = f"{declaring}.{method.get('name', '')} (tier {values.get('compileLevel')})"
+            kind = 'jit'
+        else:
+            name, kind = values.get('name', 'GC'), 'gc_pause'
+        rows.append({'kind': kind, 'name': name, 'start': values['startTime'], 'duration': values['duration']})
+    if not rows:
+        return pd.DataFrame(columns=['kind', 'name', 'duration_ms', 'start_ms'])
+    events = pd.DataFrame(rows)
+    starts = pd.to_datetime(events['start'], utc=True, format='ISO8601')
+    events['start_ms'] = (starts - pd.Timestamp(0, tz='UTC')).dt.total_seconds() * 1000
+    events['duration_ms'] = pd.to_timedelta(events['duration']).dt.total_seconds() * 1000
+    return events[['kind', 'name', 'duration_ms', 'start_ms']]
+
+
+def jvm_events(run, vm_start_ms):
+    """
+    GC, safepoint and JIT events of a run with start_ms and end_ms in unix ms, None if none were recorded.
+    GC pauses are taken from the JFR recording only if there is no GC log.
+    """
+    files = run['files']
+    frames = []
+    if files.get('gclog'):
+        gc = read_gc_log(files['gclog'])
+        end_ms = np.where(gc['end_uptime_ns'].notna(), vm_start_ms + gc['end_uptime_ns'] / 1_000_000, gc['end_ms'])
+        frames.append(pd.DataFrame({'kind': gc['kind'], 'name': gc['name'], 'start_ms': end_ms - gc['duration_ms'],
+                                    'end_ms': end_ms}))
+    if files.get('jfr'):
+        jfr = read_jfr(files['jfr'])
+        if jfr is None:
+            logging.warning(f"Skipping {files['jfr']}: no jfr tool found on the PATH")
+        else:
+            if files.get('gclog'):
+                jfr = jfr[jfr['kind'] == 'jit']
+            frames.append(pd.DataFrame({'kind': jfr['kind'], 'name': jfr['name'], 'start_ms': jfr['start_ms'],
+                                        'end_ms': jfr['start_ms'] + jfr['duration_ms']}))
+    frames = [frame.dropna(subset=['start_ms', 'end_ms']) for frame in frames]
+    if not frames or all(frame.empty for frame in frames):
+        return None
+    return pd.concat(frames, ignore_index=True).sort_values('start_ms', kind='stable').reset_index(drop=True)
+
+
+def merge_intervals(starts, ends):
+    """Union of [start, end] intervals as sorted, non-overlapping starts and ends."""
+    order = np.argsort(starts, kind='stable')
+    starts, ends = np.asarray(starts, dtype=float)[order], np.asarray(ends, dtype=float)[order]
+    if len(starts) == 0:
+        return starts, ends
+    running_end = np.maximum.accumulate(ends)
+    # a new interval begins where the start lies after the furthest end so far
+    first = np.flatnonzero(np.concatenate(([True], starts[1:] > running_end[:-1])))
+    return starts[first], np.maximum.reduceat(ends, first)
+
+
+def covered_time(union_starts, union_ends, starts, ends):
+    """Time of each [start, end] window covered by the merged intervals, in the unit of the inputs."""
+    if len(union_starts) == 0:
+        return np.zeros(len(starts))
+    cumulative = np.concatenate(([0.0], np.cumsum(union_ends - union_starts)))
+
+    def covered_until(t):
+        index = np.searchsorted(union_starts, t, side='right') - 1
+        inside = np.clip(t - union_starts[np.clip(index, 0, None)], 0,
+                         (union_ends - union_starts)[np.clip(index, 0, None)])
+        return np.where(index < 0, 0.0, cumulative[np.clip(index, 0, None)] + inside)
+
+    return covered_until(np.asarray(ends, dtype=float)) - covered_until(np.asarray(starts, dtype=float))
+
+
+def _union_energy(union_starts, union_ends, starts, ends, energy_of):
+    """Energy drawn during the merged intervals, summed per window containing the middle of an interval."""
+    totals = np.zeros(len(starts))
+    if len(union_starts) == 0:
+        return totals
+    energy = energy_of(union_starts, union_ends)
+    middles = (union_starts + union_ends) / 2
+    window = np.searchsorted(starts, middles, side='right') - 1
+    inside = (window >= 0) & (middles <= ends[np.clip(window, 0, None)]) & ~np.isnan(energy)
+    np.add.at(totals, window[inside], energy[inside])
+    return totals
+
+
+def iteration_events(run):
+    """
+    Iterations of one run with the time and energy spent in GC pauses, concurrent GC, safepoints and
+    compilation, None if the run has no GC log or JFR recording.
+
+    :return: (iterations, events as returned by jvm_events)
+    """
+    files = run['files']
+    if not files['renaissance'] or not (files.get('gclog') or files.get('jfr')):
+        return None
+    iterations = read_renaissance(files['renaissance'], run['benchmark']).reset_index(drop=True)
+    if iterations.empty:
+        return None
+    events = jvm_events(run, iterations['vm_start_unix_ms'].iloc[0])
+    if events is None:
+        return None
+    starts_s, ends_s = iterations['start_ms'].to_numpy() / 1000, iterations['end_ms'].to_numpy() / 1000
+    frame = pd.DataFrame({
+        'benchmark': run['benchmark'], 'configuration': run['configuration'], 'timestamp': run['timestamp'],
+        'processor': run['processor'], 'arch': run['arch'], 'iteration': iterations.index,
+        'steady_state': iterations.index >= STEADY_STATE_START.get(run['benchmark'], 0),
+        'duration_s': iterations['duration_s'].to_numpy(),
+    })
+    energy_sources = {}
+    if files['shelly']:
+        shelly = read_shelly(files['shelly'], read_timer(files['timer'])[0] if files['timer'] else None)
+        energy_sources['energy_j'] = lambda a, b: interval_energy(shelly['timestamp_s'], shelly['power'], a, b)
+    counter = rapl_counter(run)
+    if counter:
+        energy_sources['rapl_energy_j'] = lambda a, b: counter_energy(counter[0], counter[1], a, b)
+    for column, energy_of in energy_sources.items():
+        frame[column] = energy_of(starts_s, ends_s)
+    for kind in EVENT_KINDS:
+        selected = events[events['kind'] == kind]
+        union_starts, union_ends = merge_intervals(selected['start_ms'].to_numpy() / 1000,
+                                                   selected['end_ms'].to_numpy() / 1000)
+        event_starts = np.sort(selected['start_ms'].to_numpy() / 1000)
+        frame[f'{kind}_events'] = np.searchsorted(event_starts, ends_s) - np.searchsorted(event_starts, starts_s)
+        frame[f'{kind}_s'] = covered_time(union_starts, union_ends, starts_s, ends_s)
+        for column, energy_of in energy_sources.items():
+            frame[f'{kind}_{column}'] = _union_energy(union_starts, union_ends, starts_s, ends_s, energy_of)
+    return frame, events
+
+
+def attribute_slow_iterations(iterations):
+    """
+    Adds the columns slow and cause ('gc', 'jit' or 'unexplained') to the iterations of all runs, using the
+    steady-state median of each run.
+    """
+    keys = ['benchmark', 'configuration', 'timestamp', 'arch']
+    medians = iterations[iterations['steady_state']].groupby(keys)['duration_s'].median() \
+        .rename('run_median_duration_s').reset_index()
+    iterations = iterations.merge(medians, on=keys, how='left')
+    excess = iterations['duration_s'] - iterations['run_median_duration_s']
+    iterations['slow'] = excess > iterations['run_median_duration_s'] * SLOW_THRESHOLD
+    covered = pd.DataFrame({cause: iterations[[f'{kind}_s' for kind in kinds]].sum(axis=1)
+                            for cause, kinds in CAUSES.items()})
+    explained = covered.ge(excess * EXPLAINED_SHARE, axis=0)
+    # idxmax fails on all-NA rows, the rows without an explaining kind are masked afterwards
+    largest = covered.where(explained).fillna(-1).idxmax(axis=1)
+    iterations['cause'] = np.where(~iterations['slow'], '',
+                                   np.where(explained.any(axis=1), largest, 'unexplained'))
+    return iterations
+
+
+def power_spikes(run, events):
+    """
+    Steady-state Shelly samples above the SPIKE_PERCENTILE of the run with the event kinds overlapping the
+    sampling interval before them, None without Shelly data.
+    """
+    files = run['files']
+    if not files['shelly'] or events is None:
+        return None
+    iterations = read_renaissance(files['renaissance'], run['benchmark'], STEADY_STATE_START.get(run['benchmark'], 0))
+    shelly = read_shelly(files['shelly'], read_timer(files['timer'])[0] if files['timer'] else None)
+    if iterations.empty or len(shelly) < 2:
+        return None
+    times = shelly['timestamp_s'].to_numpy(dtype=float)
+    steady = (times > iterations['start_ms'].iloc[0] / 1000) & (times <= iterations['end_ms'].iloc[-1] / 1000)
+    steady[0] = False
+    power = shelly['power'].to_numpy(dtype=float)
+    if not steady.any():
+        return None
+    spike = steady & (power > np.percentile(power[steady], SPIKE_PERCENTILE))
+    indices = np.flatnonzero(spike)
+    spikes = pd.DataFrame({'benchmark': run['benchmark'], 'configuration': run['configuration'],
+                           'timestamp': run['timestamp'], 'processor': run['processor'],
+                           'time_s': times[indices], 'power_w': power[indices]})
+    for kind in EVENT_KINDS:
+        selected = events[events['kind'] == kind]
+        union_starts, union_ends = merge_intervals(selected['start_ms'].to_numpy() / 1000,
+                                                   selected['end_ms'].to_numpy() / 1000)
+        spikes[f'with_{kind}'] = covered_time(union_starts, union_ends, times[indices - 1], times[indices]) > 0
+    return spikes
+
+
+def summarize(iterations, spikes=None):
+    """
+    Per run: time and energy in GC pauses, safepoints and compilation over the steady-state and their
+    share of the total, slow iterations per cause (all iterations) and power spikes with overlapping events.
+    """
+    keys = ['benchmark', 'configuration', 'timestamp', 'processor']
+    steady = iterations[iterations['steady_state']]
+    columns = {'iterations': ('duration_s', 'size'), 'duration_s': ('duration_s', 'sum')}
+    for kind in EVENT_KINDS:
+        columns[f'{kind}_s'] = (f'{kind}_s', 'sum')
+        for energy in ('energy_j', 'rapl_energy_j'):
+            if f'{kind}_{energy}' in steady:
+                columns[f'{kind}_{energy}'] = (f'{kind}_{energy}', 'sum')
+    for energy in ('energy_j', 'rapl_energy_j'):
+        if energy in steady:
+            columns[energy] = (energy, 'sum')
+    summary = steady.groupby(keys).agg(**columns)
+    for kind in ('gc_pause', 'safepoint', 'jit'):
+        summary[f'{kind}_share'] = summary[f'{kind}_s'] / summary['duration_s']
+        if 'energy_j' in summary:
+            summary[f'{kind}_energy_share'] = summary[f'{kind}_energy_j'] / summary['energy_j']
+    causes = pd.crosstab([iterations[k] for k in keys], iterations['cause']).drop(columns='', errors='ignore')
+    summary = summary.join(causes.rename(columns=lambda c: f'slow_{c}')).fillna(
+        {f'slow_{c}': 0 for c in causes.columns})
+    if spikes is not None and not spikes.empty:
+        spike_counts = spikes.groupby(keys).agg(power_spikes=('power_w', 'size'),
+                                                **{f'spikes_with_{kind}': (f'with_{kind}', 'sum')
+                                                   for kind in EVENT_KINDS})
+        summary = summary.join(spike_counts)
+    return summary.reset_index()
+
+
+def collect_iteration_events(work_dir='./'):
+    """
+    Iterations of all runs with GC log or JFR recording (see iteration_events), with slow iterations attributed,
+    and their power spikes.
+    """
+    frames, spikes = [], []
+    for run in discover_runs(work_dir):
+        result = iteration_events(run)
+        if result is None:
+            continue
+        frames.append(result[0])
+        run_spikes = power_spikes(run, result[1])
+        if run_spikes is not None:
+            spikes.append(run_spikes)
+    if not frames:
+        return pd.DataFrame(), None
+    iterations = attribute_slow_iterations(pd.concat(frames, ignore_index=True))
+    return iterations, pd.concat(spikes, ignore_index=True) if spikes else None
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--work-dir', default='./', help='directory containing the result folders')
+    parser.add_argument('--output', default='iterationJvmEvents.csv', help='CSV file with one row per iteration')
+    args = parser.parse_args()
+
+    iterations, spikes = collect_iteration_events(args.work_dir)
+    if iterations.empty:
+        print("No runs with GC logs (gcLog_*.log) or JFR recordings (jvmEvents_*.jfr) found.")
+    else:
+        pd.set_option('display.width', 250)
+        print(summarize(iterations, spikes).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+        iterations.to_csv(args.output, index=False)
+        print(f"Iteration JVM events were successfully saved as CSV: {args.output}")
@@ -0,0 +1,220 @@
+import json
+import re
+
+import pandas as pd
+
+from enviroinfo.profiling import profiled
+
+# Rows per chunk of the streaming readers (iter_*), bounds their memory use independent of the file size
+CHUNK_ROWS = 100_000
+
+RENAISSANCE_DTYPES = {'benchmark': 'category', 'duration_ns': 'int64', 'uptime_ns': 'int64',
+                      'vm_start_unix_ms': 'int64'}
+PROCFS_COLUMNS = ['SourceFile', 'Timestamp', 'userTime (Ticks)', 'systemTime (Ticks)']
+PROCFS_DTYPES = {'SourceFile': 'category', 'Timestamp': 'int64', 'userTime (Ticks)': 'int64',
+                 'systemTime (Ticks)': 'int64'}
+SHELLY_COLUMNS = ['ip', 'timestamp_s', 'power', 'energy']
+# Shelly timestamps are whole seconds, but scaled simulations write milliseconds
+SHELLY_DTYPES = {'timestamp_s': 'float64', 'power': 'float32'}
+SHELLY_FILE_DTYPES = {'ip': 'category', **SHELLY_DTYPES, 'energy': 'float64'}
+TELEMETRY_DTYPES = {'Timestamp': 'float64', 'Source': 'category', 'Kind': 'category', 'Value': 'float64'}
+RAPL_COLUMNS = ['Timestamp', 'Power (Watts)', 'Energy (micro joules)']
+RAPL_DTYPES = {'Timestamp': 'int64', 'Power (Watts)': 'float32', 'Energy (micro joules)': 'int64'}
+# All columns of a raplResults_* file, the DRAM columns are missing on machines without a DRAM domain
+RAPL_FILE_DTYPES = {**RAPL_DTYPES, 'Domain': 'category', 'DRAM Power (Watts)': 'float32',
+                    'DRAM Energy (micro joules)': 'int64'}
+# Unified JVM log line with the decorators time, uptimenanos, level and tags (each optional except tags)
+GC_LOG_LINE = re.compile(r'^(?:\[(?P<time>\d{4}-[^\]]+)\])?(?:\[(?P<uptime_ns>\d+)ns\])?(?:\[(?P<level>[a-z]+)\s*\])?'
+                         r'\[(?P<tags>[a-z0-9_,]+)\s*\]\s*(?P<message>.*)$')
+GC_PAUSE_MESSAGE = re.compile(r'^GC\((?P<gc_id>\d+)\) (?P<name>(?:Pause|Concurrent) .+?)'
+                              r'(?: \d+[KMG]->\d+[KMG]\(\d+[KMG]\))? (?P<duration_ms>[\d.]+)ms$')
+SAFEPOINT_MESSAGE = re.compile(r'^Safepoint "(?P<name>[^"]+)".*Total: (?P<duration_ns>\d+) ns$')
+
+
+@profiled()
+def read_renaissance(renaissance_file, benchmark_name=None, start_index=0):
+    """
+    Reads a renaissanceOutput_*.csv file and adds the iteration window in unix milliseconds.
+
+    :param benchmark_name: Only keep iterations of this benchmark (None keeps all)
+    :param start_index: Number of warm-up iterations to skip
+    """
+    df = pd.read_csv(renaissance_file, dtype=RENAISSANCE_DTYPES)
+    if benchmark_name is not None:
+        df = df[df['benchmark'] == benchmark_name]
+    df = df.iloc[start_index:].copy()
+    df['start_ms'] = df['vm_start_unix_ms'] + df['uptime_ns'] / 1_000_000
+    df['end_ms'] = df['start_ms'] + df['duration_ns'] / 1_000_000
+    df['duration_s'] = df['duration_ns'] / 1_000_000_000
+    return df
+
+
+@profiled()
+def read_procfs(procfs_file):
+    """
+    Reads a procfsResults_* file, SourceFile is categorical as it only holds a few distinct paths.
+    """
+    return pd.read_csv(procfs_file, usecols=PROCFS_COLUMNS, dtype=PROCFS_DTYPES)
+
+
+def read_timer(timer_file):
+    """
+    Returns (start, end) in unix seconds from a timer_*.txt file, start is None if it was not recorded.
+    """
+    with open(timer_file) as f:
+        lines = [line.strip() for line in f.read().splitlines() if line.strip()]
+    try:
+        start = float(lines[0])
+    except (IndexError, ValueError):
+        start = None
+    try:
+        end = float(lines[-1])
+    except (IndexError, ValueError):
+        end = None
+    return start, end
+
+
+@profiled()
+def read_telemetry(telemetry_file):
+    """
+    Reads a telemetryResults_* file (core frequencies in kHz and thermal zone temperatures in millidegrees
+    Celsius, one row per source and sample), incomplete lines of an interrupted sampler are skipped.
+    """
+    return pd.read_csv(telemetry_file, dtype=TELEMETRY_DTYPES, on_bad_lines='skip').dropna()
+
+
+def read_timeline(timeline_file):
+    """
+    Reads the phase timeline written by the benchmark worker (timeline_*.json), one row per phase with
+    wall clock start and end in unix seconds and the monotonic duration.
+    """
+    with open(timeline_file) as f:
+        return pd.DataFrame(json.load(f)['phases'], columns=['phase', 'wall_start', 'wall_end', 'duration_s'])
+
+
+@profiled()
+def read_shelly(shelly_file, reference_start_s=None):
+    """
+    Reads a shellyReaderResults_* file (no header: ip, timestamp in s, power in W, energy counter).
+
+    Gen1 Shelly devices report local time instead of UTC. If reference_start_s (e.g. the start of the
+    timer file) is given, the timestamps are shifted by the whole number of hours between it and the
+    first sample.
+    """
+    try:
+        df = pd.read_csv(shelly_file, header=None, names=SHELLY_COLUMNS, dtype=SHELLY_FILE_DTYPES,
+                         skip_blank_lines=True)
+    except (ValueError, TypeError):
+        # lines that are no measurements (e.g. failed requests logged by the reader) are parsed as text and dropped
+        df = pd.read_csv(shelly_file, header=None, names=SHELLY_COLUMNS, dtype=str, on_bad_lines='skip',
+                         skip_blank_lines=True)
+        numeric = ['timestamp_s', 'power', 'energy']
+        df[numeric] = df[numeric].apply(pd.to_numeric, errors='coerce')
+        df = df.dropna(subset=['timestamp_s', 'power']).astype(SHELLY_FILE_DTYPES).reset_index(drop=True)
+    if reference_start_s is not None and not df.empty:
+        offset = round((df['timestamp_s'].iloc[0] - reference_start_s) / 3600) * 3600
+        df['timestamp_s'] = df['timestamp_s'] - offset
+    return df
+
+
+@profiled()
+def read_gc_log(gc_log_file):
+    """
+    Reads the GC pauses, concurrent GC cycles and safepoints from a unified JVM log (gcLog_*.log, written
+    with -Xlog:gc*,safepoint:file=...:time,uptimenanos,level,tags). Every event is logged when it ends.
+
+    :return: DataFrame with kind ('gc_pause', 'gc_concurrent' or 'safepoint'), name, duration_ms and the end
+             as JVM uptime in ns and as unix ms (NaN where the decorator is missing)
+    """
+    with open(gc_log_file, errors='replace') as f:
+        lines = pd.Series(f.read().splitlines(), dtype=object)
+    columns = ['kind', 'name', 'duration_ms', 'end_uptime_ns', 'end_ms']
+    parts = lines.str.extract(GC_LOG_LINE).dropna(subset=['tags'])
+    frames = []
+    gc = parts[parts['tags'] == 'gc']
+    pauses = gc['message'].str.extract(GC_PAUSE_MESSAGE).dropna(subset=['duration_ms'])
+    if not pauses.empty:
+        frames.append(pd.DataFrame({
+            'kind': pauses['name'].str.startswith('Pause').map({True: 'gc_pause', False: 'gc_concurrent'}),
+            'name': pauses['name'], 'duration_ms': pauses['duration_ms'].astype(float),
+        }, index=pauses.index))
+    safepoints = parts.loc[parts['tags'] == 'safepoint', 'message'].str.extract(SAFEPOINT_MESSAGE).dropna()
+    if not safepoints.empty:
+        frames.append(pd.DataFrame({'kind': 'safepoint', 'name': safepoints['name'],
+                                    'duration_ms': safepoints['duration_ns'].astype(float) / 1_000_000},
+                                   index=safepoints.index))
+    if not frames:
+        return pd.DataFrame(columns=columns)
+    events = pd.concat(frames).sort_index()
+    events['end_uptime_ns'] = pd.to_numeric(parts.loc[events.index, 'uptime_ns'], errors='coerce')
+    times = pd.to_datetime(parts.loc[events.index, 'time'], format='%Y-%m-%dT%H:%M:%S.%f%z', errors='coerce',
+                           utc=True)
+    events['end_ms'] = (times - pd.Timestamp(0, tz='UTC')).dt.total_seconds() * 1000
+    return events[columns].reset_index(drop=True)
+
+
+@profiled()
+def read_rapl(rapl_file):
+    """
+    Reads a raplResults_* file with compact dtypes, the column names are stripped of surrounding spaces.
+    """
+    df = pd.read_csv(rapl_file, header=0, skip_blank_lines=True, skipinitialspace=True,
+                     usecols=lambda column: column.strip() in RAPL_FILE_DTYPES, dtype=RAPL_FILE_DTYPES)
+    df.columns = df.columns.str.strip()
+    return df
+
+
+@profiled()
+def read_rapl_high_rate(rapl_file):
+    """
+    Reads a raplHighRate_* file of rapl_sampler.py (timestamp in ns and the unwrapped energy counter of every
+    powercap domain in micro joules), the column names are stripped of the unit. Incomplete lines (e.g. of a
+    sampler that was killed) are skipped.
+    """
+    df = pd.read_csv(rapl_file, header=0, on_bad_lines='skip', skip_blank_lines=True)
+    df.columns = df.columns.str.replace(r'\s*\((ns|micro joules)\)$', '', regex=True).str.strip()
+    df = df.apply(pd.to_numeric, errors='coerce').dropna().astype('int64')
+    return df.reset_index(drop=True)
+
+
+def _strip_columns(chunks):
+    for chunk in chunks:
+        chunk.columns = chunk.columns.str.strip()
+        yield chunk
+
+
+def iter_procfs(procfs_file, chunksize=CHUNK_ROWS):
+    """
+    Yields a procfsResults_* file in chunks of at most chunksize rows with compact dtypes.
+    """
+    yield from pd.read_csv(procfs_file, usecols=PROCFS_COLUMNS, dtype=PROCFS_DTYPES, chunksize=chunksize)
+
+
+def iter_shelly(shelly_file, chunksize=CHUNK_ROWS, reference_start_s=None):
+    """
+    Yields the timestamp and power columns of a shellyReaderResults_* file in chunks, lines that are no
+    measurements (including fields that are not numbers, like read_shelly) are skipped. The Gen1 clock offset
+    (see read_shelly) is taken from the first sample, Gen1 traces need reference_start_s.
+    """
+    offset = None
+    for chunk in pd.read_csv(shelly_file, header=None, names=SHELLY_COLUMNS, usecols=['timestamp_s', 'power'],
+                             dtype=str, chunksize=chunksize, on_bad_lines='skip'):
+        chunk = chunk.apply(pd.to_numeric, errors='coerce').dropna().astype(SHELLY_DTYPES)
+        if chunk.empty:
+            continue
+        if offset is None:
+            offset = 0 if reference_start_s is None else \
+                round((chunk['timestamp_s'].iloc[0] - reference_start_s) / 3600) * 3600
+        if offset:
+            chunk['timestamp_s'] -= offset
+        yield chunk
+
+
+def iter_rapl(rapl_file, chunksize=CHUNK_ROWS):
+    """
+    Yields the timestamp, package power and package energy counter of a raplResults_* file in chunks.
+    """
+    chunks = pd.read_csv(rapl_file, header=0, chunksize=chunksize, skipinitialspace=True,
+                         usecols=lambda column: column.strip() in RAPL_COLUMNS)
+    for chunk in _strip_columns(chunks):
+        yield chunk.astype(RAPL_DTYPES)
@@ -0,0 +1,159 @@
+"""
+Energy-efficiency metrics of the steady-state of every run in the results tree.
+
+Usage: python -m enviroinfo.metrics [--work-dir ./] [--output energyEfficiencyMetrics.csv] [--fill-gaps]
+The output format (CSV, Parquet or LaTeX) is chosen by the file extension. With --fill-gaps the energy of
+iterations without Shelly data is estimated with the power models of enviroinfo.powermodel, the number of
+such iterations is given in the column estimated_iterations.
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from enviroinfo.cache import disk_cached
+from enviroinfo.catalog import STEADY_STATE_START, discover_runs
+from enviroinfo.energy import baseline_power, counter_energy, interval_energy, local_baseline, rapl_counter
+from enviroinfo.loaders import read_renaissance, read_shelly, read_timer
+from enviroinfo.powermodel import estimate_iteration_energy, fit_power_models
+
+METRIC_COLUMNS = [
+    'benchmark', 'configuration', 'timestamp', 'processor', 'iterations', 'estimated_iterations', 'median_duration_s',
+    'mean_power_w', 'energy_per_iteration_j', 'edp_js', 'iterations_per_j',
+    'dynamic_energy_per_iteration_j', 'dynamic_iterations_per_j',
+    'rapl_energy_per_iteration_j', 'rapl_dynamic_energy_per_iteration_j', 'rapl_sampling', 'baseline',
+    'static_power_w',
+]
+
+
+def _mean(values):
+    values = values[~np.isnan(values)]
+    return values.mean() if len(values) else np.nan
+
+
+def steady_state_iterations(run):
+    """
+    Steady-state iterations of a run (see read_renaissance), None if there are none.
+    """
+    if not run['files']['renaissance']:
+        return None
+    iterations = read_renaissance(run['files']['renaissance'], run['benchmark'],
+                                  STEADY_STATE_START.get(run['benchmark'], 0))
+    return None if iterations.empty else iterations
+
+
+def shelly_iteration_energy(run, iterations):
+    """
+    Wall energy in joules of every iteration, NaN where no Shelly samples cover it.
+    """
+    files = run['files']
+    if not files['shelly']:
+        return np.full(len(iterations), np.nan)
+    timer_start = read_timer(files['timer'])[0] if files['timer'] else None
+    shelly = read_shelly(files['shelly'], timer_start)
+    return interval_energy(shelly['timestamp_s'], shelly['power'],
+                           iterations['start_ms'].to_numpy() / 1000, iterations['end_ms'].to_numpy() / 1000)
+
+
+@disk_cached(lambda a: a['run']['files'].values())
+def run_metrics(run, baselines, power_model=None):
+    """
+    Steady-state metrics of one run, None if the run has no Renaissance results.
+
+    Energy per iteration and the energy-delay product are averaged over the steady-state
+    iterations. The dynamic energy subtracts the idle power and the power drawn by the
+    monitors over the duration of each iteration, taken from the idle windows of the run
+    if it has them (baseline 'local') and from the baseline measurements otherwise ('campaign').
+    If a power model is given, iterations without Shelly data get the model estimate.
+    The RAPL energy comes from the high-rate samples if recorded (rapl_sampling 'high_rate').
+    """
+    iterations = steady_state_iterations(run)
+    if iterations is None:
+        return None
+    starts_s = iterations['start_ms'].to_numpy() / 1000
+    ends_s = iterations['end_ms'].to_numpy() / 1000
+    durations_s = iterations['duration_s'].to_numpy()
+    baseline = baselines.get(run['arch'], {})
+    local = local_baseline(run)
+    if local:
+        static_w, rapl_idle_w = local['static_w'], local['rapl_idle_w']
+    else:
+        static_w = baseline.get('idle_w', np.nan) + baseline.get('monitor_overhead_w', np.nan)
+        rapl_idle_w = baseline.get('rapl_idle_w', np.nan)
+
+    metrics = {
+        'benchmark': run['benchmark'],
+        'configuration': run['configuration'],
+        'timestamp': run['timestamp'],
+        'processor': run['processor'],
+        'iterations': len(iterations),
+        'median_duration_s': np.median(durations_s),
+    }
+    energy = shelly_iteration_energy(run, iterations)
+    metrics['estimated_iterations'] = 0
+    if power_model and np.isnan(energy).any():
+        estimated = estimate_iteration_energy(run, iterations, power_model)
+        fill = np.isnan(energy) & ~np.isnan(estimated)
+        energy = np.where(fill, estimated, energy)
+        metrics['estimated_iterations'] = int(fill.sum())
+    metrics['baseline'] = 'local' if local else 'campaign'
+    metrics['static_power_w'] = static_w
+    measured = ~np.isnan(energy)
+    metrics['mean_power_w'] = energy[measured].sum() / durations_s[measured].sum() if measured.any() else np.nan
+    metrics['energy_per_iteration_j'] = _mean(energy)
+    metrics['edp_js'] = _mean(energy * durations_s)
+    metrics['iterations_per_j'] = 1 / metrics['energy_per_iteration_j']
+    metrics['dynamic_energy_per_iteration_j'] = _mean(energy - static_w * durations_s)
+    metrics['dynamic_iterations_per_j'] = 1 / metrics['dynamic_energy_per_iteration_j']
+
+    metrics['rapl_energy_per_iteration_j'] = np.nan
+    metrics['rapl_dynamic_energy_per_iteration_j'] = np.nan
+    metrics['rapl_sampling'] = None
+    counter = rapl_counter(run)
+    if counter:
+        timestamps_s, counter_uj, metrics['rapl_sampling'] = counter
+        rapl_energy = counter_energy(timestamps_s, counter_uj, starts_s, ends_s)
+        metrics['rapl_energy_per_iteration_j'] = _mean(rapl_energy)
+        metrics['rapl_dynamic_energy_per_iteration_j'] = _mean(
+            rapl_energy - rapl_idle_w * durations_s)
+    return metrics
+
+
+def collect_metrics(work_dir='./', fill_gaps=False):
+    """
+    Returns one row per run and architecture with the metrics of run_metrics.
+
+    :param fill_gaps: Estimate the energy of iterations without Shelly data with a power model per architecture
+    """
+    baselines = baseline_power(work_dir)
+    models = fit_power_models(work_dir, rapl=True) if fill_gaps else {}
+    rows = [m for m in (run_metrics(run, baselines, models.get(run['arch'])) for run in discover_runs(work_dir)) if m]
+    return pd.DataFrame(rows, columns=METRIC_COLUMNS)
+
+
+def write_table(df, output):
+    # Parquet (pyarrow) and LaTeX (jinja2) output rely on optional pandas dependencies
+    try:
+        if output.endswith('.parquet'):
+            df.to_parquet(output, index=False)
+        elif output.endswith('.tex'):
+            df.to_latex(output, index=False, float_format='%.3f', na_rep='--')
+        else:
+            df.to_csv(output, index=False)
+    except ImportError as e:
+        raise SystemExit(f"Cannot write {output}: {e}")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--work-dir', default='./', help='directory containing the result folders')
+    parser.add_argument('--output', default='energyEfficiencyMetrics.csv',
+                        help='output file, .csv, .parquet or .tex')
+    parser.add_argument('--fill-gaps', action='store_true',
+                        help='estimate the energy of iterations without Shelly data with a power model')
+    args = parser.parse_args()
+
+    metrics = collect_metrics(args.work_dir, args.fill_gaps)
+    pd.set_option('display.width', 250)
+    print(metrics.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+    write_table(metrics, args.output)
+    print(f"Metrics were successfully saved: {args.output}")
@@ -0,0 +1,181 @@
+"""
+Measurement overhead of the monitors per sampling interval from the idle windows of the overhead profiler
+(experiment_automation/baseline-measurement.py --overhead) and the highest sampling rate within a budget.
+
+Every window records the wall power (Shelly) and, every 30 s after a settle period, the CPU ticks of the
+machine and of the monitor processes. The intervals between two tick readings are the batches: per window the
+mean wall power, the CPU utilization of the machine and the CPU share of the monitors are averaged over the
+batches with a Student t confidence interval. The overhead of a window is its difference to the window without
+monitors on the same machine (confidence intervals combined as for a difference of independent means). For every
+monitor set the smallest sampling interval is recommended whose upper confidence bound stays within the power
+budget (percent of the idle power) and the CPU budget (percentage points of the machine's CPU time). Windows
+whose readers did not sample at the requested interval (interval_honoured, measured from their output by the
+profiler) are reported but never recommended.
+
+Usage: python -m enviroinfo.overhead [--work-dir ./] [--timestamp dd-mm-yyyyHH-MM-SS] [--budget 1.0]
+                                     [--cpu-budget 1.0] [--output measurementOverhead.csv]
+"""
+import argparse
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from scipy.stats import t
+
+from enviroinfo.catalog import ARCHITECTURES, parse_timestamp, run_files
+from enviroinfo.loaders import read_shelly, read_timer
+from enviroinfo.metrics import write_table
+
+OVERHEAD_ROOT = 'baseline-measurement_overhead'
+CONFIDENCE = 0.95
+DEFAULT_BUDGET_PERCENT = 1.0
+DEFAULT_CPU_BUDGET_PERCENT = 1.0
+
+
+def confidence_interval(values, confidence=CONFIDENCE):
+    """Mean and half width of the Student t confidence interval, NaN half width for fewer than two values."""
+    values = np.asarray(values, dtype=float)
+    values = values[~np.isnan(values)]
+    if len(values) == 0:
+        return np.nan, np.nan
+    if len(values) < 2:
+        return values.mean(), np.nan
+    return values.mean(), t.ppf((1 + confidence) / 2, len(values) - 1) * values.std(ddof=1) / np.sqrt(len(values))
+
+
+def find_overhead_profile(work_dir='./', timestamp=None):
+    """Folder of the latest (or the given) overhead profile, None if there is none."""
+    root = os.path.join(work_dir, OVERHEAD_ROOT)
+    if not os.path.isdir(root):
+        return None
+    timestamps = [ts for ts in os.listdir(root) if parse_timestamp(ts)]
+    if timestamp:
+        return os.path.join(root, timestamp) if timestamp in timestamps else None
+    return os.path.join(root, max(timestamps, key=parse_timestamp)) if timestamps else None
+
+
+def window_batches(path, arch):
+    """
+    Batches between consecutive CPU tick readings of one window with mean wall power, CPU utilization
+    of the machine and CPU share of the monitors in percent, None if the window was not completed.
+    """
+    files = run_files(path, arch)
+    window_file = os.path.join(path, f"overheadWindow{ARCHITECTURES[arch]['postfix']}.json")
+    if not os.path.exists(window_file) or not files['shelly']:
+        return None
+    with open(window_file) as f:
+        window = json.load(f)
+    ticks = pd.DataFrame(window['ticks'])
+    if len(ticks) < 2:
+        return None
+    timer_start = read_timer(files['timer'])[0] if files['timer'] else None
+    shelly = read_shelly(files['shelly'], timer_start)
+    starts, ends = ticks['time'].to_numpy()[:-1], ticks['time'].to_numpy()[1:]
+    # mean of the power samples within each batch, one searchsorted per bound instead of a mask per batch
+    timestamps = shelly['timestamp_s'].to_numpy()
+    cumulative = np.concatenate(([0.0], np.cumsum(shelly['power'].to_numpy())))
+    lo, hi = np.searchsorted(timestamps, starts, side='left'), np.searchsorted(timestamps, ends, side='left')
+    with np.errstate(invalid='ignore', divide='ignore'):
+        power = np.where(hi > lo, (cumulative[hi] - cumulative[lo]) / (hi - lo), np.nan)
+    total = ticks['total'].diff().to_numpy()[1:]
+    return pd.DataFrame({
+        'monitors': '+'.join(m.lower() for m in window['monitors']) or 'none',
+        'interval_ms': window['interval_ms'],
+        # longest median interval of the readers, NaN and None for profiles recorded before it was measured
+        'measured_interval_ms': max((v for v in window.get('measured_interval_ms', {}).values() if v is not None),
+                                    default=np.nan),
+        'interval_honoured': window.get('interval_honoured'),
+        'power_w': power,
+        'cpu_util_%': ticks['busy'].diff().to_numpy()[1:] / total * 100,
+        'monitor_cpu_%': ticks['monitors'].diff().to_numpy()[1:] / total * 100,
+    })
+
+
+def profile_windows(profile_dir, confidence=CONFIDENCE):
+    """
+    Mean and confidence half width of wall power, CPU utilization and monitor CPU share per window and architecture.
+    """
+    rows = []
+    for window in sorted(os.listdir(profile_dir)):
+        for arch in ARCHITECTURES:
+            path = os.path.join(profile_dir, window, arch)
+            batches = window_batches(path, arch) if os.path.isdir(path) else None
+            if batches is None:
+                continue
+            row = {'window': window, 'arch': arch, 'processor': ARCHITECTURES[arch]['processor'],
+                   'monitors': batches['monitors'].iloc[0], 'interval_ms': batches['interval_ms'].iloc[0],
+                   'measured_interval_ms': batches['measured_interval_ms'].iloc[0],
+                   'interval_honoured': batches['interval_honoured'].iloc[0], 'batches': len(batches)}
+            for column in ['power_w', 'cpu_util_%', 'monitor_cpu_%']:
+                row[column], row[f'{column}_ci'] = confidence_interval(batches[column], confidence)
+            rows.append(row)
+    return pd.DataFrame(rows)
+
+
+def relate_to_idle(windows):
+    """
+    Adds the power and CPU overhead against the window without monitors of the same architecture.
+    """
+    idle = windows[windows['monitors'] == 'none'].set_index('arch')
+    windows = windows.copy()
+    idle_power = windows['arch'].map(idle['power_w'])
+    windows['overhead_w'] = windows['power_w'] - idle_power
+    windows['overhead_w_ci'] = np.hypot(windows['power_w_ci'], windows['arch'].map(idle['power_w_ci']))
+    windows['overhead_%'] = windows['overhead_w'] / idle_power * 100
+    windows['overhead_%_ci'] = windows['overhead_w_ci'] / idle_power * 100
+    windows['cpu_overhead_%'] = windows['cpu_util_%'] - windows['arch'].map(idle['cpu_util_%'])
+    windows['cpu_overhead_%_ci'] = np.hypot(windows['cpu_util_%_ci'], windows['arch'].map(idle['cpu_util_%_ci']))
+    return windows
+
+
+def recommend_intervals(overhead, budget_percent=DEFAULT_BUDGET_PERCENT, cpu_budget_percent=DEFAULT_CPU_BUDGET_PERCENT):
+    """
+    Smallest sampling interval per architecture and monitor set whose upper confidence bounds of the power
+    and CPU overhead stay within the budgets, interval_ms is NaN if no interval does. Windows without a
+    confidence interval (a single batch) or whose readers ignored the requested interval are not within the budget.
+    """
+    monitored = overhead[overhead['monitors'] != 'none'].copy()
+    monitored['within_budget'] = \
+        (monitored['overhead_%'] + monitored['overhead_%_ci'] <= budget_percent) & \
+        (monitored['cpu_overhead_%'] + monitored['cpu_overhead_%_ci'] <= cpu_budget_percent) & \
+        monitored['interval_honoured'].ne(False)
+    rows = []
+    for (processor, monitors), group in monitored.groupby(['processor', 'monitors'], sort=True):
+        within = group[group['within_budget']].sort_values('interval_ms')
+        best = within.iloc[0] if not within.empty else None
+        rows.append({
+            'processor': processor, 'monitors': monitors,
+            'interval_ms': best['interval_ms'] if best is not None else np.nan,
+            'sampling_rate_hz': 1000 / best['interval_ms'] if best is not None else np.nan,
+            'overhead_%': best['overhead_%'] if best is not None else np.nan,
+            'cpu_overhead_%': best['cpu_overhead_%'] if best is not None else np.nan,
+        })
+    return pd.DataFrame(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--work-dir', default='./', help=f'directory containing {OVERHEAD_ROOT}')
+    parser.add_argument('--timestamp', help='overhead profile to analyse (default: latest)')
+    parser.add_argument('--budget', type=float, default=DEFAULT_BUDGET_PERCENT,
+                        help='allowed additional wall power in percent of the idle power')
+    parser.add_argument('--cpu-budget', type=float, default=DEFAULT_CPU_BUDGET_PERCENT,
+                        help='allowed additional CPU utilization in percentage points')
+    parser.add_argument('--confidence', type=float, default=CONFIDENCE)
+    parser.add_argument('--output', default='measurementOverhead.csv', help='table, .csv, .parquet or .tex')
+    args = parser.parse_args()
+
+    profile_dir = find_overhead_profile(args.work_dir, args.timestamp)
+    windows = profile_windows(profile_dir, args.confidence) if profile_dir else pd.DataFrame()
+    if windows.empty or 'none' not in set(windows['monitors']):
+        print(f"No completed overhead profile with an idle window found in {OVERHEAD_ROOT}.")
+    else:
+        overhead = relate_to_idle(windows)
+        pd.set_option('display.width', 250)
+        print(overhead.drop(columns=['window', 'arch']).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+        print(f"\nHighest sampling rate within {args.budget} % power and {args.cpu_budget} % CPU overhead:")
+        print(recommend_intervals(overhead, args.budget, args.cpu_budget)
+              .to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+        write_table(overhead, args.output)
+        print(f"Measurement overhead was successfully saved: {args.output}")
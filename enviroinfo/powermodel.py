@@ -0,0 +1,140 @@
+"""
+Per-host models of the wall power (Shelly) as a function of the CPU utilization, used to estimate the
+energy of windows in which the Shelly data is missing.
+
+The models are linear in the features (system-wide CPU utilization by default, optionally RAPL package
+power or other columns of the aligned frame) and fitted with one least-squares solve over the aligned
+samples of all runs of a host, including the baseline measurement with running monitors. They are
+validated by leave-one-run-out cross-validation.
+
+Usage: python -m enviroinfo.powermodel [--work-dir ./] [--rapl] [--output powerModels.json]
+"""
+import argparse
+import json
+
+import numpy as np
+import pandas as pd
+
+from enviroinfo.catalog import ARCHITECTURES, discover_runs, find_baseline
+from enviroinfo.energy import MONITOR_BASELINE, interval_energy
+from enviroinfo.resample import aligned_folder, aligned_run
+
+# Grid used for fitting, coarser than the sampling to smooth the reporting delay of the Shelly devices
+MODEL_GRID_S = 5.0
+DEFAULT_FEATURES = ['system_cpu_usage']
+
+
+def training_frames(work_dir='./', grid_s=MODEL_GRID_S):
+    """
+    Aligned frames of all runs and the monitored baseline per architecture, as dict arch -> [(name, frame)].
+    """
+    frames = {arch: [] for arch in ARCHITECTURES}
+    for run in discover_runs(work_dir):
+        frames[run['arch']].append((f"{run['benchmark']}/{run['configuration']}/{run['timestamp']}",
+                                    aligned_run(run, grid_s)))
+    for arch, path in find_baseline(work_dir, MONITOR_BASELINE).items():
+        frames[arch].append((MONITOR_BASELINE, aligned_folder(path, arch, grid_s)))
+    return frames
+
+
+def _design(frame, features):
+    return np.column_stack([np.ones(len(frame))] + [frame[f].to_numpy(dtype=float) for f in features])
+
+
+def _samples(frames, features):
+    """Stacks the usable samples (all features and the wall power present) of all frames."""
+    X, y, groups = [], [], []
+    for index, (_, frame) in enumerate(frames):
+        if frame.empty or 'shelly_power_w' not in frame or any(f not in frame for f in features):
+            continue
+        usable = frame.dropna(subset=features + ['shelly_power_w'])
+        X.append(_design(usable, features))
+        y.append(usable['shelly_power_w'].to_numpy(dtype=float))
+        groups.append(np.full(len(usable), index))
+    if not X:
+        return np.empty((0, len(features) + 1)), np.empty(0), np.empty(0)
+    return np.concatenate(X), np.concatenate(y), np.concatenate(groups)
+
+
+def fit_power_model(frames, features=DEFAULT_FEATURES):
+    """
+    Fits wall power = c0 + sum(c_i * feature_i) over all frames of one host and cross-validates it
+    by leaving out one run at a time.
+
+    :return: Model dict (features, coefficients, training samples, cross-validated RMSE and MAPE), None without data
+    """
+    features = list(features)
+    X, y, groups = _samples(frames, features)
+    if len(y) <= X.shape[1]:
+        return None
+    coefficients = np.linalg.lstsq(X, y, rcond=None)[0]
+
+    residuals = []
+    for group in np.unique(groups):
+        train, test = groups != group, groups == group
+        if train.sum() <= X.shape[1]:
+            continue
+        fold = np.linalg.lstsq(X[train], y[train], rcond=None)[0]
+        residuals.append((X[test] @ fold - y[test], y[test]))
+    errors = np.concatenate([r for r, _ in residuals]) if residuals else np.array([np.nan])
+    actual = np.concatenate([a for _, a in residuals]) if residuals else np.array([np.nan])
+    return {
+        'features': features,
+        'coefficients': coefficients.tolist(),
+        'samples': int(len(y)),
+        'runs': int(len(np.unique(groups))),
+        'cv_rmse_w': float(np.sqrt(np.mean(errors ** 2))),
+        'cv_mape_%': float(np.mean(np.abs(errors) / actual) * 100),
+    }
+
+
+def fit_power_models(work_dir='./', features=DEFAULT_FEATURES, rapl=False):
+    """
+    Fits one model per architecture. With rapl=True the RAPL package power is added as a feature
+    on the architectures that provide it.
+    """
+    models = {}
+    for arch, frames in training_frames(work_dir).items():
+        arch_features = list(features)
+        if rapl and any('rapl_power_w' in frame for _, frame in frames):
+            arch_features.append('rapl_power_w')
+        models[arch] = fit_power_model(frames, arch_features)
+    return models
+
+
+def predict_power(frame, model):
+    """
+    Predicted wall power for the rows of an aligned frame, NaN where a feature is missing.
+    """
+    if any(f not in frame for f in model['features']):
+        return np.full(len(frame), np.nan)
+    return _design(frame, model['features']) @ np.asarray(model['coefficients'])
+
+
+def estimate_iteration_energy(run, iterations, model, grid_s=1.0):
+    """
+    Model-based energy in joules of every iteration of a run, from the predicted power on the aligned grid.
+    """
+    frame = aligned_run(run, grid_s)
+    if frame.empty:
+        return np.full(len(iterations), np.nan)
+    predicted = predict_power(frame, model)
+    known = ~np.isnan(predicted)
+    middles = frame['time_s'].to_numpy() + grid_s / 2
+    return interval_energy(middles[known], predicted[known], iterations['start_ms'].to_numpy() / 1000,
+                           iterations['end_ms'].to_numpy() / 1000, max_gap_s=2 * grid_s)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--work-dir', default='./', help='directory containing the result folders')
+    parser.add_argument('--rapl', action='store_true', help='use the RAPL package power as additional feature')
+    parser.add_argument('--output', default='powerModels.json', help='JSON file for the fitted models')
+    args = parser.parse_args()
+
+    models = fit_power_models(args.work_dir, rapl=args.rapl)
+    rows = [{'arch': arch, **model} for arch, model in models.items() if model]
+    print(pd.DataFrame(rows).to_string(index=False))
+    with open(args.output, 'w') as f:
+        json.dump(models, f, indent=2)
+    print(f"Models were successfully saved as JSON: {args.output}")
@@ -0,0 +1,146 @@
+"""
+Lightweight timing and memory instrumentation of the analysis stages.
+
+Stages are wrapped in span() context managers or decorated with profiled(). While profiling is disabled
+(the default) a span costs one attribute check. After enable(), every span records its wall time, CPU
+time, peak traced memory (tracemalloc) and, where the stage reports it, the number of rows processed.
+The spans are written in the Chrome trace event format (open in chrome://tracing or https://ui.perfetto.dev)
+and summarized per stage.
+
+Enable it on the command line with: python -m enviroinfo --profile trace.json <subcommand> ...
+"""
+import functools
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+
+_state = {'enabled': False, 'events': [], 'stack': []}
+_lock = threading.Lock()
+
+
+def enable():
+    """Starts recording spans (and tracing memory allocations)."""
+    _state['enabled'] = True
+    if not tracemalloc.is_tracing():
+        tracemalloc.start()
+
+
+def is_enabled():
+    return _state['enabled']
+
+
+def events():
+    """Recorded spans as Chrome trace 'complete' events."""
+    return list(_state['events'])
+
+
+def merge(recorded):
+    """Adds spans recorded in another process (see traced_call)."""
+    with _lock:
+        _state['events'].extend(recorded)
+
+
+def _fold_peak():
+    # tracemalloc has a single peak, so the peak reached so far is folded into every open span before it is reset
+    _, peak = tracemalloc.get_traced_memory()
+    for frame in _state['stack']:
+        frame['peak'] = max(frame['peak'], peak)
+    tracemalloc.reset_peak()
+
+
+@contextmanager
+def span(name, category='analysis', **args):
+    """
+    Records one stage. The yielded dict can be filled with further details, e.g. record['rows'] = len(df).
+    """
+    record = dict(args)
+    if not _state['enabled']:
+        yield record
+        return
+    _fold_peak()
+    frame = {'peak': tracemalloc.get_traced_memory()[0]}
+    _state['stack'].append(frame)
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    try:
+        yield record
+    finally:
+        wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+        _fold_peak()
+        _state['stack'].pop()
+        record.update({'cpu_ms': round(cpu * 1000, 3), 'peak_memory_mb': round(frame['peak'] / 2 ** 20, 3)})
+        with _lock:
+            _state['events'].append({
+                'name': name, 'cat': category, 'ph': 'X', 'pid': os.getpid(), 'tid': threading.get_ident(),
+                'ts': round((time.time() - wall) * 1_000_000), 'dur': round(wall * 1_000_000),
+                'args': {key: value if isinstance(value, (int, float, bool)) or value is None else str(value)
+                         for key, value in record.items()},
+            })
+
+
+def profiled(name=None, rows=len):
+    """
+    Decorator recording every call of a function as a span named after it.
+
+    :param rows: Function of the result returning the number of rows processed, None to not record rows
+    """
+    def decorator(func):
+        span_name = name or f'{func.__module__.rsplit(".", 1)[-1]}.{func.__name__}'
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not _state['enabled']:
+                return func(*args, **kwargs)
+            with span(span_name) as record:
+                result = func(*args, **kwargs)
+                if rows is not None and result is not None:
+                    try:
+                        record['rows'] = rows(result)
+                    except TypeError:
+                        pass
+                return result
+        return wrapper
+    return decorator
+
+
+def traced_call(enabled, func, *args):
+    """
+    Calls func in a worker process, with profiling enabled there if it is in the parent.
+
+    :return: (result, spans recorded in the worker), merge the spans in the parent with merge()
+    """
+    if not enabled:
+        return func(*args), []
+    enable()
+    _state['events'] = []
+    return func(*args), events()
+
+
+def summary():
+    """Wall time, CPU time, rows and peak memory aggregated per stage, sorted by total wall time."""
+    stages = {}
+    for event in _state['events']:
+        stage = stages.setdefault(event['name'], {'stage': event['name'], 'calls': 0, 'wall_ms': 0.0,
+                                                  'cpu_ms': 0.0, 'rows': 0, 'peak_memory_mb': 0.0})
+        stage['calls'] += 1
+        stage['wall_ms'] += event['dur'] / 1000
+        stage['cpu_ms'] += event['args'].get('cpu_ms', 0.0)
+        stage['rows'] += event['args'].get('rows', 0) or 0
+        stage['peak_memory_mb'] = max(stage['peak_memory_mb'], event['args'].get('peak_memory_mb', 0.0))
+    return sorted(stages.values(), key=lambda s: s['wall_ms'], reverse=True)
+
+
+def format_summary():
+    lines = [f"{'stage':<36} {'calls':>6} {'wall ms':>10} {'cpu ms':>10} {'rows':>10} {'peak MB':>9}"]
+    for s in summary():
+        lines.append(f"{s['stage']:<36} {s['calls']:>6} {s['wall_ms']:>10.1f} {s['cpu_ms']:>10.1f} "
+                     f"{s['rows']:>10} {s['peak_memory_mb']:>9.1f}")
+    return '\n'.join(lines)
+
+
+def write_trace(path):
+    """Writes the recorded spans as Chrome trace JSON."""
+    with open(path, 'w') as f:
+        json.dump({'traceEvents': _state['events'], 'displayTimeUnit': 'ms'}, f)
@@ -0,0 +1,223 @@
+"""
+Local query service answering filtered aggregate queries over the results tree as JSON or CSV.
+
+A query selects runs by benchmark, configuration, architecture and timestamp (optionally only the latest run
+of each kind) and aggregates one steady-state metric (duration, cpu or energy, see enviroinfo.figures) per
+group. The selection is pushed down to the walk of the results tree, so only the folders of matching runs are
+listed and only the files the metric is derived from are read, through the disk cache of derived results.
+Answers are kept in an in-memory LRU keyed by the query and the modification times of the selected files,
+so repeated queries return without touching the data again, changed or new runs are picked up.
+
+Usage: python -m enviroinfo.query [--work-dir ./] [--benchmark fj-kmeans] [--configuration CORE-LIMITED-CPU-4]
+                                  [--arch RISC] [--timestamp T] [--latest] [--metric duration] [--aggregate median]
+                                  [--group-by benchmark configuration processor] [--format json|csv]
+       python -m enviroinfo.query --serve [--port 8050]
+       then e.g. http://localhost:8050/query?benchmark=fj-kmeans&arch=RISC&configuration=CORE-LIMITED-CPU-4
+"""
+import argparse
+import csv
+import functools
+import io
+import json
+import os
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import numpy as np
+
+from enviroinfo.catalog import ARCHITECTURES, discover_runs, select_runs
+from enviroinfo.figures import METRICS, metric_values
+
+AGGREGATES = {
+    'median': np.median,
+    'mean': np.mean,
+    'min': np.min,
+    'max': np.max,
+    'std': lambda values: np.std(values, ddof=1) if len(values) > 1 else np.nan,
+    'p95': lambda values: np.percentile(values, 95),
+    'iqr': lambda values: np.subtract(*np.percentile(values, [75, 25])),
+    'count': len,
+}
+GROUP_KEYS = ['benchmark', 'configuration', 'processor', 'timestamp']
+DEFAULT_GROUP_BY = ('benchmark', 'configuration', 'processor')
+# Files each metric is derived from, their modification times invalidate the cached answers
+METRIC_FILES = {'duration': ['renaissance'], 'cpu': ['renaissance', 'procfs'],
+                'energy': ['renaissance', 'shelly', 'timer']}
+CACHE_SIZE = 256
+DEFAULT_PORT = 8050
+
+
+def _as_tuple(values):
+    """Criteria as a sorted tuple (hashable for the LRU), comma-separated strings are split."""
+    if not values:
+        return ()
+    if isinstance(values, str):
+        values = [values]
+    return tuple(sorted({value for item in values for value in item.split(',') if value}))
+
+
+def normalize(benchmark=None, configuration=None, arch=None, timestamp=None, latest=False, metric='duration',
+              aggregate='median', group_by=DEFAULT_GROUP_BY):
+    """
+    Validates a query and returns it as a hashable dict of tuples, raises ValueError for unknown values.
+    """
+    query = {'benchmark': _as_tuple(benchmark), 'configuration': _as_tuple(configuration), 'arch': _as_tuple(arch),
+             'timestamp': timestamp or None, 'latest': bool(latest), 'metric': metric, 'aggregate': aggregate,
+             'group_by': tuple(key for key in GROUP_KEYS if key in _as_tuple(group_by))}
+    if metric not in METRICS:
+        raise ValueError(f"Unknown metric {metric}, expected one of {', '.join(METRICS)}")
+    if aggregate not in AGGREGATES:
+        raise ValueError(f"Unknown aggregate {aggregate}, expected one of {', '.join(AGGREGATES)}")
+    unknown = set(query['arch']) - set(ARCHITECTURES)
+    if unknown:
+        raise ValueError(f"Unknown arch {', '.join(sorted(unknown))}, expected one of {', '.join(ARCHITECTURES)}")
+    if set(_as_tuple(group_by)) - set(GROUP_KEYS):
+        raise ValueError(f"Unknown group key, expected some of {', '.join(GROUP_KEYS)}")
+    return query
+
+
+def matching_runs(work_dir, query):
+    runs = discover_runs(work_dir, query['benchmark'], query['configuration'], query['arch'], query['timestamp'])
+    return select_runs(runs, latest=query['latest'])
+
+
+def _signature(runs, metric):
+    """Paths and modification times of the files the answer is derived from."""
+    signature = []
+    for run in runs:
+        for kind in METRIC_FILES[metric]:
+            file = run['files'][kind]
+            signature.append((file, os.stat(file).st_mtime_ns if file and os.path.exists(file) else None))
+    return tuple(signature)
+
+
+@functools.lru_cache(maxsize=CACHE_SIZE)
+def _answer(work_dir, query_items, signature):
+    query = dict(query_items)
+    groups = {}
+    for run in matching_runs(work_dir, query):
+        values = np.asarray(metric_values(run, query['metric']), dtype=float)
+        group = groups.setdefault(tuple(run[key] for key in query['group_by']), {'runs': 0, 'values': []})
+        group['runs'] += 1
+        group['values'].append(values[~np.isnan(values)])
+    rows = []
+    for key, group in sorted(groups.items()):
+        values = np.concatenate(group['values'])
+        value = AGGREGATES[query['aggregate']](values) if len(values) else np.nan
+        rows.append({**dict(zip(query['group_by'], key)), 'metric': query['metric'],
+                     'aggregate': query['aggregate'], 'value': None if np.isnan(value) else float(value),
+                     'runs': group['runs'], 'samples': len(values)})
+    return tuple(rows)
+
+
+def run_query(work_dir='./', **criteria):
+    """
+    Answers one query (see normalize for the criteria).
+
+    :return: Dict with the normalized query, one row per group, whether it came from the LRU and the time taken
+    """
+    started = time.perf_counter()
+    query = normalize(**criteria)
+    runs = matching_runs(work_dir, query)
+    hits = _answer.cache_info().hits
+    rows = _answer(os.path.realpath(work_dir), tuple(query.items()), _signature(runs, query['metric']))
+    return {'query': query, 'rows': list(rows), 'cached': _answer.cache_info().hits > hits,
+            'elapsed_ms': round((time.perf_counter() - started) * 1000, 3)}
+
+
+def to_csv(result):
+    output = io.StringIO()
+    columns = list(result['query']['group_by']) + ['metric', 'aggregate', 'value', 'runs', 'samples']
+    writer = csv.DictWriter(output, fieldnames=columns)
+    writer.writeheader()
+    writer.writerows(result['rows'])
+    return output.getvalue()
+
+
+def to_json(result):
+    return json.dumps(result, indent=2)
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    """
+    GET /query?benchmark=..&configuration=..&arch=..&timestamp=..&latest=1&metric=..&aggregate=..&group_by=..
+    &format=json|csv answers a query, GET /runs lists the matching runs, GET / the accepted values.
+    """
+    work_dir = './'
+
+    def do_GET(self):
+        url = urlparse(self.path)
+        parameters = parse_qs(url.query)
+        single = {key: values[-1] for key, values in parameters.items()}
+        criteria = {key: parameters[key] for key in ('benchmark', 'configuration', 'arch') if key in parameters}
+        criteria.update({key: single[key] for key in ('timestamp', 'metric', 'aggregate') if key in single})
+        criteria['latest'] = single.get('latest', '0') not in ('0', 'false', '')
+        if 'group_by' in parameters:
+            criteria['group_by'] = parameters['group_by']
+        try:
+            if url.path == '/query':
+                result = run_query(self.work_dir, **criteria)
+                if single.get('format') == 'csv':
+                    self._send(200, to_csv(result), 'text/csv')
+                else:
+                    self._send(200, to_json(result), 'application/json')
+            elif url.path == '/runs':
+                runs = matching_runs(self.work_dir, normalize(**criteria))
+                self._send(200, json.dumps([{key: run[key] for key in GROUP_KEYS + ['arch', 'path']}
+                                            for run in runs], indent=2), 'application/json')
+            elif url.path == '/':
+                self._send(200, json.dumps({'metrics': list(METRICS), 'aggregates': list(AGGREGATES),
+                                            'group_by': GROUP_KEYS, 'arch': list(ARCHITECTURES)}, indent=2),
+                           'application/json')
+            else:
+                self._send(404, json.dumps({'error': f'Unknown path {url.path}'}), 'application/json')
+        except ValueError as e:
+            self._send(400, json.dumps({'error': str(e)}), 'application/json')
+
+    def _send(self, status, body, content_type):
+        data = body.encode()
+        self.send_response(status)
+        self.send_header('Content-Type', f'{content_type}; charset=utf-8')
+        self.send_header('Content-Length', str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+
+def serve(work_dir='./', host='localhost', port=DEFAULT_PORT):
+    handler = type('Handler', (QueryHandler,), {'work_dir': work_dir})
+    server = ThreadingHTTPServer((host, port), handler)
+    print(f"Serving queries over {os.path.abspath(work_dir)} on http://{host}:{server.server_address[1]}/query")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--work-dir', default='./', help='directory containing the result folders')
+    parser.add_argument('--benchmark', nargs='+', help='benchmark names, e.g. fj-kmeans')
+    parser.add_argument('--configuration', nargs='+', help='run configurations, e.g. CORE-LIMITED-CPU-4')
+    parser.add_argument('--arch', nargs='+', choices=list(ARCHITECTURES))
+    parser.add_argument('--timestamp', help='run folder name, e.g. 06-06-202512-59-33')
+    parser.add_argument('--latest', action='store_true',
+                        help='only the latest run per benchmark, configuration and architecture')
+    parser.add_argument('--metric', choices=list(METRICS), default='duration')
+    parser.add_argument('--aggregate', choices=list(AGGREGATES), default='median')
+    parser.add_argument('--group-by', nargs='+', choices=GROUP_KEYS, default=list(DEFAULT_GROUP_BY))
+    parser.add_argument('--format', choices=['json', 'csv'], default='json')
+    parser.add_argument('--serve', action='store_true', help='answer queries over HTTP instead')
+    parser.add_argument('--host', default='localhost')
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    if args.serve:
+        serve(args.work_dir, args.host, args.port)
+    else:
+        result = run_query(args.work_dir, benchmark=args.benchmark, configuration=args.configuration, arch=args.arch,
+                           timestamp=args.timestamp, latest=args.latest, metric=args.metric,
+                           aggregate=args.aggregate, group_by=args.group_by)
+        print(to_csv(result) if args.format == 'csv' else to_json(result), end='' if args.format == 'csv' else '\n')
@@ -0,0 +1,182 @@
+"""
+Detects regressions of new runs against the earlier runs of the same benchmark, configuration and architecture.
+
+Steady-state iteration durations, per-second CPU utilization and per-iteration energy of a new run are
+compared with the pooled samples of all earlier runs using the Mann-Whitney U test. Consecutive samples of
+a run are autocorrelated (JIT, GC and thermal state carry over), so the test compares the means of
+non-overlapping blocks of BLOCK_SIZE consecutive samples instead of the raw samples. The p-values of all
+comparisons are adjusted with the Holm-Bonferroni method, the effect size is reported as Cliff's delta
+and as relative change of the median. Durations and energy are flagged as regression or improvement,
+CPU utilization has no better direction and a significant change is only flagged as change.
+
+Usage: python -m enviroinfo.regression [--work-dir ./] [--history DIR ...] [--timestamp TIMESTAMP]
+The exit code is REGRESSION_EXIT_CODE (3) if a regression was flagged, 1 if the check itself failed.
+"""
+import argparse
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from scipy.stats import mannwhitneyu
+
+from enviroinfo.catalog import STEADY_STATE_START, discover_runs, parse_timestamp
+from enviroinfo.cpu import calculate_cpu_usage
+from enviroinfo.metrics import shelly_iteration_energy, steady_state_iterations
+
+ALPHA = 0.05
+# Relative median change (in percent) below which a significant difference is not flagged
+MIN_CHANGE = 5.0
+# Exit code for a flagged regression, distinct from the 1 of an uncaught exception (e.g. a missing module)
+REGRESSION_EXIT_CODE = 3
+# Direction in which a metric gets worse, None for metrics without one: a higher CPU utilization can be more
+# work per iteration or better parallelism, a lower one less work or lost parallelism
+WORSE_IF_HIGHER = {'duration_s': True, 'cpu_usage': None, 'energy_j': True}
+# Consecutive samples averaged into one block (iterations, or procfs samples of about a second for cpu_usage),
+# long enough that the block means of a run are roughly independent
+BLOCK_SIZE = {'duration_s': 5, 'cpu_usage': 30, 'energy_j': 5}
+
+
+def block_means(values, size):
+    """
+    Means of the non-overlapping blocks of size consecutive samples, NaN samples are left out of the mean. The
+    incomplete last block and blocks without samples are dropped.
+    """
+    blocks = np.asarray(values, dtype=float)[:len(values) // size * size].reshape(-1, size)
+    counts = (~np.isnan(blocks)).sum(axis=1)
+    return np.nansum(blocks, axis=1)[counts > 0] / counts[counts > 0]
+
+
+def run_samples(run):
+    """
+    Block means (see BLOCK_SIZE) of the per-iteration durations and energies and the per-second CPU
+    utilization of the steady-state of a run.
+    """
+    iterations = steady_state_iterations(run)
+    if iterations is None:
+        return {}
+    samples = {
+        'duration_s': iterations['duration_s'].to_numpy(),
+        'energy_j': shelly_iteration_energy(run, iterations),
+    }
+    if run['files']['procfs']:
+        cpu = calculate_cpu_usage(run['files']['renaissance'], run['files']['procfs'], run['benchmark'],
+                                  run['processor'], STEADY_STATE_START.get(run['benchmark'], 0))
+        if cpu:
+            samples['cpu_usage'] = np.asarray(cpu['cpu_values_per_second'], dtype=float)
+    return {metric: block_means(values, BLOCK_SIZE[metric]) for metric, values in samples.items()}
+
+
+def cliffs_delta(new, old):
+    """
+    Probability that a new sample is larger than an old one minus the reverse, in [-1, 1].
+    """
+    greater = (new[:, None] > old[None, :]).sum()
+    less = (new[:, None] < old[None, :]).sum()
+    return (greater - less) / (len(new) * len(old))
+
+
+def holm_adjust(p_values):
+    """
+    Holm-Bonferroni adjusted p-values (step-down, monotone, capped at 1).
+    """
+    p_values = np.asarray(p_values, dtype=float)
+    order = np.argsort(p_values)
+    adjusted = np.empty_like(p_values)
+    running_max = 0.0
+    for rank, index in enumerate(order):
+        running_max = max(running_max, (len(p_values) - rank) * p_values[index])
+        adjusted[index] = min(1.0, running_max)
+    return adjusted
+
+
+def select_new_runs(runs, timestamp=None):
+    """
+    Runs with the given timestamp, or the latest run of every benchmark, configuration and architecture.
+    """
+    if timestamp:
+        return [run for run in runs if run['timestamp'] == timestamp]
+    latest = {}
+    for run in runs:
+        key = (run['benchmark'], run['configuration'], run['arch'])
+        if key not in latest or parse_timestamp(run['timestamp']) > parse_timestamp(latest[key]['timestamp']):
+            latest[key] = run
+    return list(latest.values())
+
+
+def check_regressions(work_dir='./', history_dirs=(), timestamp=None):
+    """
+    Compares the new runs in work_dir with the earlier runs in work_dir and history_dirs.
+
+    :return: DataFrame with one row per new run and metric, n_new and n_history count blocks
+    """
+    candidates = discover_runs(work_dir)
+    # the same folder may be given as work_dir and history directory
+    history = list({os.path.realpath(run['path']): run for run in
+                    candidates + [run for directory in history_dirs for run in discover_runs(directory)]}.values())
+    rows = []
+    for new_run in select_new_runs(candidates, timestamp):
+        new_time = parse_timestamp(new_run['timestamp'])
+        earlier = [run for run in history
+                   if (run['benchmark'], run['configuration'], run['arch']) ==
+                   (new_run['benchmark'], new_run['configuration'], new_run['arch'])
+                   and parse_timestamp(run['timestamp']) < new_time]
+        if not earlier:
+            continue
+        new_samples = run_samples(new_run)
+        old_samples = {}
+        for run in earlier:
+            for metric, values in run_samples(run).items():
+                old_samples.setdefault(metric, []).append(values)
+        for metric, new in new_samples.items():
+            old = np.concatenate(old_samples.get(metric, [np.array([])]))
+            if len(new) < 2 or len(old) < 2:
+                continue
+            median_new, median_old = np.median(new), np.median(old)
+            rows.append({
+                'benchmark': new_run['benchmark'],
+                'configuration': new_run['configuration'],
+                'processor': new_run['processor'],
+                'timestamp': new_run['timestamp'],
+                'metric': metric,
+                'history_runs': len(earlier),
+                'n_new': len(new),
+                'n_history': len(old),
+                'median_new': median_new,
+                'median_history': median_old,
+                'change_%': (median_new / median_old - 1) * 100 if median_old else np.nan,
+                'cliffs_delta': cliffs_delta(new, old),
+                'p_value': mannwhitneyu(new, old, alternative='two-sided').pvalue,
+            })
+    result = pd.DataFrame(rows)
+    if result.empty:
+        return result
+    result['p_adjusted'] = holm_adjust(result['p_value'])
+    significant = (result['p_adjusted'] < ALPHA) & (result['change_%'].abs() >= MIN_CHANGE)
+    direction = result['metric'].map(WORSE_IF_HIGHER)
+    worse = np.where(direction.eq(True), result['change_%'] > 0, result['change_%'] < 0)
+    flag = np.where(direction.isna(), 'change', np.where(worse, 'regression', 'improvement'))
+    result['flag'] = np.where(significant, flag, '')
+    return result
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--work-dir', default='./', help='directory containing the new result folders')
+    parser.add_argument('--history', nargs='*', default=[],
+                        help='further directories containing earlier result folders')
+    parser.add_argument('--timestamp', help='check only runs with this timestamp (default: latest run of each kind)')
+    parser.add_argument('--output', default='regressionCheck.csv', help='CSV file for the full comparison')
+    args = parser.parse_args()
+
+    report = check_regressions(args.work_dir, args.history, args.timestamp)
+    if report.empty:
+        print("No new runs with earlier runs to compare against found.")
+        sys.exit(0)
+    report.to_csv(args.output, index=False)
+    pd.set_option('display.width', 250)
+    flagged = report[report['flag'] != '']
+    print(flagged.to_string(index=False, float_format=lambda v: f"{v:.4g}") if not flagged.empty
+          else "No significant changes found.")
+    print(f"Full comparison was successfully saved as CSV: {args.output}")
+    sys.exit(REGRESSION_EXIT_CODE if (report['flag'] == 'regression').any() else 0)
@@ -0,0 +1,258 @@
+"""
+Self-contained HTML reports with time-series views of power and CPU utilization.
+
+One page is written per run (power and utilization over time with the Renaissance iterations marked and
+the steady-state metrics) and one per campaign (all runs sharing a timestamp), plus an index page. The
+series are downsampled with Largest-Triangle-Three-Buckets so hour-long traces stay responsive, the
+charts are inline SVG with a small script for the hover readout, and the pages are generated in parallel
+without any plotting backend.
+
+Usage: python -m enviroinfo.report [--work-dir ./] [--output-dir reports] [--max-points 1000] [--workers N]
+"""
+import argparse
+import html
+import json
+import os
+from collections import defaultdict
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+
+from enviroinfo import profiling
+from enviroinfo.catalog import BENCHMARK_ORDER, discover_runs
+from enviroinfo.energy import baseline_power
+from enviroinfo.loaders import read_renaissance
+from enviroinfo.metrics import METRIC_COLUMNS, run_metrics
+from enviroinfo.resample import aligned_run
+
+MAX_POINTS = 1000
+CHART_WIDTH = 960
+CHART_HEIGHT = 260
+MARGIN = {'left': 60, 'right': 20, 'top': 20, 'bottom': 35}
+SERIES = {
+    'Power (W)': [('shelly_power_w', 'Shelly', '#222222'), ('rapl_power_w', 'RAPL package', '#d62728')],
+    'CPU Utilization (%)': [('cpu_usage', 'Benchmark process', '#222222'),
+                            ('system_cpu_usage', 'System', '#1f77b4')],
+}
+
+PAGE = """<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body {{ font-family: sans-serif; margin: 20px; color: #222; }}
+table {{ border-collapse: collapse; margin: 10px 0 25px 0; font-size: 13px; }}
+th, td {{ border: 1px solid #bbb; padding: 3px 8px; text-align: right; }}
+th {{ background: #eee; }}
+td.text {{ text-align: left; }}
+svg {{ background: #fff; border: 1px solid #ccc; }}
+.readout {{ font-size: 13px; min-height: 1.2em; font-family: monospace; }}
+</style></head>
+<body>
+<h1>{title}</h1>
+{body}
+<script>
+document.querySelectorAll('svg[data-series]').forEach(function (svg) {{
+  var series = JSON.parse(svg.dataset.series), readout = document.getElementById(svg.id + '-readout');
+  var line = svg.querySelector('.cursor'), t0 = +svg.dataset.t0, t1 = +svg.dataset.t1;
+  var left = +svg.dataset.left, width = +svg.dataset.width;
+  svg.addEventListener('mousemove', function (event) {{
+    var box = svg.getBoundingClientRect(), px = (event.clientX - box.left) * svg.viewBox.baseVal.width / box.width;
+    var t = t0 + (px - left) / width * (t1 - t0);
+    line.setAttribute('x1', px); line.setAttribute('x2', px);
+    var text = 't = ' + t.toFixed(1) + ' s';
+    series.forEach(function (s) {{
+      var best = 0;
+      for (var i = 1; i < s.x.length; i++) {{ if (Math.abs(s.x[i] - t) < Math.abs(s.x[best] - t)) best = i; }}
+      if (s.x.length) text += ' | ' + s.label + ': ' + s.y[best].toFixed(2);
+    }});
+    readout.textContent = text;
+  }});
+}});
+</script>
+</body></html>
+"""
+
+
+def lttb(x, y, threshold):
+    """
+    Largest-Triangle-Three-Buckets downsampling of (x, y) to at most threshold points.
+
+    The first and last point are kept, the points in between are split into threshold - 2 buckets
+    and from each bucket the point forming the largest triangle with the previously selected point
+    and the average of the next bucket is kept. NaN values are dropped beforehand.
+    """
+    x = np.asarray(x, dtype=float)
+    y = np.asarray(y, dtype=float)
+    valid = ~(np.isnan(x) | np.isnan(y))
+    x, y = x[valid], y[valid]
+    if threshold >= len(x) or threshold < 3:
+        return x, y
+    bounds = np.linspace(1, len(x) - 1, threshold - 1).astype(int)
+    selected = np.empty(threshold, dtype=int)
+    selected[0], selected[-1] = 0, len(x) - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        start, end = bounds[bucket], bounds[bucket + 1]
+        next_start, next_end = end, bounds[bucket + 2] if bucket + 2 < len(bounds) else len(x)
+        average_x = x[next_start:next_end].mean()
+        average_y = y[next_start:next_end].mean()
+        areas = np.abs((x[previous] - average_x) * (y[start:end] - y[previous])
+                       - (x[previous] - x[start:end]) * (average_y - y[previous]))
+        previous = start + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return x[selected], y[selected]
+
+
+def _chart(chart_id, y_label, series, t_range, bands, max_points):
+    """Inline SVG line chart, bands are (start, end, steady_state) iteration windows in seconds."""
+    t0, t1 = t_range
+    width = CHART_WIDTH - MARGIN['left'] - MARGIN['right']
+    height = CHART_HEIGHT - MARGIN['top'] - MARGIN['bottom']
+    downsampled = [(label, color) + lttb(x, y, max_points) for label, color, x, y in series]
+    y_max = max([np.nanmax(y) for _, _, _, y in downsampled if len(y)] + [1.0]) * 1.05
+
+    def px(t):
+        return MARGIN['left'] + (np.asarray(t) - t0) / max(t1 - t0, 1e-9) * width
+
+    def py(v):
+        return MARGIN['top'] + height - np.asarray(v) / y_max * height
+
+    parts = []
+    for start, end, steady, index in bands:
+        fill = '#c8e6c9' if steady else '#eeeeee'
+        parts.append(f'<rect x="{px(start):.1f}" y="{MARGIN["top"]}" width="{max(px(end) - px(start), 0.5):.1f}" '
+                     f'height="{height}" fill="{fill}"><title>iteration {index} '
+                     f'({end - start:.2f} s{", steady-state" if steady else ""})</title></rect>')
+    for tick in np.linspace(0, y_max, 5):
+        parts.append(f'<line x1="{MARGIN["left"]}" x2="{MARGIN["left"] + width}" y1="{py(tick):.1f}" '
+                     f'y2="{py(tick):.1f}" stroke="#ddd"/><text x="{MARGIN["left"] - 5}" y="{py(tick) + 4:.1f}" '
+                     f'font-size="11" text-anchor="end">{tick:.0f}</text>')
+    for tick in np.linspace(t0, t1, 7):
+        parts.append(f'<text x="{px(tick):.1f}" y="{CHART_HEIGHT - 15}" font-size="11" '
+                     f'text-anchor="middle">{tick:.0f}</text>')
+    for label, color, x, y in downsampled:
+        points = ' '.join(f'{a:.1f},{b:.1f}' for a, b in zip(px(x), py(y)))
+        parts.append(f'<polyline points="{points}" fill="none" stroke="{color}" stroke-width="1.2"/>')
+    legend = ' '.join(f'<span style="color:{color}">&#9632; {html.escape(label)}</span>'
+                      for label, color, _, _ in downsampled)
+    data = json.dumps([{'label': label, 'x': np.round(x, 2).tolist(), 'y': np.round(y, 3).tolist()}
+                       for label, _, x, y in downsampled])
+    parts.append(f'<line class="cursor" x1="0" x2="0" y1="{MARGIN["top"]}" y2="{MARGIN["top"] + height}" '
+                 f'stroke="#888" stroke-dasharray="3,3"/>')
+    parts.append(f'<text x="{MARGIN["left"] + width / 2}" y="{CHART_HEIGHT - 2}" font-size="12" '
+                 f'text-anchor="middle">Time since start (s)</text>')
+    return (f'<h3>{html.escape(y_label)}</h3><div>{legend}</div>'
+            f'<svg id="{chart_id}" viewBox="0 0 {CHART_WIDTH} {CHART_HEIGHT}" width="{CHART_WIDTH}" '
+            f'data-t0="{t0}" data-t1="{t1}" data-left="{MARGIN["left"]}" data-width="{width}" '
+            f"data-series='{html.escape(data, quote=True)}'>{''.join(parts)}</svg>"
+            f'<div class="readout" id="{chart_id}-readout"></div>')
+
+
+def _table(rows, columns, links=None):
+    header = ''.join(f'<th>{html.escape(c)}</th>' for c in columns)
+    body = []
+    for i, row in enumerate(rows):
+        cells = []
+        for column in columns:
+            value = row.get(column)
+            if isinstance(value, (float, np.floating)):
+                cells.append(f'<td>{"&ndash;" if np.isnan(value) else f"{value:.3f}"}</td>')
+            else:
+                text = html.escape(str(value))
+                if links and column == 'benchmark':
+                    text = f'<a href="{html.escape(links[i])}">{text}</a>'
+                cells.append(f'<td class="text">{text}</td>')
+        body.append(f'<tr>{"".join(cells)}</tr>')
+    return f'<table><tr>{header}</tr>{"".join(body)}</table>'
+
+
+def run_report_path(run):
+    return os.path.join(f"{run['benchmark']}_{run['configuration']}", run['timestamp'], f"{run['arch']}.html")
+
+
+@profiling.profiled('report.render_run', rows=None)
+def render_run_report(run, baselines, output_dir, max_points=MAX_POINTS):
+    """
+    Writes the report page of one run and returns its metrics (None if the run has no data).
+    """
+    frame = aligned_run(run)
+    if frame.empty:
+        return None
+    origin = frame['time_s'].iloc[0]
+    t = frame['time_s'].to_numpy() - origin
+    bands = []
+    if run['files']['renaissance']:
+        iterations = read_renaissance(run['files']['renaissance'], run['benchmark'])
+        first_steady = frame.loc[frame['steady_state'], 'iteration'].min() if frame['steady_state'].any() else None
+        for index, (start, end) in enumerate(zip(iterations['start_ms'] / 1000 - origin,
+                                                 iterations['end_ms'] / 1000 - origin)):
+            bands.append((start, end, first_steady is not None and index >= first_steady, index))
+
+    body = []
+    metrics = run_metrics(run, baselines)
+    if metrics:
+        body.append(_table([metrics], METRIC_COLUMNS[4:]))
+    for number, (y_label, columns) in enumerate(SERIES.items()):
+        series = [(label, color, t, frame[column].to_numpy()) for column, label, color in columns if column in frame]
+        if series:
+            body.append(_chart(f'chart{number}', y_label, series, (t[0], t[-1]), bands, max_points))
+    body.append(f'<p><a href="../../campaign_{html.escape(run["timestamp"])}.html">Campaign {html.escape(run["timestamp"])}</a>'
+                f' &middot; <a href="../../index.html">All campaigns</a></p>')
+
+    title = f"{run['benchmark']} {run['configuration']} {run['processor']} ({run['timestamp']})"
+    path = os.path.join(output_dir, run_report_path(run))
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(PAGE.format(title=html.escape(title), body='\n'.join(body)))
+    return metrics
+
+
+def _render(arguments):
+    enabled, run, baselines, output_dir, max_points = arguments
+    metrics, recorded = profiling.traced_call(enabled, render_run_report, run, baselines, output_dir, max_points)
+    return run, metrics, recorded
+
+
+def render_reports(work_dir='./', output_dir='reports', max_points=MAX_POINTS, workers=None):
+    """
+    Writes the run, campaign and index pages for all runs below work_dir.
+
+    :return: Path of the index page
+    """
+    runs = discover_runs(work_dir)
+    baselines = baseline_power(work_dir)
+    os.makedirs(output_dir, exist_ok=True)
+    campaigns = defaultdict(list)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for run, metrics, recorded in executor.map(_render, [(profiling.is_enabled(), run, baselines, output_dir,
+                                                               max_points) for run in runs]):
+            profiling.merge(recorded)
+            if metrics:
+                campaigns[run['timestamp']].append((run, metrics))
+
+    order = {benchmark: i for i, benchmark in enumerate(BENCHMARK_ORDER)}
+    for timestamp, entries in campaigns.items():
+        entries.sort(key=lambda e: (order.get(e[0]['benchmark'], len(order)), e[0]['benchmark'], e[0]['arch']))
+        table = _table([metrics for _, metrics in entries], METRIC_COLUMNS,
+                       [run_report_path(run).replace(os.sep, '/') for run, _ in entries])
+        with open(os.path.join(output_dir, f'campaign_{timestamp}.html'), 'w', encoding='utf-8') as f:
+            f.write(PAGE.format(title=f'Campaign {html.escape(timestamp)}',
+                                body=table + '<p><a href="index.html">All campaigns</a></p>'))
+
+    links = ''.join(f'<li><a href="campaign_{html.escape(t)}.html">{html.escape(t)}</a> '
+                    f'({len(campaigns[t])} runs)</li>' for t in sorted(campaigns))
+    index = os.path.join(output_dir, 'index.html')
+    with open(index, 'w', encoding='utf-8') as f:
+        f.write(PAGE.format(title='Benchmark campaigns', body=f'<ul>{links}</ul>'))
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--work-dir', default='./', help='directory containing the result folders')
+    parser.add_argument('--output-dir', default='reports', help='directory for the HTML pages')
+    parser.add_argument('--max-points', type=int, default=MAX_POINTS, help='points per series after downsampling')
+    parser.add_argument('--workers', type=int, help='parallel processes (default: number of CPUs)')
+    args = parser.parse_args()
+
+    index = render_reports(args.work_dir, args.output_dir, args.max_points, args.workers)
+    print(f"Reports were successfully saved: {index}")
@@ -0,0 +1,105 @@
+"""
+Puts all measurement streams of a run onto one common time grid.
+
+procfs (about 1 s, millisecond timestamps, interleaved /proc/stat and /proc/<pid>/stat rows), RAPL (about 2 s)
+and Shelly (1 s, second timestamps, Gen1 devices in local time) are sampled on different irregular grids.
+aligned_run returns one frame with a row per grid bin [time_s, time_s + grid_s):
+
+- Instantaneous power (Shelly) is integrated with the trapezoidal rule, the bin value is the mean power.
+- Cumulative counters (RAPL energy, procfs ticks) are interpolated linearly at the bin edges, the bin value
+  is their increase (converted to mean power or utilization).
+- The Renaissance iteration running at the middle of a bin is given as iteration index (-1 outside iterations).
+
+Bins without data of a stream (before its first sample, after its last one, or within a Shelly gap) are NaN.
+
+The frame serves the time-series views (enviroinfo.report, enviroinfo.bench). The per-iteration metrics
+(enviroinfo.metrics, figures, jvmevents) intentionally keep integrating the raw traces between the exact
+iteration boundaries: on the grid, iterations shorter than a few bins would get the energy of whole bins.
+"""
+import functools
+import os
+
+import numpy as np
+import pandas as pd
+
+from enviroinfo.cache import disk_cached
+from enviroinfo.catalog import ARCHITECTURES, STEADY_STATE_START, run_files
+from enviroinfo.energy import counter_energy, counter_increase, interval_energy
+from enviroinfo.loaders import read_procfs, read_rapl, read_renaissance, read_shelly, read_timer
+from enviroinfo.profiling import profiled
+from enviroinfo.streaming import PROCESS_SOURCE, TICKS_PER_SECOND
+
+DEFAULT_GRID_S = 1.0
+
+
+def _tick_counter(procfs, process):
+    sources = procfs['SourceFile'].astype(str)
+    rows = procfs[sources.str.match(PROCESS_SOURCE)] if process else procfs[sources == '/proc/stat']
+    return rows['Timestamp'].to_numpy() / 1000, (rows['userTime (Ticks)'] + rows['systemTime (Ticks)']).to_numpy()
+
+
+@functools.lru_cache(maxsize=32)
+@profiled('resample.aligned_run')
+@disk_cached(lambda a: run_files(a['path'], a['arch']).values())
+def _aligned_run(path, arch, benchmark, grid_s):
+    files = run_files(path, arch)
+    timer_start = read_timer(files['timer'])[0] if files['timer'] else None
+    # (timestamps in s, values) of every stream, counters are converted per bin below
+    streams = {}
+    if files['shelly']:
+        shelly = read_shelly(files['shelly'], timer_start)
+        streams['shelly'] = (shelly['timestamp_s'].to_numpy(dtype=float), shelly['power'].to_numpy(dtype=float))
+    if files['rapl']:
+        rapl = read_rapl(files['rapl'])
+        streams['rapl'] = (rapl['Timestamp'].to_numpy() / 1000, rapl['Energy (micro joules)'].to_numpy())
+    if files['procfs']:
+        procfs = read_procfs(files['procfs'])
+        streams['cpu_usage'] = _tick_counter(procfs, process=True)
+        streams['system_cpu_usage'] = _tick_counter(procfs, process=False)
+    streams = {name: stream for name, stream in streams.items() if len(stream[0])}
+    if not streams:
+        return pd.DataFrame()
+
+    origin = np.floor(min(t[0] for t, _ in streams.values()) / grid_s) * grid_s
+    edges = np.arange(origin, max(t[-1] for t, _ in streams.values()) + grid_s, grid_s)
+    starts, ends = edges[:-1], edges[1:]
+    frame = pd.DataFrame({'time_s': starts})
+    cores = ARCHITECTURES[arch]['cores']
+    if 'shelly' in streams:
+        frame['shelly_energy_j'] = interval_energy(*streams['shelly'], starts, ends)
+        frame['shelly_power_w'] = frame['shelly_energy_j'] / grid_s
+    if 'rapl' in streams:
+        frame['rapl_energy_j'] = counter_energy(*streams['rapl'], starts, ends)
+        frame['rapl_power_w'] = frame['rapl_energy_j'] / grid_s
+    for column in ('cpu_usage', 'system_cpu_usage'):
+        if column in streams:
+            increase = counter_increase(*streams[column], starts, ends)
+            frame[column] = increase / (grid_s * TICKS_PER_SECOND * cores) * 100
+
+    frame['iteration'] = -1
+    if files['renaissance'] and benchmark:
+        iterations = read_renaissance(files['renaissance'], benchmark)
+        middles = (starts + ends) / 2 * 1000
+        position = np.searchsorted(iterations['start_ms'].to_numpy(), middles, side='right') - 1
+        valid = position >= 0
+        running = np.zeros(len(middles), dtype=bool)
+        running[valid] = middles[valid] < iterations['end_ms'].to_numpy()[position[valid]]
+        frame['iteration'] = np.where(running, position, -1)
+    frame['steady_state'] = frame['iteration'] >= STEADY_STATE_START.get(benchmark, 0)
+    return frame
+
+
+def aligned_run(run, grid_s=DEFAULT_GRID_S):
+    """
+    All streams of a run (as returned by discover_runs) on a common grid of grid_s seconds.
+
+    The result is cached per run folder and grid, a copy is returned so callers may modify it.
+    """
+    return _aligned_run(os.path.realpath(run['path']), run['arch'], run.get('benchmark'), grid_s).copy()
+
+
+def aligned_folder(path, arch, grid_s=DEFAULT_GRID_S):
+    """
+    Same as aligned_run for a folder without Renaissance results (e.g. a baseline measurement).
+    """
+    return _aligned_run(os.path.realpath(path), arch, None, grid_s).copy()
@@ -0,0 +1,197 @@
+"""
+Speedup, parallel efficiency and energy per iteration of every benchmark over the number of online cores.
+
+The runs of the scaling sweep (benchmarkscript.py --scaling) and the manually core-limited runs are stored as
+gpl-<benchmark>_CORE-LIMITED-CPU-<cores>[_<variant>] and placed at the number of CPUs that were online
+(cpuOnline_*.txt, the folder name for older runs); the latest run of the reference configuration (all cores
+online) adds the core count of the architecture if the sweep did not measure it. For every core count the
+latest run gives the steady-state median iteration duration and the wall (Shelly) and RAPL energy per
+iteration (enviroinfo.metrics). The speedup is relative to the smallest measured core count (1 for a
+complete sweep), the parallel efficiency is the speedup per core relative to it (speedup * base / cores).
+The scaling limit is the smallest core count reaching SCALING_SHARE of the largest speedup, the most
+energy-efficient core count the one with the lowest energy per iteration.
+
+Usage: python -m enviroinfo.scaling [--work-dir ./] [--reference CPU100] [--output coreScaling.csv]
+                                    [--summary coreScalingSummary.csv] [--figure coreScaling.pdf]
+"""
+import argparse
+import re
+
+import matplotlib
+
+matplotlib.use('Agg')
+import matplotlib.pyplot as plt  # noqa: E402
+import numpy as np  # noqa: E402
+import pandas as pd  # noqa: E402
+
+from enviroinfo.catalog import ARCHITECTURES, BENCHMARK_ORDER, discover_runs, select_runs  # noqa: E402
+from enviroinfo.comparison import DEFAULT_REFERENCE, PROCESSOR_COLORS  # noqa: E402
+from enviroinfo.energy import baseline_power  # noqa: E402
+from enviroinfo.metrics import run_metrics, write_table  # noqa: E402
+
+CORE_LIMITED_CONFIGURATION = re.compile(r'^CORE-LIMITED-CPU-(?P<cores>\d+)(?:_(?P<variant>.+))?$')
+# Share of the largest speedup from which more cores count as no longer worth it
+SCALING_SHARE = 0.95
+SERIES_KEYS = ['benchmark', 'processor', 'variant']
+CURVES = {
+    'speedup': 'Speedup',
+    'parallel_efficiency': 'Parallel efficiency',
+    'energy_per_iteration_j': 'Energy per iteration (J)',
+}
+
+
+def online_cores(run, reference=DEFAULT_REFERENCE):
+    """
+    Number of online CPUs of a run and the variant of the sweep it belongs to, (None, None) for runs of
+    other configurations.
+    """
+    if run['configuration'] == reference:
+        return ARCHITECTURES[run['arch']]['cores'], ''
+    match = CORE_LIMITED_CONFIGURATION.match(run['configuration'])
+    if not match:
+        return None, None
+    cores = int(match['cores'])
+    if run['files']['cpu_online']:
+        with open(run['files']['cpu_online']) as f:
+            cores = int(f.read().strip() or cores)
+    return cores, match['variant'] or ''
+
+
+def collect_points(work_dir='./', reference=DEFAULT_REFERENCE):
+    """
+    One row per benchmark, processor, variant and core count with the metrics of its latest run, the sweep
+    runs taking precedence over the reference run at the same core count.
+    """
+    baselines = baseline_power(work_dir)
+    rows = []
+    for run in select_runs(discover_runs(work_dir), latest=True):
+        cores, variant = online_cores(run, reference)
+        if cores is None:
+            continue
+        metrics = run_metrics(run, baselines)
+        if metrics is None:
+            continue
+        rows.append({
+            'benchmark': run['benchmark'], 'processor': run['processor'], 'variant': variant, 'cores': cores,
+            'configuration': run['configuration'], 'timestamp': run['timestamp'],
+            'reference': run['configuration'] == reference,
+            **{key: metrics[key] for key in ['iterations', 'median_duration_s', 'mean_power_w',
+                                             'energy_per_iteration_j', 'rapl_energy_per_iteration_j']},
+        })
+    if not rows:
+        return pd.DataFrame()
+    points = pd.DataFrame(rows).sort_values(SERIES_KEYS + ['cores', 'reference'])
+    return points.drop_duplicates(SERIES_KEYS + ['cores']).reset_index(drop=True)
+
+
+def scaling_curves(points):
+    """
+    Adds the speedup, parallel efficiency and relative energy per iteration to the points of every series,
+    series with a single core count are dropped.
+    """
+    curves = []
+    for _, series in points.groupby(SERIES_KEYS):
+        if len(series) < 2:
+            continue
+        series = series.sort_values('cores').copy()
+        base = series.iloc[0]
+        series['base_cores'] = base['cores']
+        series['speedup'] = base['median_duration_s'] / series['median_duration_s']
+        series['parallel_efficiency'] = series['speedup'] * base['cores'] / series['cores']
+        series['relative_energy'] = series['energy_per_iteration_j'] / base['energy_per_iteration_j']
+        series['relative_rapl_energy'] = series['rapl_energy_per_iteration_j'] / base['rapl_energy_per_iteration_j']
+        curves.append(series)
+    if not curves:
+        return pd.DataFrame()
+    return pd.concat(curves, ignore_index=True)
+
+
+def _best_cores(series, column):
+    values = series.dropna(subset=[column])
+    return values.loc[values[column].idxmin(), 'cores'] if not values.empty else np.nan
+
+
+def summarize_scaling(curves, share=SCALING_SHARE):
+    """
+    Scaling limit and most energy-efficient core count (wall and RAPL energy) of every series.
+    """
+    rows = []
+    for key, series in curves.groupby(SERIES_KEYS):
+        max_speedup = series['speedup'].max()
+        rows.append({
+            **dict(zip(SERIES_KEYS, key)),
+            'core_counts': ' '.join(str(cores) for cores in series['cores']),
+            'max_speedup': max_speedup,
+            'scaling_limit_cores': series.loc[series['speedup'] >= share * max_speedup, 'cores'].min(),
+            'efficiency_at_max_cores': series['parallel_efficiency'].iloc[-1],
+            'best_energy_cores': _best_cores(series, 'energy_per_iteration_j'),
+            'min_energy_per_iteration_j': series['energy_per_iteration_j'].min(),
+            'best_rapl_energy_cores': _best_cores(series, 'rapl_energy_per_iteration_j'),
+        })
+    return pd.DataFrame(rows)
+
+
+def plot_scaling(curves, output):
+    """
+    Speedup, parallel efficiency and energy per iteration over the core count, one row per curve and one
+    column per benchmark, one line per processor and variant.
+    """
+    if curves.empty:
+        return None
+    benchmarks = [b for b in BENCHMARK_ORDER if b in set(curves['benchmark'])] + \
+        sorted(set(curves['benchmark']) - set(BENCHMARK_ORDER))
+    fig, axes = plt.subplots(len(CURVES), len(benchmarks), figsize=(2.6 * len(benchmarks), 3.2 * len(CURVES)),
+                             sharex='col', squeeze=False)
+    for col, benchmark in enumerate(benchmarks):
+        for (processor, variant), series in curves[curves['benchmark'] == benchmark].groupby(['processor',
+                                                                                              'variant']):
+            label = f'{processor} {variant}'.strip()
+            color = PROCESSOR_COLORS.get(processor, '0.5')
+            for row, column in enumerate(CURVES):
+                axes[row][col].plot(series['cores'], series[column], marker='o', color=color,
+                                    markeredgecolor='black', linewidth=1.2, label=label)
+            # ideal linear speedup from the base core count
+            axes[0][col].plot(series['cores'], series['cores'] / series['base_cores'], linestyle='--', color=color,
+                              linewidth=0.8)
+        for row, column in enumerate(CURVES):
+            ax = axes[row][col]
+            ax.yaxis.grid(True)
+            if row == 0:
+                ax.set_title(benchmark)
+            if row == len(CURVES) - 1:
+                ax.set_xlabel('Online cores')
+            if col == 0:
+                ax.set_ylabel(CURVES[column])
+        axes[1][col].set_ylim(0, 1.1)
+    axes[0][0].legend(fontsize=8)
+    fig.tight_layout()
+    fig.savefig(output, bbox_inches='tight', dpi=300)
+    plt.close(fig)
+    return output
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--work-dir', default='./', help='directory containing the result folders')
+    parser.add_argument('--reference', default=DEFAULT_REFERENCE, help='configuration with all cores online')
+    parser.add_argument('--output', default='coreScaling.csv', help='one row per core count, .csv, .parquet or .tex')
+    parser.add_argument('--summary', default='coreScalingSummary.csv', help='one row per benchmark and processor')
+    parser.add_argument('--figure', default='coreScaling.pdf', help='faceted figure')
+    args = parser.parse_args()
+
+    points = collect_points(args.work_dir, args.reference)
+    curves = scaling_curves(points) if not points.empty else pd.DataFrame()
+    if curves.empty:
+        print("No benchmark with runs at two or more core counts (gpl-<benchmark>_CORE-LIMITED-CPU-<cores>) found.")
+    else:
+        summary = summarize_scaling(curves)
+        pd.set_option('display.width', 250)
+        print(curves[SERIES_KEYS + ['cores', 'median_duration_s', 'speedup', 'parallel_efficiency',
+                                    'energy_per_iteration_j', 'rapl_energy_per_iteration_j']]
+              .to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+        print(summary.to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+        write_table(curves, args.output)
+        write_table(summary, args.summary)
+        print(f"Scaling curves were successfully saved: {args.output}, {args.summary}")
+        if plot_scaling(curves, args.figure):
+            print(f"Figure was successfully saved: {args.figure}")
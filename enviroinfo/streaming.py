@@ -0,0 +1,174 @@
+"""
+Bounded-memory aggregation of long measurement traces (e.g. day-long soak tests).
+
+The functions read the sensor files chunk by chunk (see the iter_* readers in enviroinfo.loaders),
+carry the last sample of a chunk over to the next one and only keep running sums, so the memory
+use depends on the chunk size and the number of aggregation windows, not on the length of the trace.
+"""
+import numpy as np
+import pandas as pd
+
+from enviroinfo.energy import MAX_SAMPLE_GAP_S
+from enviroinfo.loaders import CHUNK_ROWS, iter_procfs, iter_rapl, iter_shelly
+
+TICKS_PER_SECOND = 100
+PROCESS_SOURCE = r'/proc/\d+/stat'
+
+
+class _WindowSums:
+    """Running sums per aggregation window (window index -> [sum, weight])."""
+
+    def __init__(self, start, window):
+        self.start = start
+        self.window = window
+        self.sums = {}
+
+    def add(self, positions, values, weights):
+        if self.window is None or len(values) == 0:
+            return
+        indices = np.floor((positions - self.start) / self.window).astype(np.int64)
+        unique, inverse = np.unique(indices, return_inverse=True)
+        value_sums = np.bincount(inverse, weights=values)
+        weight_sums = np.bincount(inverse, weights=weights)
+        for index, value_sum, weight_sum in zip(unique, value_sums, weight_sums):
+            current = self.sums.setdefault(int(index), [0.0, 0.0])
+            current[0] += value_sum
+            current[1] += weight_sum
+
+    def frame(self, value_name, weight_name):
+        indices = sorted(self.sums)
+        return pd.DataFrame({
+            'window_start': [self.start + i * self.window for i in indices],
+            value_name: [self.sums[i][0] for i in indices],
+            weight_name: [self.sums[i][1] for i in indices],
+        })
+
+
+def stream_cpu_usage(procfs_file, start_ms, end_ms, cpu_cores, window_s=None, chunksize=CHUNK_ROWS):
+    """
+    CPU utilization of the benchmark process between start_ms and end_ms, computed like
+    calculate_cpu_usage (mean of the utilization between consecutive samples).
+
+    :param window_s: If given, the utilization is also aggregated into windows of this length
+    :return: Dict with average, min and max utilization, the number of samples and, with window_s,
+             a DataFrame 'windows' (window_start in ms, average_cpu_usage, num_measurements)
+    """
+    windows = _WindowSums(start_ms, None if window_s is None else window_s * 1000)
+    total, count = 0.0, 0
+    minimum, maximum = np.inf, -np.inf
+    previous = None  # last process sample of the previous chunk: (timestamp, ticks)
+    for chunk in iter_procfs(procfs_file, chunksize):
+        categories = chunk['SourceFile'].cat.categories
+        process_sources = categories[categories.str.match(PROCESS_SOURCE)]
+        chunk = chunk[chunk['SourceFile'].isin(process_sources)
+                      & (chunk['Timestamp'] >= start_ms) & (chunk['Timestamp'] <= end_ms)]
+        if chunk.empty:
+            continue
+        timestamps = chunk['Timestamp'].to_numpy(dtype=np.float64)
+        ticks = (chunk['userTime (Ticks)'] + chunk['systemTime (Ticks)']).to_numpy(dtype=np.float64)
+        if previous is not None:
+            timestamps = np.concatenate(([previous[0]], timestamps))
+            ticks = np.concatenate(([previous[1]], ticks))
+        previous = (timestamps[-1], ticks[-1])
+        usage = np.diff(ticks) / (np.diff(timestamps) / 1000 * TICKS_PER_SECOND * cpu_cores) * 100
+        usage = usage[np.isfinite(usage)]
+        if len(usage) == 0:
+            continue
+        total += usage.sum()
+        count += len(usage)
+        minimum = min(minimum, usage.min())
+        maximum = max(maximum, usage.max())
+        windows.add(timestamps[-len(usage):], usage, np.ones(len(usage)))
+
+    result = {
+        'average_cpu_usage': total / count if count else np.nan,
+        'max_cpu_usage': maximum if count else np.nan,
+        'min_cpu_usage': minimum if count else np.nan,
+        'num_measurements': count,
+    }
+    if window_s is not None:
+        frame = windows.frame('cpu_usage_sum', 'num_measurements')
+        frame['average_cpu_usage'] = frame.pop('cpu_usage_sum') / frame['num_measurements']
+        result['windows'] = frame
+    return result
+
+
+def _segment_energy(t0, p0, t1, p1, start, end):
+    """Trapezoidal energy of the linear segments (t0, p0)-(t1, p1) clipped to [start, end]."""
+    a = np.clip(t0, start, end)
+    b = np.clip(t1, start, end)
+    span = t1 - t0
+    pa = p0 + (p1 - p0) * (a - t0) / span
+    pb = p0 + (p1 - p0) * (b - t0) / span
+    return (b - a) * (pa + pb) / 2, b - a
+
+
+def stream_energy(shelly_file, start_s, end_s, reference_start_s=None, window_s=None,
+                  max_gap_s=MAX_SAMPLE_GAP_S, chunksize=CHUNK_ROWS):
+    """
+    Wall energy between start_s and end_s from a Shelly trace, integrated with the trapezoidal rule.
+
+    Steps between two samples that are longer than max_gap_s are not integrated but reported as missing.
+    Windowed energy is attributed to the window containing the middle of each step. Gen1 (x86) Shelly traces
+    report local time and need reference_start_s (e.g. the start of the timer file) to be shifted to UTC.
+
+    :return: Dict with energy_j (NaN if no step of the trace lies in the range), covered_s, missing_s,
+             mean_power_w and, with window_s, a DataFrame 'windows' (window_start in s, energy_j, covered_s,
+             mean_power_w)
+    """
+    windows = _WindowSums(start_s, window_s)
+    energy, covered, missing = 0.0, 0.0, 0.0
+    previous = None
+    for chunk in iter_shelly(shelly_file, chunksize, reference_start_s):
+        timestamps = chunk['timestamp_s'].to_numpy(dtype=np.float64)
+        power = chunk['power'].to_numpy(dtype=np.float64)
+        if previous is not None:
+            timestamps = np.concatenate(([previous[0]], timestamps))
+            power = np.concatenate(([previous[1]], power))
+        previous = (timestamps[-1], power[-1])
+        if timestamps[-1] < start_s:
+            continue
+        t0, t1, p0, p1 = timestamps[:-1], timestamps[1:], power[:-1], power[1:]
+        overlapping = (t1 > start_s) & (t0 < end_s) & (t1 > t0)
+        t0, t1, p0, p1 = t0[overlapping], t1[overlapping], p0[overlapping], p1[overlapping]
+        segment_energy, segment_span = _segment_energy(t0, p0, t1, p1, start_s, end_s)
+        gap = (t1 - t0) > max_gap_s
+        missing += segment_span[gap].sum()
+        energy += segment_energy[~gap].sum()
+        covered += segment_span[~gap].sum()
+        windows.add((np.clip(t0, start_s, end_s) + np.clip(t1, start_s, end_s))[~gap] / 2,
+                    segment_energy[~gap], segment_span[~gap])
+        if timestamps[-1] >= end_s:
+            break
+
+    result = {
+        'energy_j': energy if covered else np.nan,
+        'covered_s': covered,
+        'missing_s': missing,
+        'mean_power_w': energy / covered if covered else np.nan,
+    }
+    if window_s is not None:
+        frame = windows.frame('energy_j', 'covered_s')
+        frame['mean_power_w'] = frame['energy_j'] / frame['covered_s']
+        result['windows'] = frame
+    return result
+
+
+def stream_rapl_energy(rapl_file, start_ms, end_ms, chunksize=CHUNK_ROWS):
+    """
+    RAPL package energy in joules between the first and last sample within [start_ms, end_ms].
+    """
+    first = last = None
+    for chunk in iter_rapl(rapl_file, chunksize):
+        chunk = chunk[(chunk['Timestamp'] >= start_ms) & (chunk['Timestamp'] <= end_ms)]
+        if chunk.empty:
+            continue
+        if first is None:
+            first = chunk.iloc[0]
+        last = chunk.iloc[-1]
+    if first is None or last['Timestamp'] == first['Timestamp']:
+        return {'energy_j': np.nan, 'duration_s': 0.0}
+    return {
+        'energy_j': (last['Energy (micro joules)'] - first['Energy (micro joules)']) / 1_000_000,
+        'duration_s': (last['Timestamp'] - first['Timestamp']) / 1000,
+    }
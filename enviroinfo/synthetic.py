@@ -0,0 +1,165 @@
+"""
+Generates synthetic runs at a multiple of the size of a recorded run, for benchmarking the analysis pipeline.
+
+A synthetic run of scale N has N times the iterations of its template run (the latest run of the given benchmark
+and configuration) and covers an N times longer measurement, so the procfs, RAPL and Shelly files grow by the
+same factor. The warm-up iterations are copied, the steady-state iteration durations, procfs tick increments,
+power samples and sampling intervals are drawn from the template with replacement. The runs are written in the
+layout of the result folders (gpl-<benchmark>_SYNTHETIC-<N>X/<timestamp>/<arch>/), so all modules read them.
+
+Usage: python -m enviroinfo.synthetic [--work-dir ./] [--benchmark scrabble] [--configuration CPU100]
+                                      [--scales 1 100 10000] [--output-dir synthetic]
+"""
+import argparse
+import os
+import shutil
+
+import numpy as np
+import pandas as pd
+
+from enviroinfo.catalog import ARCHITECTURES, STEADY_STATE_START, discover_runs, select_runs
+from enviroinfo.loaders import read_procfs, read_rapl, read_renaissance, read_shelly, read_timer
+
+DEFAULT_TEMPLATE = ('scrabble', 'CPU100')
+DEFAULT_SCALES = (1, 100, 10_000)
+RAPL_HEADER = 'Timestamp,Domain,Power (Watts),DRAM Power (Watts), Energy (micro joules), DRAM Energy (micro joules)'
+
+
+def synthetic_configuration(scale):
+    return f'SYNTHETIC-{scale}X'
+
+
+def _iterations(template, benchmark, scale, rng):
+    warmup = STEADY_STATE_START.get(benchmark, 0)
+    durations = template['duration_ns'].to_numpy()
+    steady = durations[warmup:] if len(durations) > warmup else durations
+    count = len(durations) * scale
+    durations = np.concatenate([durations[:warmup], rng.choice(steady, count - min(warmup, count))])[:count]
+    gaps = np.diff(template['uptime_ns'].to_numpy()) - durations[:len(template) - 1] if len(template) > 1 else [0]
+    gap_ns = max(int(np.median(gaps)), 0)
+    uptimes = template['uptime_ns'].iloc[0] + np.concatenate(([0], np.cumsum(durations[:-1] + gap_ns)))
+    return pd.DataFrame({'benchmark': benchmark, 'duration_ns': durations, 'uptime_ns': uptimes.astype(np.int64),
+                         'vm_start_unix_ms': template['vm_start_unix_ms'].iloc[0]})
+
+
+def _sample_times(template_times, start, end, rng):
+    """Sampling times from start to end with intervals drawn from the template's intervals."""
+    intervals = np.diff(np.sort(template_times))
+    intervals = intervals[intervals > 0]
+    if len(intervals) == 0:
+        intervals = np.array([1.0])
+    count = int((end - start) / intervals.mean() * 1.05) + 2
+    times = start + np.concatenate(([0], np.cumsum(rng.choice(intervals, count))))
+    return times[times <= end]
+
+
+def _procfs(template, start_ms, end_ms, rng):
+    frames = []
+    for source, rows in template.groupby('SourceFile', observed=True):
+        rows = rows.sort_values('Timestamp')
+        times = _sample_times(rows['Timestamp'].to_numpy(), start_ms, end_ms, rng).astype(np.int64)
+        frame = pd.DataFrame({'SourceFile': str(source), 'Timestamp': times})
+        for column in ['userTime (Ticks)', 'systemTime (Ticks)']:
+            increments = np.clip(np.diff(rows[column].to_numpy()), 0, None)
+            increments = increments if len(increments) else np.zeros(1)
+            frame[column] = rows[column].iloc[0] + np.concatenate(([0], np.cumsum(rng.choice(increments, len(times) - 1))))
+        frames.append(frame)
+    # the readers write the system and process samples of one sampling round one after another
+    return pd.concat(frames).sort_values('Timestamp', kind='stable')
+
+
+def _shelly(template, start_s, end_s, offset_s, rng):
+    times = _sample_times(template['timestamp_s'].to_numpy(), start_s, end_s, rng)
+    power = rng.choice(template['power'].to_numpy(), len(times))
+    energy = np.nan_to_num(pd.to_numeric(template['energy'], errors='coerce').iloc[0]) + np.cumsum(power) / 60  # watt-minutes like the Gen1 counter
+    return pd.DataFrame({'ip': template['ip'].iloc[0], 'timestamp_s': np.round(times + offset_s).astype(np.int64),
+                         'power': power, 'energy': energy.astype(np.int64)})
+
+
+def _rapl(template, start_ms, end_ms, rng):
+    times = _sample_times(template['Timestamp'].to_numpy(), start_ms, end_ms, rng)
+    picks = rng.integers(0, len(template), len(times))
+    power = template['Power (Watts)'].to_numpy()[picks]
+    dram = template['DRAM Power (Watts)'].to_numpy()[picks]
+    steps_s = np.diff(times, prepend=times[0]) / 1000
+    return pd.DataFrame({
+        'Timestamp': times.astype(np.int64), 'Domain': template['Domain'].iloc[0],
+        'Power (Watts)': power, 'DRAM Power (Watts)': dram,
+        ' Energy (micro joules)': (template['Energy (micro joules)'].iloc[0]
+                                   + np.cumsum(power * steps_s * 1_000_000)).astype(np.int64),
+        ' DRAM Energy (micro joules)': (template['DRAM Energy (micro joules)'].iloc[0]
+                                        + np.cumsum(dram * steps_s * 1_000_000)).astype(np.int64),
+    })
+
+
+def generate_run(template_run, scale, output_dir, seed=0):
+    """
+    Writes the synthetic counterpart of one template run (one architecture) and returns its folder.
+    """
+    rng = np.random.default_rng(seed)
+    files = template_run['files']
+    postfix = ARCHITECTURES[template_run['arch']]['postfix']
+    run_directory = os.path.join(output_dir, f"gpl-{template_run['benchmark']}_{synthetic_configuration(scale)}",
+                                 template_run['timestamp'])
+    path = os.path.join(run_directory, template_run['arch'])
+    os.makedirs(path, exist_ok=True)
+    parameters = os.path.join(os.path.dirname(template_run['path']), 'bm_params_sysinfo.txt')
+    if os.path.exists(parameters):
+        shutil.copy(parameters, run_directory)
+
+    template = read_renaissance(files['renaissance'], template_run['benchmark'])
+    iterations = _iterations(template, template_run['benchmark'], scale, rng)
+    iterations.to_csv(os.path.join(path, f'renaissanceOutput{postfix}.csv'), index=False)
+    timer_start, timer_end = read_timer(files['timer'])
+    vm_start_ms = iterations['vm_start_unix_ms'].iloc[0]
+    lead_s = vm_start_ms / 1000 - timer_start
+    tail_s = timer_end - (template['end_ms'].iloc[-1] / 1000)
+    start_s = vm_start_ms / 1000 - lead_s
+    end_s = (vm_start_ms + (iterations['uptime_ns'].iloc[-1] + iterations['duration_ns'].iloc[-1]) / 1e6) / 1000 + tail_s
+    with open(os.path.join(path, f'timer{postfix}.txt'), 'w') as f:
+        f.write(f'{start_s}\n{end_s}')
+
+    if files['procfs']:
+        _procfs(read_procfs(files['procfs']), start_s * 1000, end_s * 1000, rng) \
+            .to_csv(os.path.join(path, f'procfsResults{postfix}'), index=False)
+    if files['shelly']:
+        shelly = read_shelly(files['shelly'])
+        # keep the local time offset of Gen1 devices
+        offset_s = round((shelly['timestamp_s'].iloc[0] - timer_start) / 3600) * 3600
+        _shelly(shelly, start_s, end_s, offset_s, rng) \
+            .to_csv(os.path.join(path, f'shellyReaderResults{postfix}'), index=False, header=False)
+    if files['rapl']:
+        rapl = _rapl(read_rapl(files['rapl']), start_s * 1000, end_s * 1000, rng)
+        with open(os.path.join(path, f'raplResults{postfix}'), 'w') as f:
+            f.write(RAPL_HEADER + '\n')
+            rapl.to_csv(f, index=False, header=False)
+    return path
+
+
+def generate_dataset(work_dir='./', output_dir='synthetic', scales=DEFAULT_SCALES, benchmark=DEFAULT_TEMPLATE[0],
+                     configuration=DEFAULT_TEMPLATE[1], seed=0):
+    """
+    Synthetic runs of all architectures of the template run for every scale.
+
+    :return: Dict scale -> list of the generated architecture folders
+    """
+    templates = select_runs(discover_runs(work_dir), benchmarks=[benchmark], configurations=[configuration],
+                            latest=True)
+    if not templates:
+        raise ValueError(f"No run of {benchmark} with configuration {configuration} found in {work_dir}")
+    return {scale: [generate_run(template, scale, output_dir, seed) for template in templates] for scale in scales}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--work-dir', default='./', help='directory containing the result folders')
+    parser.add_argument('--benchmark', default=DEFAULT_TEMPLATE[0], help='benchmark of the template run')
+    parser.add_argument('--configuration', default=DEFAULT_TEMPLATE[1], help='configuration of the template run')
+    parser.add_argument('--scales', nargs='+', type=int, default=list(DEFAULT_SCALES))
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output-dir', default='synthetic', help='directory for the synthetic result folders')
+    args = parser.parse_args()
+
+    for scale, paths in generate_dataset(args.work_dir, args.output_dir, args.scales, args.benchmark,
+                                         args.configuration, args.seed).items():
+        print(f"Synthetic runs of scale {scale} were successfully saved: {', '.join(paths)}")
@@ -0,0 +1,157 @@
+"""
+Joins the core frequency and temperature telemetry of the remote machines with the Renaissance iterations
+to explain slow iterations by thermal throttling or frequency drops.
+
+For every iteration of every run with a telemetryResults_* file the mean and minimum core frequency and the
+maximum temperature during the iteration are computed (windows shorter than the sampling interval use the
+last sample before the iteration). A steady-state iteration is slow if it takes SLOW_THRESHOLD longer than
+the median of its run; it is attributed to throttling if a thermal zone reached THROTTLE_TEMP_C, to a
+frequency drop if the mean frequency was FREQUENCY_DROP below the median of the run, and is unexplained otherwise.
+
+Usage: python -m enviroinfo.telemetry [--work-dir ./] [--output iterationTelemetry.csv]
+"""
+import argparse
+
+import numpy as np
+import pandas as pd
+
+from enviroinfo.catalog import STEADY_STATE_START, discover_runs
+from enviroinfo.loaders import read_renaissance, read_telemetry
+
+SLOW_THRESHOLD = 0.10
+FREQUENCY_DROP = 0.05
+# Temperature from which an iteration counts as throttled, below the usual trip points of both machines
+THROTTLE_TEMP_C = {'X86': 90.0, 'RISC': 85.0}
+
+
+def telemetry_series(telemetry_file):
+    """
+    Per sampling time: mean and minimum core frequency in MHz and maximum temperature in degrees Celsius.
+    """
+    telemetry = read_telemetry(telemetry_file)
+    frequency = telemetry[telemetry['Kind'] == 'freq_khz'].groupby('Timestamp')['Value'].agg(['mean', 'min']) / 1000
+    temperature = telemetry[telemetry['Kind'] == 'temp_mc'].groupby('Timestamp')['Value'].max() / 1000
+    series = pd.DataFrame({'mean_freq_mhz': frequency['mean'], 'min_freq_mhz': frequency['min'],
+                           'max_temp_c': temperature})
+    return series.sort_index()
+
+
+def _window_indices(timestamps, starts, ends):
+    """
+    Sample ranges [lo, hi) per window, windows without a sample use the last sample before their start.
+    Windows outside the telemetry trace, and all windows of a trace without samples, are marked invalid.
+    """
+    if len(timestamps) == 0:
+        # empty ranges, so the window functions index only the leading zero of their cumulative sums
+        zeros = np.zeros(len(starts), dtype=int)
+        return zeros, zeros, np.zeros(len(starts), dtype=bool)
+    lo = np.searchsorted(timestamps, starts, side='left')
+    hi = np.searchsorted(timestamps, ends, side='right')
+    empty = hi <= lo
+    lo = np.where(empty, np.clip(lo - 1, 0, len(timestamps) - 1), lo)
+    hi = np.where(empty, lo + 1, hi)
+    valid = (ends >= timestamps[0]) & (starts <= timestamps[-1])
+    return lo, hi, valid
+
+
+def _window_mean(values, lo, hi, valid):
+    cumulative = np.concatenate(([0.0], np.nancumsum(values)))
+    counts = np.concatenate(([0], np.cumsum(~np.isnan(values))))
+    n = counts[hi] - counts[lo]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(valid & (n > 0), (cumulative[hi] - cumulative[lo]) / n, np.nan)
+
+
+def _window_reduce(values, lo, hi, valid, ufunc):
+    """Minimum or maximum per [lo, hi) window with one reduceat over the interleaved window bounds."""
+    if len(values) == 0 or len(lo) == 0:
+        return np.full(len(lo), np.nan)
+    neutral = -np.inf if ufunc is np.maximum else np.inf
+    # one padding element keeps hi == len(values) a valid index
+    padded = np.append(np.where(np.isnan(values), neutral, values), neutral)
+    result = ufunc.reduceat(padded, np.ravel(np.column_stack([lo, hi])))[::2]
+    return np.where(valid & np.isfinite(result), result, np.nan)
+
+
+def iteration_telemetry(run):
+    """
+    Iterations of one run with duration and the frequency and temperature during each of them,
+    None if the run has no telemetry.
+    """
+    files = run['files']
+    if not files.get('telemetry') or not files['renaissance']:
+        return None
+    iterations = read_renaissance(files['renaissance'], run['benchmark']).reset_index(drop=True)
+    series = telemetry_series(files['telemetry'])
+    timestamps = series.index.to_numpy(dtype=float)
+    lo, hi, valid = _window_indices(timestamps, iterations['start_ms'].to_numpy(), iterations['end_ms'].to_numpy())
+    frame = pd.DataFrame({
+        'benchmark': run['benchmark'], 'configuration': run['configuration'], 'timestamp': run['timestamp'],
+        'processor': run['processor'], 'arch': run['arch'], 'iteration': iterations.index,
+        'steady_state': iterations.index >= STEADY_STATE_START.get(run['benchmark'], 0),
+        'duration_s': iterations['duration_s'].to_numpy(),
+    })
+    frame['mean_freq_mhz'] = _window_mean(series['mean_freq_mhz'].to_numpy(), lo, hi, valid)
+    frame['min_freq_mhz'] = _window_reduce(series['min_freq_mhz'].to_numpy(), lo, hi, valid, np.minimum)
+    frame['max_temp_c'] = _window_reduce(series['max_temp_c'].to_numpy(), lo, hi, valid, np.maximum)
+    return frame
+
+
+def attribute_slow_iterations(iterations):
+    """
+    Adds the columns slow and cause to the iterations of all runs, using the medians of each run's steady-state.
+    """
+    keys = ['benchmark', 'configuration', 'timestamp', 'arch']
+    steady = iterations[iterations['steady_state']]
+    medians = steady.groupby(keys)[['duration_s', 'mean_freq_mhz']].median() \
+        .rename(columns=lambda c: f'run_median_{c}').reset_index()
+    iterations = iterations.merge(medians, on=keys, how='left')
+    iterations['slow'] = iterations['steady_state'] & \
+        (iterations['duration_s'] > iterations['run_median_duration_s'] * (1 + SLOW_THRESHOLD))
+    throttled = iterations['max_temp_c'] >= iterations['arch'].map(THROTTLE_TEMP_C)
+    dropped = iterations['mean_freq_mhz'] < iterations['run_median_mean_freq_mhz'] * (1 - FREQUENCY_DROP)
+    iterations['cause'] = np.where(~iterations['slow'], '',
+                                   np.where(throttled, 'throttling', np.where(dropped, 'frequency drop', 'unexplained')))
+    return iterations
+
+
+def summarize(iterations):
+    """
+    Per run: number of slow steady-state iterations per cause and the Spearman correlation of
+    duration and mean frequency over the steady-state.
+    """
+    keys = ['benchmark', 'configuration', 'timestamp', 'processor']
+    steady = iterations[iterations['steady_state']]
+    if steady.empty:
+        return pd.DataFrame(columns=keys + ['iterations', 'slow', 'median_freq_mhz', 'max_temp_c',
+                                           'duration_freq_spearman'])
+    summary = steady.groupby(keys).agg(iterations=('duration_s', 'size'), slow=('slow', 'sum'),
+                                       median_freq_mhz=('mean_freq_mhz', 'median'), max_temp_c=('max_temp_c', 'max'))
+    causes = pd.crosstab([steady[k] for k in keys], steady['cause']).drop(columns='', errors='ignore')
+    summary = summary.join(causes).fillna({c: 0 for c in causes.columns})
+    summary['duration_freq_spearman'] = steady.groupby(keys).apply(
+        lambda g: g['duration_s'].corr(g['mean_freq_mhz'], method='spearman'))
+    return summary.reset_index()
+
+
+def collect_iteration_telemetry(work_dir='./'):
+    frames = [f for f in (iteration_telemetry(run) for run in discover_runs(work_dir)) if f is not None]
+    if not frames:
+        return pd.DataFrame()
+    return attribute_slow_iterations(pd.concat(frames, ignore_index=True))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--work-dir', default='./', help='directory containing the result folders')
+    parser.add_argument('--output', default='iterationTelemetry.csv', help='CSV file with one row per iteration')
+    args = parser.parse_args()
+
+    iterations = collect_iteration_telemetry(args.work_dir)
+    if iterations.empty:
+        print("No runs with telemetry (telemetryResults_*) found.")
+    else:
+        pd.set_option('display.width', 250)
+        print(summarize(iterations).to_string(index=False, float_format=lambda v: f"{v:.3f}"))
+        iterations.to_csv(args.output, index=False)
+        print(f"Iteration telemetry was successfully saved as CSV: {args.output}")
@@ -1,7 +1,11 @@
+import argparse
+import csv
+import json
 import logging
 import os
 import shutil
 import signal
+import statistics
 import subprocess
 import sys
 import threading
@@ -42,6 +46,36 @@ OUTPUT_FILE_NAMES = {
 }
 POSTFIX = {MACHINE.X86: "_x86", MACHINE.RISC: "_risc"}
 SHELLY_VERSION = {MACHINE.X86: "1", MACHINE.RISC: "2+"}
+# SSH transport, replaced by simulator.ssh.SimulatedSSHClient to run against simulated hosts
+SSH_CLIENT = paramiko.SSHClient
+
+# Overhead profiler (--overhead): one idle window per monitor set and sampling interval
+OVERHEAD_WINDOW_DURATION = 5 * 60
+OVERHEAD_SETTLE_SECONDS = 60  # monitor startup, excluded from the CPU ticks and the analysis
+OVERHEAD_TICKS_INTERVAL_SECONDS = 30  # CPU ticks are read periodically, the analysis uses the readings as batches
+OVERHEAD_MONITOR_SETS = {
+    "none": [],
+    "procfs": [APPS.PROCFS],
+    "rapl": [APPS.RAPL],
+    "procfs+rapl": [APPS.PROCFS, APPS.RAPL],
+}
+OVERHEAD_SAMPLING_INTERVALS_MS = [1000, 500, 200, 100]
+# Monitors available per machine, windows with other monitors are skipped on a machine (no RAPL on RISC-V)
+REMOTE_MONITORS = {MACHINE.X86: [APPS.PROCFS, APPS.RAPL], MACHINE.RISC: [APPS.PROCFS]}
+# JVM option setting the sampling interval of the readers, adjust if a reader uses another property
+SAMPLING_INTERVAL_ARG = "-Dsampling.interval.ms={interval_ms}"
+# Relative deviation of the interval measured in a reader's output from the requested one above which the
+# window fails (the reader ignored SAMPLING_INTERVAL_ARG)
+SAMPLING_INTERVAL_TOLERANCE = 0.2
+# Rows of a reader's output that are written once per sample
+SAMPLE_ROWS = {APPS.PROCFS: ("SourceFile", "/proc/stat"), APPS.RAPL: ("Domain", "package-0")}
+# Aggregated ticks of /proc/stat and the /proc/<pid>/stat lines of the running monitors
+# (the brackets keep the pattern from matching the shell running the command, like RAPL_SAMPLER_STOP_COMMAND)
+MONITOR_PATTERN = "|".join(f"[{JARS[app][0]}]{JARS[app][1:]}" for app in (APPS.PROCFS, APPS.RAPL))
+CPU_TICKS_COMMAND = (
+    "head -1 /proc/stat; "
+    f"for p in $(pgrep -f '{MONITOR_PATTERN}'); do cat /proc/$p/stat 2>/dev/null; done"
+)
 
 USE_JBOSS_ARG = "-Djava.util.logging.manager=org.jboss.logmanager.LogManager"
 
@@ -56,34 +90,37 @@ SHELLY_RISC_PW = os.environ.get("SHELLY_RISC_PW")
 SHELLY_X86_IP = os.environ.get("SHELLY_X86_IP")
 SHELLY_X86_PW = os.environ.get("SHELLY_X86_PW")
 
-# Validate critical environment variables
-required_env = [
-    RISC_IP,
-    X86_IP,
-    RISC_USER,
-    X86_USER,
-    SSH_KEY_RISC,
-    SSH_KEY_X86,
-    SHELLY_RISC_IP,
-    SHELLY_RISC_PW,
-    SHELLY_X86_IP,
-    SHELLY_X86_PW,
-]
-if not all(required_env):
-    logging.error("One or more required environment variables are not set")
-    sys.exit(1)
-
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
-if not (shutil.which("java")):
-    logging.error("Java is not installed or not found in PATH")
-    sys.exit(1)
+
+def validate_environment():
+    # Validate critical environment variables
+    required_env = [
+        RISC_IP,
+        X86_IP,
+        RISC_USER,
+        X86_USER,
+        SSH_KEY_RISC,
+        SSH_KEY_X86,
+        SHELLY_RISC_IP,
+        SHELLY_RISC_PW,
+        SHELLY_X86_IP,
+        SHELLY_X86_PW,
+    ]
+    if not all(required_env):
+        logging.error("One or more required environment variables are not set")
+        sys.exit(1)
+
+    if not (shutil.which("java")):
+        logging.error("Java is not installed or not found in PATH")
+        sys.exit(1)
 
 
 def signal_handler(*_):
     logging.info("Termination signal received. Cleaning up...")
     for t in threading.enumerate():
         if isinstance(t, BenchmarkWorker):
+            t.stopped.set()
             t.cleanup()
     sys.exit(1)
 
@@ -101,6 +138,10 @@ class BenchmarkWorker(threading.Thread):
             shelly_version,
             results_folder,
             remote_basefolder_name,
+            monitors=(),
+            interval_ms=None,
+            duration=MEASUREMENT_DURATION,
+            count_ticks=False,
     ):
         super().__init__()
         self.machine = machine
@@ -114,9 +155,15 @@ class BenchmarkWorker(threading.Thread):
         self.results_folder = f"{results_folder}/{machine.name}"
         self.remote_base_folder = f"/home/{user}/{remote_basefolder_name}"
         self.remote_dir = f"{self.remote_base_folder}/{results_folder}"
+        self.monitors = list(monitors)
+        self.interval_ms = interval_ms
+        self.duration = duration
+        self.count_ticks = count_ticks
         self.shelly_process = None
         self.ssh_client = None
         self.exception = None
+        self.window = None
+        self.stopped = threading.Event()
 
     def run(self):
         postfix = POSTFIX[self.machine]
@@ -152,7 +199,11 @@ class BenchmarkWorker(threading.Thread):
                 stdout=open(shelly_log_path, "x"),
                 stderr=subprocess.STDOUT,
             )
-            time.sleep(MEASUREMENT_DURATION)
+
+            if self.monitors or self.count_ticks:
+                self.run_remote_window(postfix)
+            else:
+                self.stopped.wait(self.duration)
         except Exception as e:
             self.exception = e
             logging.error(f"[{self.machine}] Exception in run(): {e}", exc_info=True)
@@ -167,6 +218,99 @@ class BenchmarkWorker(threading.Thread):
                     f.write(f"{start_time}\n{end_time}")
                 except NameError:
                     f.write(f"No start time\n{end_time}")
+            if self.window is not None:
+                self.write_window(postfix)
+
+    def run_remote_window(self, postfix):
+        """
+        Starts the monitors on the remote machine and reads the CPU ticks of the system and the
+        monitor processes every OVERHEAD_TICKS_INTERVAL_SECONDS after the settle period, the window
+        is written by write_window once the reader outputs are fetched.
+        """
+        self.ssh_client = SSH_CLIENT()
+        self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
+        logging.info(f"[{self.machine}] Connecting to {self.ip} as {self.user}")
+        self.ssh_client.connect(
+            hostname=self.ip,
+            username=self.user,
+            key_filename=self.ssh_key,
+            timeout=10,
+        )
+        interval_arg = SAMPLING_INTERVAL_ARG.format(interval_ms=self.interval_ms) if self.interval_ms else ""
+        cmd_parts = [f"mkdir -p {self.remote_dir} && cd {self.remote_dir}"]
+        if APPS.PROCFS in self.monitors:
+            cmd_parts.append(
+                f"nohup java {USE_JBOSS_ARG} {interval_arg} -jar {self.remote_base_folder}/{JARS[APPS.PROCFS]} > {OUTPUT_FILE_NAMES[APPS.PROCFS]}{postfix} 2>&1 </dev/null &"
+            )
+        if APPS.RAPL in self.monitors:
+            cmd_parts.append(
+                f"nohup java {interval_arg} -jar {self.remote_base_folder}/{JARS[APPS.RAPL]} > {OUTPUT_FILE_NAMES[APPS.RAPL]}{postfix} 2>&1 </dev/null &"
+            )
+        remote_cmd = "; ".join(cmd_parts).replace("&;", "&")
+        logging.info(f"[{self.machine}] Remote command: {remote_cmd}")
+        _, stdout, _ = self.ssh_client.exec_command(remote_cmd)
+        stdout.channel.recv_exit_status()
+
+        window = {
+            "monitors": [app.name for app in self.monitors],
+            "interval_ms": self.interval_ms,
+            "settle_s": OVERHEAD_SETTLE_SECONDS,
+        }
+        if self.stopped.wait(OVERHEAD_SETTLE_SECONDS):
+            return
+        window["ticks"] = []
+        end = time.monotonic() + self.duration - OVERHEAD_SETTLE_SECONDS
+        while True:
+            window["ticks"].append(self.read_cpu_ticks())
+            remaining = end - time.monotonic()
+            if remaining <= 0 or self.stopped.wait(min(OVERHEAD_TICKS_INTERVAL_SECONDS, remaining)):
+                break
+        self.window = window
+
+    def write_window(self, postfix):
+        """
+        Writes overheadWindow_*.json with the sampling interval every reader actually used (median
+        interval between its samples), the window fails if one deviates from the requested interval
+        by more than SAMPLING_INTERVAL_TOLERANCE or wrote no samples.
+        """
+        measured = {}
+        if self.interval_ms:
+            for app in self.monitors:
+                output_file = os.path.join(self.results_folder, f"{OUTPUT_FILE_NAMES[app]}{postfix}")
+                measured[app.name] = measured_interval_ms(output_file, *SAMPLE_ROWS[app])
+        deviating = [
+            f"{name} {interval_ms} ms" for name, interval_ms in measured.items()
+            if interval_ms is None or abs(interval_ms / self.interval_ms - 1) > SAMPLING_INTERVAL_TOLERANCE
+        ]
+        self.window["measured_interval_ms"] = measured
+        self.window["interval_honoured"] = not deviating
+        with open(os.path.join(self.results_folder, f"overheadWindow{postfix}.json"), "w") as f:
+            json.dump(self.window, f, indent=2)
+        if deviating and self.exception is None:
+            self.exception = RuntimeError(
+                f"Readers did not sample every {self.interval_ms} ms ({', '.join(deviating)}), "
+                f"check SAMPLING_INTERVAL_ARG"
+            )
+            logging.error(f"[{self.machine}] {self.exception}")
+
+    def read_cpu_ticks(self):
+        """
+        Busy and total ticks of the machine and utime + stime of the monitor processes (from /proc/<pid>/stat).
+        """
+        _, stdout, _ = self.ssh_client.exec_command(CPU_TICKS_COMMAND)
+        lines = stdout.read().decode().splitlines()
+        ticks = {"time": time.time(), "busy": 0, "total": 0, "monitors": 0}
+        for line in lines:
+            if line.startswith("cpu "):
+                values = [int(v) for v in line.split()[1:]]
+                ticks["total"] = sum(values)
+                # idle and iowait
+                ticks["busy"] = ticks["total"] - values[3] - values[4]
+            elif ")" in line:
+                # fields after the command name, utime and stime are fields 14 and 15 of the stat line
+                fields = line.rsplit(")", 1)[1].split()
+                ticks["monitors"] += int(fields[11]) + int(fields[12])
+        return ticks
 
     def cleanup(self):
         logging.info(f"[{self.machine}] Cleaning up resources")
@@ -183,56 +327,150 @@ class BenchmarkWorker(threading.Thread):
                     f"[{self.machine}] Failed to kill Shelly reader: {e}", exc_info=True
                 )
 
+        # 2) kill remote monitors and fetch their results
+        if self.ssh_client:
+            for jar in [JARS[app] for app in self.monitors]:
+                try:
+                    logging.info(f"[{self.machine}] Killing remote processes for {jar}")
+                    self.ssh_client.exec_command(f"pkill -9 -f {jar}")
+                except Exception as e:
+                    logging.error(
+                        f"[{self.machine}] Error killing remote jar {jar}: {e}",
+                        exc_info=True,
+                    )
+            try:
+                sftp = self.ssh_client.open_sftp()
+                for fname in sftp.listdir(self.remote_dir):
+                    logging.info(f"[{self.machine}] Downloading {fname}")
+                    sftp.get(f"{self.remote_dir}/{fname}", os.path.join(self.results_folder, fname))
+                sftp.close()
+            except Exception as e:
+                logging.error(f"[{self.machine}] SFTP error: {e}", exc_info=True)
+            try:
+                self.ssh_client.close()
+            except Exception:
+                pass
+            self.ssh_client = None
+
+
+def measured_interval_ms(output_file, source_column, source):
+    """
+    Median interval in ms between the rows of one source (e.g. /proc/stat) in the output of a reader,
+    None if the file is missing or has fewer than two samples.
+    """
+    if not os.path.exists(output_file):
+        return None
+    timestamps = []
+    with open(output_file, newline="") as f:
+        for row in csv.DictReader(f, skipinitialspace=True):
+            try:
+                if row[source_column] == source:
+                    timestamps.append(int(row["Timestamp"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+    steps = [end - start for start, end in zip(timestamps, timestamps[1:])]
+    return statistics.median(steps) if steps else None
+
+
+def create_worker(machine: MACHINE, results_folder, remote_basefolder_name, **window):
+    settings = {
+        MACHINE.X86: (X86_IP, X86_USER, SSH_KEY_X86, SHELLY_X86_IP, SHELLY_X86_PW, 8080),
+        MACHINE.RISC: (RISC_IP, RISC_USER, SSH_KEY_RISC, SHELLY_RISC_IP, SHELLY_RISC_PW, 8081),
+    }
+    ip, user, ssh_key, shelly_ip, shelly_pw, shelly_port = settings[machine]
+    return BenchmarkWorker(
+        machine,
+        ip,
+        user,
+        ssh_key,
+        shelly_ip,
+        shelly_pw,
+        shelly_port,
+        SHELLY_VERSION[machine],
+        results_folder,
+        remote_basefolder_name,
+        **window,
+    )
+
+
+def run_window(results_folder, remote_basefolder_name, machines=(MACHINE.X86, MACHINE.RISC), **window):
+    os.makedirs(results_folder, exist_ok=True)
+    workers = [create_worker(machine, results_folder, remote_basefolder_name, **window) for machine in machines]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    # Exit early if any worker encountered an error
+    if any(worker.exception for worker in workers):
+        sys.exit(1)
+
+
+def overhead_windows():
+    """(name, monitors, interval) of every idle window, the window without monitors has no interval."""
+    windows = []
+    for name, monitors in OVERHEAD_MONITOR_SETS.items():
+        if not monitors:
+            windows.append((name, monitors, None))
+            continue
+        for interval_ms in OVERHEAD_SAMPLING_INTERVALS_MS:
+            windows.append((f"{name}_{interval_ms}ms", monitors, interval_ms))
+    return windows
+
+
+def run_overhead_profile(date_str, time_str):
+    """
+    Runs one idle window per monitor set and sampling interval, analyse them with python -m enviroinfo.overhead.
+    """
+    windows = overhead_windows()
+    logging.info(
+        f"Running {len(windows)} overhead windows of {OVERHEAD_WINDOW_DURATION} s "
+        f"(about {len(windows) * OVERHEAD_WINDOW_DURATION / 60:.0f} minutes)"
+    )
+    for name, monitors, interval_ms in windows:
+        machines = [m for m in MACHINE if all(app in REMOTE_MONITORS[m] for app in monitors)]
+        logging.info(f"Running overhead window {name} on {', '.join(m.name for m in machines)}")
+        run_window(
+            f"baseline-measurement_overhead/{date_str}{time_str}/{name}",
+            "baseline-measurement",
+            machines=machines,
+            monitors=monitors,
+            interval_ms=interval_ms,
+            duration=OVERHEAD_WINDOW_DURATION,
+            count_ticks=True,
+        )
+    logging.info(f"Finished overhead profile, analyse it with: python -m enviroinfo.overhead")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Measures the idle power consumption of the x86 and RISC-V machines")
+    parser.add_argument(
+        "--overhead",
+        action="store_true",
+        help="profile the measurement overhead: one idle window per combination of monitors "
+             "and sampling interval (OVERHEAD_MONITOR_SETS, OVERHEAD_SAMPLING_INTERVALS_MS)",
+    )
+    return parser.parse_args()
+
 
 def main():
+    args = parse_args()
+    validate_environment()
+
     # Add signal handler for interrupt
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
-    # Get nproc for remote machines
-
     # Set up results folder
     date_str = time.strftime("%d-%m-%Y")
     time_str = time.strftime("%H-%M-%S")
 
+    if args.overhead:
+        run_overhead_profile(date_str, time_str)
+        return
+
     # Create results folder
     logging.info(f"Running baseline measurement")
-    results_folder = f"baseline-measurement/{date_str}{time_str}"
-    os.makedirs(results_folder, exist_ok=True)
-
-    # Run benchmarks
-    risc = BenchmarkWorker(
-        MACHINE.RISC,
-        RISC_IP,
-        RISC_USER,
-        SSH_KEY_RISC,
-        SHELLY_RISC_IP,
-        SHELLY_RISC_PW,
-        8081,
-        SHELLY_VERSION[MACHINE.RISC],
-        results_folder,
-        "baseline-measurement",
-    )
-    x86 = BenchmarkWorker(
-        MACHINE.X86,
-        X86_IP,
-        X86_USER,
-        SSH_KEY_X86,
-        SHELLY_X86_IP,
-        SHELLY_X86_PW,
-        8080,
-        SHELLY_VERSION[MACHINE.X86],
-        results_folder,
-        "baseline-measurement",
-    )
-
-    x86.start()
-    risc.start()
-    x86.join()
-    risc.join()
-    # Exit early if any worker encountered an error
-    if risc.exception:
-        sys.exit(1)
+    run_window(f"baseline-measurement/{date_str}{time_str}", "baseline-measurement")
     logging.info(f"Finished baseline measurement")
 
 
@@ -1,3 +1,5 @@
+import argparse
+import json
 import os
 import shutil
 import sys
@@ -13,26 +15,92 @@ import paramiko
 from dotenv import load_dotenv
 from enum import Enum
 
+import planner
+import sweep
+import timeline
+
 load_dotenv("benchmark.env")
 # Configuration
-BENCHMARKS = [  # Running these sequentially
+BENCHMARKS = [  # Running these sequentially: (name, warm-up iterations, steady-state iterations)
     # Functional
-    ("future-genetic", 50 + 13),
-    ("mnemonics", 16 + 10),
-    ("par-mnemonics", 16 + 10),
-    ("rx-scrabble", 80 + 21),
-    ("scrabble", 50 + 13),
+    ("future-genetic", 50, 13),
+    ("mnemonics", 16, 10),
+    ("par-mnemonics", 16, 10),
+    ("rx-scrabble", 80, 21),
+    ("scrabble", 50, 13),
     # Concurrency
-    ("akka-uct", 24 + 10),
-    ("fj-kmeans", 30 + 10),
-    ("reactors", 10 + 10),
+    ("akka-uct", 24, 10),
+    ("fj-kmeans", 30, 10),
+    ("reactors", 10, 10),
 ]
 JVM_ARGS = "--add-opens java.base/sun.nio.ch=ALL-UNNAMED --add-opens java.base/java.nio=ALL-UNNAMED --add-opens java.base/java.lang.invoke=ALL-UNNAMED --add-opens java.base/java.util=ALL-UNNAMED"
+# Flag sets compared by the JVM sweep (--sweep), each is appended to JVM_ARGS
+JVM_CONFIGURATIONS = {
+    "DEFAULT": "",
+    "SERIAL-GC": "-XX:+UseSerialGC",
+    "PARALLEL-GC": "-XX:+UseParallelGC",
+    "HEAP-2G": "-Xms2g -Xmx2g",
+    "C1-ONLY": "-XX:TieredStopAtLevel=1",
+    "CI-COUNT-2": "-XX:CICompilerCount=2",
+}
 X86_DISABLE_TURBO = False
 X86_DISABLE_TURBO_STRING = "echo \"1\" > /sys/devices/system/cpu/intel_pstate/no_turbo"
 X86_ENABLE_TURBO_STRING = "echo \"0\" > /sys/devices/system/cpu/intel_pstate/no_turbo"
 
 STATIC_BM_PARAMS = ""  # for gpl not needed
+RUN_CONFIGURATION = "CPU100"
+COOLDOWN_SECONDS = 30
+# Compare the finished campaign with the previous results; the check runs enviroinfo.regression with the
+# interpreter of the orchestrator, so pandas, numpy and scipy must be installed in it as well
+REGRESSION_CHECK = False
+# Exit code of enviroinfo.regression (REGRESSION_EXIT_CODE) when a regression was flagged
+REGRESSION_EXIT_CODE = 3
+# Sample the core frequencies and thermal zones on the remote machines alongside procfs. Off by default as the
+# sampler (a shell loop on CPU_AFFINITY's telemetry CPUs with CPU_PLACEMENT) adds load to the measured machine
+TELEMETRY_SAMPLING = False
+TELEMETRY_INTERVAL_SECONDS = 1
+# Shell loop writing "Timestamp (ms),Source,Kind,Value" rows; uses the read builtin to avoid a fork per file
+TELEMETRY_SAMPLER = (
+    "echo Timestamp,Source,Kind,Value; "
+    "while :; do t=$(date +%s%3N); "
+    "for f in /sys/devices/system/cpu/cpu[0-9]*/cpufreq/scaling_cur_freq; do "
+    "[ -r $f ] && read v < $f && c=${f#/sys/devices/system/cpu/} && echo $t,${c%%/*},freq_khz,$v; done; "
+    "for z in /sys/class/thermal/thermal_zone*; do "
+    "[ -r $z/temp ] && read v < $z/temp && read n < $z/type && echo $t,${z##*/}:$n,temp_mc,$v; done; "
+    f"sleep {TELEMETRY_INTERVAL_SECONDS}; done"
+)
+TELEMETRY_PROCESS_NAME = "telemetry-sampler"
+# Idle windows before and after every benchmark with the monitors running, used by the energy analysis
+# as baseline of the run instead of the separate baseline measurement. Off (0) by default as they add twice
+# their duration to every run; e.g. 30 enables them, windows must be longer than the 5 s the analysis skips
+IDLE_WINDOW_SECONDS = 0
+IDLE_WINDOW_COMMAND = (
+    f"echo {timeline.IDLE_WINDOW_STARTED}; sleep {IDLE_WINDOW_SECONDS}; echo {timeline.IDLE_WINDOW_COMPLETED}"
+)
+# High-rate RAPL sampling on x86: rapl_sampler.py is uploaded and run with the python3 of the machine next to
+# powercap-reader, reading the energy counters every RAPL_HIGH_RATE_INTERVAL_MS into raplHighRate_x86
+RAPL_HIGH_RATE = False
+RAPL_HIGH_RATE_INTERVAL_MS = 20
+RAPL_SAMPLER_SCRIPT = "rapl_sampler.py"
+# the sampler flushes its ring buffer on SIGTERM; the bracket keeps pgrep from matching the shell running it
+RAPL_SAMPLER_STOP_COMMAND = (
+    f"pkill -TERM -f '[r]{RAPL_SAMPLER_SCRIPT[1:]}'; "
+    f"for i in $(seq 50); do pgrep -f '[r]{RAPL_SAMPLER_SCRIPT[1:]}' > /dev/null || break; sleep 0.1; done"
+)
+# GC pauses and safepoints (unified logging) and JIT compilations (JFR) of the benchmark JVM,
+# evaluated by enviroinfo.jvmevents; the files land in the remote results folder and are fetched with it
+GC_LOGGING = False
+GC_LOG_ARGS = "-Xlog:gc*=info,safepoint=info:file={file}:time,uptimenanos,level,tags"
+JFR_RECORDING = False
+# the default and profile settings only record compilations above 1 s / 100 ms
+JFR_ARGS = "-XX:StartFlightRecording=filename={file},settings=profile,jdk.Compilation#threshold=0ms"
+# Co-location (--colocate): COLOCATION_LEVELS Renaissance JVMs run at once on every machine, evaluated by
+# enviroinfo.colocation; with a CPU_PLACEMENT other than NONE and COLOCATION_SPLIT_CPUS the Renaissance CPUs
+# of CPU_AFFINITY are split among the JVMs, otherwise all of them share the CPUs
+COLOCATION_LEVELS = [1, 2, 4]
+COLOCATION_SPLIT_CPUS = True
+COLOCATION_INTERVAL_SECONDS = 1
+COLOCATION_PROCESS_NAME = "colocation-sampler"
 
 MACHINE = Enum(
     "MACHINE",
@@ -48,6 +116,11 @@ APPS = Enum(
         "PROCFS",
         "RAPL",
         "RENAISSANCE",
+        "TELEMETRY",
+        "GCLOG",
+        "JFR",
+        "RAPL_HIGH_RATE",
+        "COLOCATION",
     ],
 )
 JARS = {
@@ -61,9 +134,43 @@ OUTPUT_FILE_NAMES = {
     APPS.PROCFS: "procfsResults",
     APPS.RAPL: "raplResults",
     APPS.RENAISSANCE: "renaissance",
+    APPS.TELEMETRY: "telemetryResults",
+    APPS.GCLOG: "gcLog",
+    APPS.JFR: "jvmEvents",
+    APPS.RAPL_HIGH_RATE: "raplHighRate",
+    APPS.COLOCATION: "colocationProcfs",
 }
+# PIDs of the co-located JVMs in start order, written by the remote command and read by the sampler
+COLOCATION_PID_FILE = "renaissancePids"
 POSTFIX = {MACHINE.X86: "_x86", MACHINE.RISC: "_risc"}
+
+# CPU placement of the remote processes: NONE leaves all processes unpinned, TASKSET pins them with
+# taskset and CGROUP starts them in a transient systemd scope restricted to the given CPUs
+PLACEMENT = Enum(
+    "PLACEMENT",
+    [
+        "NONE",
+        "TASKSET",
+        "CGROUP",
+    ],
+)
+CPU_PLACEMENT = PLACEMENT.NONE
+# CPU lists per machine and process, a missing entry leaves the process unpinned
+CPU_AFFINITY = {
+    MACHINE.X86: {APPS.PROCFS: "0", APPS.RAPL: "0", APPS.RAPL_HIGH_RATE: "0", APPS.TELEMETRY: "0",
+                  APPS.COLOCATION: "0", APPS.RENAISSANCE: "1-3"},
+    MACHINE.RISC: {APPS.PROCFS: "0", APPS.TELEMETRY: "0", APPS.COLOCATION: "0", APPS.RENAISSANCE: "1-7"},
+}
+
+# Core-count scaling sweep (--scaling): every benchmark runs with each number of online cores, the other CPUs
+# are taken offline through CPU hot-plug (needs write access to /sys like X86_DISABLE_TURBO) and the saved
+# hot-plug state is restored after every run; machines with fewer cores skip the larger counts
+SCALING_CORE_COUNTS = {MACHINE.X86: [1, 2, 3, 4], MACHINE.RISC: [1, 2, 3, 4, 5, 6, 7, 8]}
+CPU_HOTPLUG_DIR = "/sys/devices/system/cpu"
+
 SHELLY_VERSION = {MACHINE.X86: "1", MACHINE.RISC: "2+"}
+# SSH transport, replaced by simulator.ssh.SimulatedSSHClient to run against simulated hosts
+SSH_CLIENT = paramiko.SSHClient
 
 USE_JBOSS_ARG = "-Djava.util.logging.manager=org.jboss.logmanager.LogManager"
 
@@ -78,28 +185,130 @@ SHELLY_RISC_PW = os.environ.get("SHELLY_RISC_PW")
 SHELLY_X86_IP = os.environ.get("SHELLY_X86_IP")
 SHELLY_X86_PW = os.environ.get("SHELLY_X86_PW")
 
-# Validate critical environment variables
-required_env = [
-    RISC_IP,
-    X86_IP,
-    RISC_USER,
-    X86_USER,
-    SSH_KEY_RISC,
-    SSH_KEY_X86,
-    SHELLY_RISC_IP,
-    SHELLY_RISC_PW,
-    SHELLY_X86_IP,
-    SHELLY_X86_PW,
-]
-if not all(required_env):
-    logging.error("One or more required environment variables are not set")
-    sys.exit(1)
-
 logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(message)s")
 
-if not (shutil.which("java")):
-    logging.error("Java is not installed or not found in PATH")
-    sys.exit(1)
+
+def validate_environment():
+    # Validate critical environment variables
+    required_env = [
+        RISC_IP,
+        X86_IP,
+        RISC_USER,
+        X86_USER,
+        SSH_KEY_RISC,
+        SSH_KEY_X86,
+        SHELLY_RISC_IP,
+        SHELLY_RISC_PW,
+        SHELLY_X86_IP,
+        SHELLY_X86_PW,
+    ]
+    if not all(required_env):
+        logging.error("One or more required environment variables are not set")
+        sys.exit(1)
+
+    if not (shutil.which("java")):
+        logging.error("Java is not installed or not found in PATH")
+        sys.exit(1)
+
+
+def run_configuration():
+    if CPU_PLACEMENT == PLACEMENT.NONE:
+        return RUN_CONFIGURATION
+    return f"PINNED_{RUN_CONFIGURATION}"
+
+
+def placement_prefix(machine: MACHINE, app: APPS, cpus=None) -> str:
+    """
+    Returns the command prefix that places a remote process on its configured CPUs (or the given CPU list).
+    """
+    cpus = cpus or CPU_AFFINITY[machine].get(app)
+    if CPU_PLACEMENT == PLACEMENT.NONE or not cpus:
+        return ""
+    if CPU_PLACEMENT == PLACEMENT.TASKSET:
+        return f"taskset -c {cpus} "
+    return f"systemd-run --scope --quiet -p AllowedCPUs={cpus} "
+
+
+def jvm_event_args(remote_dir, postfix) -> str:
+    """
+    Returns the JVM options enabling GC logging and the JFR recording of the benchmark, empty if both are off.
+    """
+    args = []
+    if GC_LOGGING:
+        args.append(GC_LOG_ARGS.format(file=f"{remote_dir}/{OUTPUT_FILE_NAMES[APPS.GCLOG]}{postfix}.log"))
+    if JFR_RECORDING:
+        args.append(JFR_ARGS.format(file=f"{remote_dir}/{OUTPUT_FILE_NAMES[APPS.JFR]}{postfix}.jfr"))
+    return " ".join(args)
+
+
+def expand_cpu_list(cpu_list):
+    """Returns the CPUs of a CPU list like "1-3" or "1,3-5"."""
+    cpus = []
+    for part in cpu_list.split(","):
+        first, _, last = part.partition("-")
+        cpus.extend(range(int(first), int(last or first) + 1))
+    return cpus
+
+
+def colocation_cpus(cpu_list, instances):
+    """
+    Splits a CPU list like "1-3" or "1,3-5" into one contiguous CPU list per co-located JVM, with more
+    JVMs than CPUs the CPUs are assigned round-robin.
+    """
+    cpus = expand_cpu_list(cpu_list)
+    if instances >= len(cpus):
+        return [str(cpus[index % len(cpus)]) for index in range(instances)]
+    size, larger = divmod(len(cpus), instances)
+    lists, start = [], 0
+    for index in range(instances):
+        end = start + size + (index < larger)
+        lists.append(",".join(str(cpu) for cpu in cpus[start:end]))
+        start = end
+    return lists
+
+
+def colocation_sampler(pid_file) -> str:
+    """
+    Shell loop writing the ticks of the machine (/proc/stat) and of every PID in pid_file in the format
+    of procfs-reader ("SourceFile,Timestamp,userTime (Ticks),systemTime (Ticks)"), the procfs-reader only
+    follows a single benchmark process.
+    """
+    return (
+        'echo "SourceFile,Timestamp,userTime (Ticks),systemTime (Ticks)"; '
+        "while :; do t=$(date +%s%3N); "
+        "read c u n s r < /proc/stat && echo /proc/stat,$t,$((u + n)),$s; "
+        f"for p in $(cat {pid_file} 2>/dev/null); do "
+        "[ -r /proc/$p/stat ] && read -a f < /proc/$p/stat && echo /proc/$p/stat,$t,${f[13]},${f[14]}; done; "
+        f"sleep {COLOCATION_INTERVAL_SECONDS}; done"
+    )
+
+
+def cpu_online_command(cores) -> str:
+    """
+    Returns the command bringing cpu0 to cpu<cores - 1> online and the other CPUs offline and printing the
+    number of online CPUs afterwards (CPUs without an online file, usually cpu0, cannot be taken offline).
+    """
+    return (
+        f"k=0; for c in {CPU_HOTPLUG_DIR}/cpu[0-9]*; do n=${{c##*/cpu}}; "
+        f"if [ -w $c/online ]; then if [ $n -lt {cores} ]; then echo 1 > $c/online; else echo 0 > $c/online; fi; fi; "
+        "if [ ! -e $c/online ] || [ $(cat $c/online) = 1 ]; then k=$((k + 1)); fi; done; echo $k"
+    )
+
+
+def cpu_restore_command(state) -> str:
+    """Returns the command writing a saved hot-plug state back, the CPUs going online first."""
+    ordered = sorted(state.items(), key=lambda item: item[1] != "1")
+    return "; ".join(f"echo {value} > {path}" for path, value in ordered)
+
+
+def describe_placement() -> str:
+    if CPU_PLACEMENT == PLACEMENT.NONE:
+        return "CPU placement: NONE"
+    machines = []
+    for machine, apps in CPU_AFFINITY.items():
+        cpus = ", ".join(f"{app.name}={cpu_list}" for app, cpu_list in apps.items())
+        machines.append(f"{machine.name}: {cpus}")
+    return f"CPU placement: {CPU_PLACEMENT.name} ({'; '.join(machines)})"
 
 
 def signal_handler(*_):
@@ -125,6 +334,8 @@ class BenchmarkWorker(threading.Thread):
             bm_params,
             results_folder,
             remote_basefolder_name,
+            workloads=None,
+            online_cores=None,
     ):
         super().__init__()
         self.machine = machine
@@ -140,9 +351,15 @@ class BenchmarkWorker(threading.Thread):
         self.results_folder = f"{results_folder}/{machine.name}"
         self.remote_base_folder = f"/home/{user}/{remote_basefolder_name}"
         self.remote_dir = f"{self.remote_base_folder}/{results_folder}"
+        # Renaissance parameters of the co-located JVMs, None runs bm_params in a single JVM
+        self.workloads = workloads
+        # number of CPUs left online through hot-plug, None leaves the CPUs as they are
+        self.online_cores = online_cores
+        self.cpu_online_state = None
         self.shelly_process = None
         self.ssh_client = None
         self.exception = None
+        self.timeline = timeline.PhaseTimeline(machine.name)
 
     def run(self):
         postfix = POSTFIX[self.machine]
@@ -151,6 +368,7 @@ class BenchmarkWorker(threading.Thread):
             logging.info(f"[{self.machine}] Starting benchmark worker")
 
             # 1) start local Shelly reader
+            self.timeline.begin("shelly_start")
             parent_directory = dirname(dirname(abspath(__file__)))
             shelly_log_filename = f"{OUTPUT_FILE_NAMES[APPS.SHELLY]}{postfix}"
             shelly_log_path = os.path.join(self.results_folder, shelly_log_filename)
@@ -179,7 +397,8 @@ class BenchmarkWorker(threading.Thread):
             )
 
             # 2) connect via SSH using Paramiko
-            self.ssh_client = paramiko.SSHClient()
+            self.timeline.begin("ssh_connect")
+            self.ssh_client = SSH_CLIENT()
             self.ssh_client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
             logging.info(f"[{self.machine}] Connecting to {self.ip} as {self.user}")
             self.ssh_client.connect(
@@ -189,31 +408,65 @@ class BenchmarkWorker(threading.Thread):
                 timeout=10,
             )
 
+            if self.machine == MACHINE.X86 and RAPL_HIGH_RATE:
+                sftp = self.ssh_client.open_sftp()
+                sftp.put(os.path.join(dirname(abspath(__file__)), RAPL_SAMPLER_SCRIPT),
+                         f"{self.remote_base_folder}/{RAPL_SAMPLER_SCRIPT}")
+                sftp.close()
+
+            if self.online_cores:
+                self.set_online_cores()
+
             # 3) build remote command
             cmd_parts = [
                 f"mkdir -p {self.remote_dir} && cd {self.remote_dir}",
                 # start procfs monitor
-                f"nohup java {USE_JBOSS_ARG} -jar {self.remote_base_folder}/{JARS[APPS.PROCFS]} > {OUTPUT_FILE_NAMES[APPS.PROCFS]}{postfix} 2>&1 </dev/null &",
+                f"nohup {placement_prefix(self.machine, APPS.PROCFS)}java {USE_JBOSS_ARG} -jar {self.remote_base_folder}/{JARS[APPS.PROCFS]} > {OUTPUT_FILE_NAMES[APPS.PROCFS]}{postfix} 2>&1 </dev/null &",
             ]
+            # sample core frequencies and temperatures, the process name lets cleanup() find the shell loop
+            if TELEMETRY_SAMPLING:
+                cmd_parts.append(
+                    f"nohup {placement_prefix(self.machine, APPS.TELEMETRY)}bash -c '{TELEMETRY_SAMPLER}' {TELEMETRY_PROCESS_NAME} > {OUTPUT_FILE_NAMES[APPS.TELEMETRY]}{postfix} 2>&1 </dev/null &",
+                )
+            # per-PID ticks of the co-located JVMs
+            if self.workloads:
+                cmd_parts.append(
+                    f"nohup {placement_prefix(self.machine, APPS.COLOCATION)}bash -c '{colocation_sampler(COLOCATION_PID_FILE + postfix)}' {COLOCATION_PROCESS_NAME} > {OUTPUT_FILE_NAMES[APPS.COLOCATION]}{postfix} 2>&1 </dev/null &",
+                )
             # on x86 also start RAPL monitor
             if self.machine == MACHINE.X86:
                 if X86_DISABLE_TURBO:
                     cmd_parts.append(X86_DISABLE_TURBO_STRING, )
 
                 cmd_parts.append(
-                    f"nohup java -jar {self.remote_base_folder}/{JARS[APPS.RAPL]} > {self.remote_dir}/{OUTPUT_FILE_NAMES[APPS.RAPL]}{postfix} 2>&1 </dev/null &",
+                    f"nohup {placement_prefix(self.machine, APPS.RAPL)}java -jar {self.remote_base_folder}/{JARS[APPS.RAPL]} > {self.remote_dir}/{OUTPUT_FILE_NAMES[APPS.RAPL]}{postfix} 2>&1 </dev/null &",
                 )
+                if RAPL_HIGH_RATE:
+                    cmd_parts.append(
+                        f"nohup {placement_prefix(self.machine, APPS.RAPL_HIGH_RATE)}python3 {self.remote_base_folder}/{RAPL_SAMPLER_SCRIPT} --interval-ms {RAPL_HIGH_RATE_INTERVAL_MS} --output {self.remote_dir}/{OUTPUT_FILE_NAMES[APPS.RAPL_HIGH_RATE]}{postfix} > {self.remote_dir}/raplSampler{postfix}.log 2>&1 </dev/null &",
+                    )
+            if IDLE_WINDOW_SECONDS:
+                cmd_parts.append(IDLE_WINDOW_COMMAND)
             # run the JMH benchmark
-            outputArgs = f"--csv {self.remote_dir}/{OUTPUT_FILE_NAMES[APPS.RENAISSANCE]}Output{postfix}.csv"
-            cmd_parts.append(
-                f"java {self.jvm_args} -jar /home/{self.user}/renaissance/{JARS[APPS.RENAISSANCE]} {outputArgs} {self.bm_params}"
-            )
+            if self.workloads:
+                cmd_parts.extend(self.colocated_commands(postfix))
+            else:
+                outputArgs = f"--csv {self.remote_dir}/{OUTPUT_FILE_NAMES[APPS.RENAISSANCE]}Output{postfix}.csv"
+                jvm_args = f"{self.jvm_args} {jvm_event_args(self.remote_dir, postfix)}".strip()
+                cmd_parts.append(
+                    f"{placement_prefix(self.machine, APPS.RENAISSANCE)}java {jvm_args} -jar /home/{self.user}/renaissance/{JARS[APPS.RENAISSANCE]} {outputArgs} {self.bm_params}"
+                )
             # build full remote command string, collapsing any '&;' sequences to '&' to avoid bash syntax errors
             cmd_str = "; ".join(cmd_parts)
             cmd_str = cmd_str.replace("&;", "&")
-            remote_cmd = f"{cmd_str}; exit $?"
+            if IDLE_WINDOW_SECONDS:
+                # keep the exit status of the benchmark, not the one of the idle window
+                remote_cmd = f"{cmd_str}; status=$?; {IDLE_WINDOW_COMMAND}; exit $status"
+            else:
+                remote_cmd = f"{cmd_str}; exit $?"
 
             logging.info(f"[{self.machine}] Running remote benchmark")
+            self.timeline.begin("remote_startup")
             start_time = time.time()
             stdin, stdout, stderr = self.ssh_client.exec_command(
                 remote_cmd, get_pty=True
@@ -223,7 +476,10 @@ class BenchmarkWorker(threading.Thread):
             # stream remote stdout
             for line in stdout:
                 logging.info(f"[{self.machine}][remote] {line.rstrip()}")
+                self.timeline.observe(line)
             exit_status = stdout.channel.recv_exit_status()
+            self.timeline.end_benchmark()
+            self.timeline.end()
             if exit_status != 0:
                 err = stderr.read().decode().strip()
                 logging.error(
@@ -244,9 +500,70 @@ class BenchmarkWorker(threading.Thread):
                     f.write(f"{start_time}\n{end_time}")
                 except NameError:
                     f.write(f"No start time\n{end_time}")
+            self.timeline.write(os.path.join(self.results_folder, f"timeline{POSTFIX[self.machine]}.json"))
+
+    def set_online_cores(self):
+        """
+        Saves the hot-plug state of the CPUs, which cleanup() restores, and takes all but online_cores CPUs
+        offline. The resulting number of online CPUs is written to cpuOnline_*.txt.
+        """
+        _, stdout, _ = self.ssh_client.exec_command(f"grep -H . {CPU_HOTPLUG_DIR}/cpu[0-9]*/online")
+        self.cpu_online_state = dict(line.strip().rsplit(":", 1) for line in stdout if ":" in line)
+        logging.info(f"[{self.machine}] Taking CPUs offline, {self.online_cores} stay online")
+        _, stdout, stderr = self.ssh_client.exec_command(cpu_online_command(self.online_cores))
+        online = stdout.read().decode().strip()
+        if stdout.channel.recv_exit_status() != 0 or online != str(self.online_cores):
+            raise RuntimeError(
+                f"CPU hot-plug left {online or 'unknown'} instead of {self.online_cores} CPUs online: "
+                f"{stderr.read().decode().strip()}"
+            )
+        with open(os.path.join(self.results_folder, f"cpuOnline{POSTFIX[self.machine]}.txt"), "w") as f:
+            f.write(online)
+
+    def restore_online_cores(self):
+        try:
+            logging.info(f"[{self.machine}] Restoring the hot-plug state of the CPUs")
+            _, stdout, _ = self.ssh_client.exec_command(cpu_restore_command(self.cpu_online_state))
+            stdout.channel.recv_exit_status()
+        except Exception as e:
+            logging.error(
+                f"[{self.machine}] Failed to restore the online CPUs: {e}",
+                exc_info=True,
+            )
+
+    def colocated_commands(self, postfix):
+        """
+        Returns the commands starting one Renaissance JVM per workload in the background (outputs with the
+        postfix -<index>) and waiting for all of them; the exit status is the one of the last failed JVM.
+        The placement of the JVMs is written to colocation_*.json.
+        """
+        renaissance_cpus = CPU_AFFINITY[self.machine].get(APPS.RENAISSANCE)
+        if CPU_PLACEMENT == PLACEMENT.NONE or not renaissance_cpus:
+            cpus = [None] * len(self.workloads)
+        elif COLOCATION_SPLIT_CPUS:
+            cpus = colocation_cpus(renaissance_cpus, len(self.workloads))
+        else:
+            cpus = [renaissance_cpus] * len(self.workloads)
+        pid_file = f"{COLOCATION_PID_FILE}{postfix}"
+        commands = [f": > {pid_file}"]
+        instances = []
+        for index, (bm_params, instance_cpus) in enumerate(zip(self.workloads, cpus)):
+            instance = f"{postfix}-{index}"
+            outputArgs = f"--csv {self.remote_dir}/{OUTPUT_FILE_NAMES[APPS.RENAISSANCE]}Output{instance}.csv"
+            jvm_args = f"{self.jvm_args} {jvm_event_args(self.remote_dir, instance)}".strip()
+            commands.append(
+                f"{placement_prefix(self.machine, APPS.RENAISSANCE, instance_cpus)}java {jvm_args} -jar /home/{self.user}/renaissance/{JARS[APPS.RENAISSANCE]} {outputArgs} {bm_params} & echo $! >> {pid_file}"
+            )
+            instances.append({"index": index, "bm_params": bm_params.strip(), "cpus": instance_cpus})
+        commands.append(f"status=0; for pid in $(cat {pid_file}); do wait $pid || status=$?; done; (exit $status)")
+        with open(os.path.join(self.results_folder, f"colocation{postfix}.json"), "w") as f:
+            json.dump({"level": len(self.workloads), "placement": CPU_PLACEMENT.name, "instances": instances}, f,
+                      indent=2)
+        return commands
 
     def cleanup(self):
         logging.info(f"[{self.machine}] Cleaning up resources")
+        self.timeline.begin("kill")
 
         # 1) kill local Shelly reader
         if self.shelly_process and self.shelly_process.poll() is None:
@@ -263,8 +580,23 @@ class BenchmarkWorker(threading.Thread):
         # 2) kill remote monitors and benchmark
         if self.ssh_client:
             jars_to_kill = [JARS[APPS.RENAISSANCE], JARS[APPS.PROCFS]]
+            if TELEMETRY_SAMPLING:
+                jars_to_kill.append(TELEMETRY_PROCESS_NAME)
+            if self.workloads:
+                jars_to_kill.append(COLOCATION_PROCESS_NAME)
             if self.machine == MACHINE.X86:
                 jars_to_kill.append(JARS[APPS.RAPL])
+                if RAPL_HIGH_RATE:
+                    jars_to_kill.append(RAPL_SAMPLER_SCRIPT)
+                    try:
+                        logging.info(f"[{self.machine}] Stopping high-rate RAPL sampler")
+                        _, stdout, _ = self.ssh_client.exec_command(RAPL_SAMPLER_STOP_COMMAND)
+                        stdout.channel.recv_exit_status()
+                    except Exception as e:
+                        logging.error(
+                            f"[{self.machine}] Failed to stop the RAPL sampler: {e}",
+                            exc_info=True,
+                        )
                 if X86_DISABLE_TURBO:
                     try:
                         logging.info(f"[{self.machine}] re-enabling turbo mode")
@@ -283,8 +615,11 @@ class BenchmarkWorker(threading.Thread):
                         f"[{self.machine}] Error killing remote jar {jar}: {e}",
                         exc_info=True,
                     )
+            if self.cpu_online_state:
+                self.restore_online_cores()
 
             # 3) fetch all result files via SFTP
+            self.timeline.begin("sftp_transfer")
             try:
                 sftp = self.ssh_client.open_sftp()
                 # Copy every file in the remote results folder
@@ -319,15 +654,17 @@ class BenchmarkWorker(threading.Thread):
                 logging.error(f"[{self.machine}] SFTP error: {e}", exc_info=True)
 
             # close SSH
+            self.timeline.begin("ssh_close")
             try:
                 self.ssh_client.close()
             except Exception:
                 pass
+        self.timeline.end()
 
 
 def get_remote_info(host, user, key) -> str:
     try:
-        client = paramiko.SSHClient()
+        client = SSH_CLIENT()
         client.set_missing_host_key_policy(paramiko.AutoAddPolicy())
         client.connect(hostname=host, username=user, key_filename=key, timeout=10)
         _, nproc_stdout, _ = client.exec_command("nproc")
@@ -343,75 +680,314 @@ def get_remote_info(host, user, key) -> str:
         return 1
 
 
+MACHINE_ORDER = [MACHINE.X86, MACHINE.RISC]
+
+
+def create_worker(machine: MACHINE, jvm_args, bm_params, results_folder, workloads=None, online_cores=None):
+    settings = {
+        MACHINE.X86: (X86_IP, X86_USER, SSH_KEY_X86, SHELLY_X86_IP, SHELLY_X86_PW, 8080),
+        MACHINE.RISC: (RISC_IP, RISC_USER, SSH_KEY_RISC, SHELLY_RISC_IP, SHELLY_RISC_PW, 8081),
+    }
+    ip, user, ssh_key, shelly_ip, shelly_pw, shelly_port = settings[machine]
+    return BenchmarkWorker(
+        machine,
+        ip,
+        user,
+        ssh_key,
+        shelly_ip,
+        shelly_pw,
+        shelly_port,
+        SHELLY_VERSION[machine],
+        jvm_args,
+        bm_params,
+        results_folder,
+        "Benchmark",
+        workloads,
+        online_cores,
+    )
+
+
+def write_run_parameters(results_folder, jvm_args, bm_params, remote_info, jvm_configuration=None):
+    # Create a file to store the bm params and quota
+    with open(os.path.join(results_folder, "bm_params_sysinfo.txt"), "w") as f:
+        f.write(f"{jvm_args} {bm_params}\n\n")
+        if jvm_configuration:
+            f.write(f"JVM configuration: {jvm_configuration}\n\n")
+        f.write(f"{describe_placement()}\n\n")
+        f.write(f"Remote RISC-V info: {remote_info[MACHINE.RISC]}\n\n")
+        f.write(f"Remote x86 info: {remote_info[MACHINE.X86]}\n\n")
+
+
+def run_workers(name, workers):
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    # Exit early if any worker encountered an error
+    errors = [worker.exception for worker in workers if worker.exception]
+    if errors:
+        logging.error(f"Error in benchmark {name}: {errors[0]}")
+        sys.exit(1)
+
+
+def run_jvm_sweep(mode, objective, remote_info):
+    """
+    Runs every benchmark with the JVM_CONFIGURATIONS and writes a ranking of the configurations
+    per benchmark and machine. In matrix mode all configurations are run with the full
+    steady-state, in halving mode the better half per machine survives each round.
+    """
+    results = []
+    campaign = time.strftime('%d-%m-%Y%H-%M-%S')
+    for bench, warmup, steady in BENCHMARKS:
+        candidates = {machine: list(JVM_CONFIGURATIONS) for machine in MACHINE_ORDER}
+        while True:
+            remaining = max(len(c) for c in candidates.values())
+            steady_iterations = steady if mode == "matrix" else sweep.halving_steady_iterations(remaining, steady)
+            round_results = []
+            for name in JVM_CONFIGURATIONS:
+                machines = [machine for machine in MACHINE_ORDER if name in candidates[machine]]
+                if not machines:
+                    continue
+                jvm_args = f"{JVM_ARGS} {JVM_CONFIGURATIONS[name]}".strip()
+                bm_params = f"{STATIC_BM_PARAMS} -r {warmup + steady_iterations} {bench}"
+                results_folder = f"gpl-{bench}_JVM-{name}_{run_configuration()}/{time.strftime('%d-%m-%Y%H-%M-%S')}"
+                os.makedirs(results_folder, exist_ok=True)
+                write_run_parameters(results_folder, jvm_args, bm_params, remote_info, name)
+
+                logging.info(f"Running {bench} with JVM configuration {name} ({steady_iterations} steady-state iterations)")
+                run_workers(bench, [create_worker(machine, jvm_args, bm_params, results_folder) for machine in machines])
+                for machine in machines:
+                    round_results.append({
+                        "benchmark": bench,
+                        "machine": machine.name,
+                        "configuration": name,
+                        "jvm_args": jvm_args,
+                        "results_folder": results_folder,
+                        "summary": sweep.summarize_run(
+                            os.path.join(results_folder, machine.name), POSTFIX[machine], warmup
+                        ),
+                    })
+                time.sleep(COOLDOWN_SECONDS)
+            results.extend(round_results)
+            if mode == "matrix" or remaining == 1:
+                break
+            for machine in MACHINE_ORDER:
+                machine_results = [r for r in round_results if r["machine"] == machine.name]
+                candidates[machine] = sweep.survivors(machine_results, objective)
+
+    sweep.write_ranking(sweep.rank(results, objective), f"jvm-sweep_{campaign}.csv")
+    timeline.summarize_campaign(sorted({r["results_folder"] for r in results}), f"jvm-sweep-timeline_{campaign}.csv")
+
+
+def run_colocation(levels, mix, remote_info):
+    """
+    Runs every benchmark (or the given mix of benchmarks, assigned to the JVMs round-robin) at each
+    co-location level, i.e. with that many Renaissance JVMs at once on every machine. Every JVM runs the
+    warm-up and steady-state iterations of its benchmark.
+    """
+    iterations = {bench: warmup + steady for bench, warmup, steady in BENCHMARKS}
+    groups = [mix] if mix else [[bench] for bench in iterations]
+    campaign = time.strftime('%d-%m-%Y%H-%M-%S')
+    results_folders = []
+    for group in groups:
+        name = "+".join(group)
+        for level in levels:
+            workloads = [f"{STATIC_BM_PARAMS} -r {iterations[bench]} {bench}"
+                         for bench in (group[index % len(group)] for index in range(level))]
+            results_folder = f"gpl-{name}_COLOCATED-{level}_{run_configuration()}/{time.strftime('%d-%m-%Y%H-%M-%S')}"
+            os.makedirs(results_folder, exist_ok=True)
+            results_folders.append(results_folder)
+            write_run_parameters(results_folder, JVM_ARGS, " | ".join(w.strip() for w in workloads), remote_info)
+
+            logging.info(f"Running {name} with {level} co-located JVMs")
+            run_workers(name, [create_worker(machine, JVM_ARGS, workloads[0], results_folder, workloads)
+                               for machine in MACHINE_ORDER])
+            time.sleep(COOLDOWN_SECONDS)
+
+    timeline.summarize_campaign(results_folders, f"colocation-timeline_{campaign}.csv")
+
+
+def run_scaling_sweep(benchmarks, remote_info):
+    """
+    Runs the given benchmarks (all if empty) with each number of online cores of SCALING_CORE_COUNTS,
+    stored as CORE-LIMITED-CPU-<cores> like the manually core-limited runs.
+    """
+    if CPU_PLACEMENT != PLACEMENT.NONE:
+        # the CPU lists of CPU_AFFINITY would refer to offline CPUs
+        logging.error("The scaling sweep takes CPUs offline, run it with CPU_PLACEMENT = PLACEMENT.NONE")
+        sys.exit(1)
+    campaign = time.strftime('%d-%m-%Y%H-%M-%S')
+    core_counts = sorted({cores for counts in SCALING_CORE_COUNTS.values() for cores in counts})
+    results_folders = []
+    for bench, warmup, steady in BENCHMARKS:
+        if benchmarks and bench not in benchmarks:
+            continue
+        for cores in core_counts:
+            machines = [machine for machine in MACHINE_ORDER if cores in SCALING_CORE_COUNTS[machine]]
+            bm_params = f"{STATIC_BM_PARAMS} -r {warmup + steady} {bench}"
+            results_folder = f"gpl-{bench}_CORE-LIMITED-CPU-{cores}/{time.strftime('%d-%m-%Y%H-%M-%S')}"
+            os.makedirs(results_folder, exist_ok=True)
+            results_folders.append(results_folder)
+            write_run_parameters(results_folder, JVM_ARGS, bm_params, remote_info)
+
+            logging.info(f"Running {bench} with {cores} online cores on {', '.join(m.name for m in machines)}")
+            run_workers(bench, [create_worker(machine, JVM_ARGS, bm_params, results_folder, online_cores=cores)
+                                for machine in machines])
+            time.sleep(COOLDOWN_SECONDS)
+
+    timeline.summarize_campaign(results_folders, f"scaling-timeline_{campaign}.csv")
+
+
+def check_regressions(timestamp):
+    """
+    Compares the runs of the campaign with the earlier runs in the repository root using
+    the enviroinfo.regression analysis.
+    """
+    parent_directory = dirname(dirname(abspath(__file__)))
+    report = os.path.join(os.getcwd(), f"regressionCheck_{timestamp}.csv")
+    cmd = [
+        sys.executable,
+        "-m",
+        "enviroinfo.regression",
+        "--work-dir",
+        os.getcwd(),
+        "--history",
+        parent_directory,
+        "--timestamp",
+        timestamp,
+        "--output",
+        report,
+    ]
+    logging.info(f"Running regression check: {' '.join(cmd)}")
+    result = subprocess.run(cmd, cwd=parent_directory, capture_output=True, text=True)
+    for line in result.stdout.splitlines():
+        logging.info(f"[regression] {line}")
+    if result.returncode == REGRESSION_EXIT_CODE:
+        logging.warning(f"Regression check flagged a regression, see {report}")
+    elif result.returncode != 0:
+        logging.error(f"Regression check failed: {result.stderr.strip()}")
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Runs the Renaissance benchmarks on the x86 and RISC-V machines")
+    parser.add_argument(
+        "--plan",
+        action="store_true",
+        help="dry run: predict the campaign duration from previous runs and propose a host assignment",
+    )
+    parser.add_argument(
+        "--history",
+        default=dirname(dirname(abspath(__file__))),
+        help="directory containing previous gpl-<benchmark>_<configuration> results (used by --plan)",
+    )
+    parser.add_argument(
+        "--hosts",
+        nargs="+",
+        metavar="NAME=ARCH",
+        help="hosts available for --plan, e.g. x86-a=X86 x86-b=X86 riscv=RISC (default: one per machine)",
+    )
+    parser.add_argument(
+        "--sweep",
+        choices=["matrix", "halving"],
+        help="compare the JVM_CONFIGURATIONS per benchmark and machine, either all of them (matrix) "
+             "or by successive halving with growing steady-state iterations",
+    )
+    parser.add_argument(
+        "--sweep-objective",
+        choices=sweep.OBJECTIVES,
+        default="duration",
+        help="metric used to rank the JVM configurations (default: duration)",
+    )
+    parser.add_argument(
+        "--colocate",
+        nargs="*",
+        type=int,
+        metavar="LEVEL",
+        help="run every benchmark with LEVEL concurrent JVMs per machine (default: COLOCATION_LEVELS)",
+    )
+    parser.add_argument(
+        "--colocate-mix",
+        nargs="+",
+        choices=[bench for bench, _, _ in BENCHMARKS],
+        help="with --colocate, run these benchmarks side by side instead of each benchmark with itself",
+    )
+    parser.add_argument(
+        "--scaling",
+        nargs="*",
+        choices=[bench for bench, _, _ in BENCHMARKS],
+        metavar="BENCHMARK",
+        help="run the benchmarks (default: all) with each number of online cores of SCALING_CORE_COUNTS",
+    )
+    return parser.parse_args()
+
+
+def plan_campaign(history_root, host_args):
+    history = planner.load_history(history_root)
+    predictions = []
+    for machine in MACHINE:
+        for bench, warmup, steady in BENCHMARKS:
+            prediction = planner.predict_cell(history, bench, run_configuration(), machine.name, warmup + steady)
+            if prediction is None:
+                logging.warning(f"No previous run of {bench} on {machine.name}, cannot predict it")
+                continue
+            predictions.append(prediction)
+
+    hosts = {machine.name: machine.name for machine in MACHINE}
+    if host_args:
+        hosts = dict(host.split("=", 1) for host in host_args)
+    queues, makespan = planner.plan_assignment(predictions, hosts, COOLDOWN_SECONDS)
+    lockstep = planner.lockstep_makespan(predictions, COOLDOWN_SECONDS)
+    print(planner.format_plan(predictions, queues, makespan, lockstep))
+
+
 def main():
+    args = parse_args()
+    if args.plan:
+        plan_campaign(args.history, args.hosts)
+        return
+    validate_environment()
+
     # Add signal handler for interrupt
     signal.signal(signal.SIGINT, signal_handler)
     signal.signal(signal.SIGTERM, signal_handler)
 
     # Get nproc for remote machines
-    remote_info_risc = get_remote_info(RISC_IP, RISC_USER, SSH_KEY_RISC)
-    remote_info_x86 = get_remote_info(X86_IP, X86_USER, SSH_KEY_X86)
+    remote_info = {
+        MACHINE.RISC: get_remote_info(RISC_IP, RISC_USER, SSH_KEY_RISC),
+        MACHINE.X86: get_remote_info(X86_IP, X86_USER, SSH_KEY_X86),
+    }
+
+    if args.sweep:
+        run_jvm_sweep(args.sweep, args.sweep_objective, remote_info)
+        return
+    if args.colocate is not None:
+        run_colocation(args.colocate or COLOCATION_LEVELS, args.colocate_mix, remote_info)
+        return
+    if args.scaling is not None:
+        run_scaling_sweep(args.scaling, remote_info)
+        return
 
     # Set up results folder
     date_str = time.strftime("%d-%m-%Y")
     time_str = time.strftime("%H-%M-%S")
 
-    for bench, iterations in BENCHMARKS:
+    results_folders = []
+    for bench, warmup, steady in BENCHMARKS:
         # Create results folder
         logging.info(f"Running {bench}")
-        results_folder = f"gpl-{bench}_CPU100/{date_str}{time_str}"
+        results_folder = f"gpl-{bench}_{run_configuration()}/{date_str}{time_str}"
         os.makedirs(results_folder, exist_ok=True)
+        results_folders.append(results_folder)
 
-        bm_params = f"{STATIC_BM_PARAMS} -r {iterations} {bench}"
-
-        # Create a file to store the bm params and quota
-        with open(os.path.join(results_folder, "bm_params_sysinfo.txt"), "w") as f:
-            f.write(f"{JVM_ARGS} {bm_params}\n\n")
-            f.write(f"Remote RISC-V info: {remote_info_risc}\n\n")
-            f.write(f"Remote x86 info: {remote_info_x86}\n\n")
-
-        # Run benchmarks
-        x86 = BenchmarkWorker(
-            MACHINE.X86,
-            X86_IP,
-            X86_USER,
-            SSH_KEY_X86,
-            SHELLY_X86_IP,
-            SHELLY_X86_PW,
-            8080,
-            SHELLY_VERSION[MACHINE.X86],
-            JVM_ARGS,
-            bm_params,
-            results_folder,
-            "Benchmark",
-        )
-
-        risc = BenchmarkWorker(
-            MACHINE.RISC,
-            RISC_IP,
-            RISC_USER,
-            SSH_KEY_RISC,
-            SHELLY_RISC_IP,
-            SHELLY_RISC_PW,
-            8081,
-            SHELLY_VERSION[MACHINE.RISC],
-            JVM_ARGS,
-            bm_params,
-            results_folder,
-            "Benchmark",
-            )
-
-        x86.start()
-        risc.start()
-        x86.join()
-        risc.join()
-        # Exit early if any worker encountered an error
-        if risc.exception or x86.exception:
-            logging.error(f"Error in benchmark {bench}: {risc.exception or x86.exception}")
-            sys.exit(1)
+        bm_params = f"{STATIC_BM_PARAMS} -r {warmup + steady} {bench}"
+        write_run_parameters(results_folder, JVM_ARGS, bm_params, remote_info)
+        run_workers(bench, [create_worker(machine, JVM_ARGS, bm_params, results_folder) for machine in MACHINE_ORDER])
         logging.info(f"Finished {bench}")
-        time.sleep(30)
+        time.sleep(COOLDOWN_SECONDS)
 
+    timeline.summarize_campaign(results_folders, f"campaign-timeline_{date_str}{time_str}.csv")
+    if REGRESSION_CHECK:
+        check_regressions(f"{date_str}{time_str}")
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,186 @@
+import csv
+import logging
+import os
+import re
+import statistics
+from collections import defaultdict
+
+import timeline
+
+# Result directories look like gpl-<benchmark>_<configuration> or gpl-<benchmark>-<CONFIGURATION>
+RUN_DIRECTORY_PATTERN = re.compile(
+    r"^gpl-(?P<benchmark>.+?)(?:_|-(?=[A-Z]))(?P<configuration>[A-Z][A-Z0-9_-]*)$"
+)
+ARCH_POSTFIX = {"X86": "_x86", "RISC": "_risc"}
+STEADY_STATE_TAIL = 10  # iterations used to extrapolate beyond the recorded history
+DEFAULT_STARTUP_S = 5.0  # used when no run of the cell has a usable timer file
+DEFAULT_TEARDOWN_S = 5.0  # used when no run of the cell has a timeline_*.json
+# Worker phases before and after the benchmark phase of a timeline_*.json (see timeline.PHASES)
+STARTUP_PHASES = timeline.PHASES[:timeline.PHASES.index("benchmark")]
+TEARDOWN_PHASES = timeline.PHASES[timeline.PHASES.index("benchmark") + 1:]
+
+
+def _read_iterations(renaissance_file):
+    """Returns a list of (start_s, duration_s) tuples in iteration order."""
+    iterations = []
+    with open(renaissance_file, newline="") as f:
+        for row in csv.DictReader(f):
+            start_s = int(row["vm_start_unix_ms"]) / 1000 + int(row["uptime_ns"]) / 1e9
+            iterations.append((start_s, int(row["duration_ns"]) / 1e9))
+    return iterations
+
+
+def load_history(results_root):
+    """
+    Collects per-iteration durations and per-run overheads of all benchmark runs below results_root.
+
+    :param results_root: Directory containing the gpl-<benchmark>_<configuration> folders
+    :return: List of run records (dicts)
+    """
+    history = []
+    for entry in sorted(os.listdir(results_root)):
+        match = RUN_DIRECTORY_PATTERN.match(entry)
+        if not match or not os.path.isdir(os.path.join(results_root, entry)):
+            continue
+        for timestamp in sorted(os.listdir(os.path.join(results_root, entry))):
+            for arch, postfix in ARCH_POSTFIX.items():
+                run_dir = os.path.join(results_root, entry, timestamp, arch)
+                renaissance_file = os.path.join(run_dir, f"renaissanceOutput{postfix}.csv")
+                if not os.path.exists(renaissance_file):
+                    continue
+                try:
+                    iterations = _read_iterations(renaissance_file)
+                except (KeyError, ValueError) as e:
+                    logging.warning(f"Skipping unreadable {renaissance_file}: {e}")
+                    continue
+                if not iterations:
+                    continue
+                record = {
+                    "benchmark": match["benchmark"],
+                    "configuration": match["configuration"],
+                    "arch": arch,
+                    "timestamp": timestamp,
+                    "durations_s": [duration for _, duration in iterations],
+                    "startup_s": None,
+                    "teardown_s": None,
+                    "wall_s": None,
+                }
+                timeline_file = os.path.join(run_dir, f"timeline{postfix}.json")
+                timer_file = os.path.join(run_dir, f"timer{postfix}.txt")
+                if os.path.exists(timeline_file):
+                    # all phases of the worker, from the Shelly start to the SSH close after the SFTP transfer
+                    phases = timeline.read_timeline(timeline_file)["phases"]
+                    record["startup_s"] = sum(p["duration_s"] for p in phases if p["phase"] in STARTUP_PHASES)
+                    record["teardown_s"] = sum(p["duration_s"] for p in phases if p["phase"] in TEARDOWN_PHASES)
+                    if phases:
+                        record["wall_s"] = phases[-1]["wall_end"] - phases[0]["wall_start"]
+                elif os.path.exists(timer_file):
+                    # the timer is written before the cleanup of the worker, so it covers neither the Shelly
+                    # start and SSH connect nor the pkill and SFTP transfer; the teardown stays at its default
+                    start, end = timeline.read_timer(timer_file)
+                    if start is not None:
+                        record["startup_s"] = iterations[0][0] - start
+                        record["wall_s"] = end - start
+                history.append(record)
+    return history
+
+
+def predict_cell(history, benchmark, configuration, arch, iterations):
+    """
+    Predicts the wall-clock time of one benchmark on one architecture.
+
+    Runs of the same configuration are preferred; other configurations of the same
+    benchmark and architecture are used as a fallback.
+
+    :return: Dict with the predicted phases in seconds, or None if the cell has no history
+    """
+    runs = [r for r in history if r["benchmark"] == benchmark and r["arch"] == arch]
+    exact = [r for r in runs if r["configuration"] == configuration]
+    if exact:
+        runs = exact
+    if not runs:
+        return None
+
+    tail = [d for r in runs for d in r["durations_s"][-STEADY_STATE_TAIL:]]
+    steady_state_s = statistics.median(tail)
+    benchmark_s = 0.0
+    for i in range(iterations):
+        recorded = [r["durations_s"][i] for r in runs if i < len(r["durations_s"])]
+        benchmark_s += statistics.median(recorded) if recorded else steady_state_s
+
+    startups = [r["startup_s"] for r in runs if r["startup_s"] is not None]
+    teardowns = [r["teardown_s"] for r in runs if r["teardown_s"] is not None]
+    startup_s = statistics.median(startups) if startups else DEFAULT_STARTUP_S
+    teardown_s = statistics.median(teardowns) if teardowns else DEFAULT_TEARDOWN_S
+    return {
+        "benchmark": benchmark,
+        "configuration": configuration,
+        "arch": arch,
+        "iterations": iterations,
+        "startup_s": startup_s,
+        "benchmark_s": benchmark_s,
+        "teardown_s": teardown_s,
+        "total_s": startup_s + benchmark_s + teardown_s,
+        "exact_history": bool(exact),
+        "history_runs": len(runs),
+    }
+
+
+def lockstep_makespan(predictions, cooldown_s):
+    """
+    Makespan of the current orchestrator behaviour: every benchmark runs on all hosts
+    at once, the next one starts after the slowest host finished plus the cooldown.
+    """
+    per_benchmark = defaultdict(float)
+    for p in predictions:
+        per_benchmark[p["benchmark"]] = max(per_benchmark[p["benchmark"]], p["total_s"])
+    return sum(per_benchmark.values()) + cooldown_s * len(per_benchmark)
+
+
+def plan_assignment(predictions, hosts, cooldown_s):
+    """
+    Assigns cells to hosts of the matching architecture with independent queues,
+    using longest-processing-time-first to minimise the makespan.
+
+    :param predictions: Output of predict_cell for every cell of the campaign
+    :param hosts: Dict mapping host name to architecture (e.g. {"x86-a": "X86"})
+    :param cooldown_s: Pause between two consecutive cells on the same host
+    :return: Dict mapping host name to its ordered list of predictions, and the makespan
+    """
+    queues = {host: [] for host in hosts}
+    loads = {host: 0.0 for host in hosts}
+    for p in sorted(predictions, key=lambda p: p["total_s"], reverse=True):
+        candidates = [host for host, arch in hosts.items() if arch == p["arch"]]
+        if not candidates:
+            raise ValueError(f"No host available for architecture {p['arch']}")
+        host = min(candidates, key=lambda h: loads[h])
+        loads[host] += p["total_s"] + (cooldown_s if queues[host] else 0.0)
+        queues[host].append(p)
+    return queues, max(loads.values(), default=0.0)
+
+
+def _format_duration(seconds):
+    hours, rest = divmod(int(round(seconds)), 3600)
+    minutes, secs = divmod(rest, 60)
+    return f"{hours:d}:{minutes:02d}:{secs:02d}"
+
+
+def format_plan(predictions, queues, makespan_s, lockstep_s):
+    lines = ["Predicted cell durations (h:mm:ss):"]
+    lines.append(
+        f"{'benchmark':<16}{'config':<24}{'arch':<6}{'iter':>5}{'startup':>10}{'bench':>10}{'teardown':>10}{'total':>10}  history"
+    )
+    for p in predictions:
+        history = f"{p['history_runs']} run(s)" + ("" if p["exact_history"] else ", other config")
+        lines.append(
+            f"{p['benchmark']:<16}{p['configuration']:<24}{p['arch']:<6}{p['iterations']:>5}"
+            f"{_format_duration(p['startup_s']):>10}{_format_duration(p['benchmark_s']):>10}"
+            f"{_format_duration(p['teardown_s']):>10}{_format_duration(p['total_s']):>10}  {history}"
+        )
+    lines.append("")
+    lines.append(f"Lockstep campaign (current behaviour): {_format_duration(lockstep_s)}")
+    lines.append(f"Independent host queues (proposed):    {_format_duration(makespan_s)}")
+    for host, queue in queues.items():
+        order = ", ".join(p["benchmark"] for p in queue)
+        lines.append(f"  {host}: {order}")
+    return "\n".join(lines)
@@ -0,0 +1,148 @@
+import argparse
+import array
+import glob
+import os
+import signal
+import sys
+import threading
+import time
+
+# High-rate RAPL sampler, uploaded to the x86 machine by benchmarkscript.py (RAPL_HIGH_RATE) and run with
+# the python3 of the machine; standard library only. Every interval the energy_uj counter of every powercap
+# domain is read into a preallocated ring buffer, a writer thread flushes it in blocks, so file writes do not
+# delay the sampling. The counters are unwrapped at max_energy_range_uj, the output is monotonic:
+#   Timestamp (ns),package-0 (micro joules),dram (micro joules),...
+POWERCAP_DIR = "/sys/class/powercap"
+DEFAULT_INTERVAL_MS = 20
+BLOCK_SAMPLES = 500  # samples per written block (10 s at 20 ms)
+RING_BLOCKS = 8  # ring buffer capacity in blocks, the oldest samples are dropped if the writer falls behind
+
+
+def find_domains(powercap_dir):
+    """Readable RAPL domains as (name, energy_uj path, max_energy_range_uj), sub-domains after their package."""
+    domains = []
+    for path in sorted(glob.glob(os.path.join(powercap_dir, "intel-rapl:*"))):
+        energy = os.path.join(path, "energy_uj")
+        if not os.access(energy, os.R_OK):
+            continue
+        with open(os.path.join(path, "name")) as f:
+            name = f.read().strip()
+        with open(os.path.join(path, "max_energy_range_uj")) as f:
+            max_range = int(f.read())
+        if any(name == other for other, _, _ in domains):
+            name = f"{name}-{os.path.basename(path)}"
+        domains.append((name, energy, max_range))
+    return domains
+
+
+class RingBuffer:
+    """Fixed-size buffer of rows of int64 values, filled by the sampler and drained by the writer."""
+
+    def __init__(self, capacity, width):
+        self.capacity = capacity
+        self.width = width
+        self.data = array.array("q", bytes(8 * capacity * width))
+        self.head = 0  # samples pushed
+        self.tail = 0  # samples taken
+        self.dropped = 0
+        self.condition = threading.Condition()
+
+    def push(self, values):
+        with self.condition:
+            if self.head - self.tail == self.capacity:
+                self.tail += 1
+                self.dropped += 1
+            offset = (self.head % self.capacity) * self.width
+            self.data[offset:offset + self.width] = array.array("q", values)
+            self.head += 1
+            if self.head - self.tail >= BLOCK_SAMPLES:
+                self.condition.notify()
+
+    def take(self, stopped):
+        """Waits for a full block (or the stop) and returns the buffered rows, at most one block."""
+        with self.condition:
+            self.condition.wait_for(lambda: self.head - self.tail >= BLOCK_SAMPLES or stopped.is_set())
+            count = min(self.head - self.tail, BLOCK_SAMPLES)
+            rows = []
+            for index in range(self.tail, self.tail + count):
+                offset = (index % self.capacity) * self.width
+                rows.append(self.data[offset:offset + self.width].tolist())
+            self.tail += count
+            return rows
+
+
+def write_blocks(ring, output, stopped):
+    while True:
+        rows = ring.take(stopped)
+        if rows:
+            output.write("".join(",".join(map(str, row)) + "\n" for row in rows))
+            output.flush()
+        elif stopped.is_set():
+            return
+
+
+def sample(domains, ring, interval_ns, stopped):
+    descriptors = [os.open(energy, os.O_RDONLY) for _, energy, _ in domains]
+    last = [None] * len(domains)
+    offsets = [0] * len(domains)
+    missed = 0
+    next_sample = time.monotonic_ns()
+    while not stopped.is_set():
+        values = [time.time_ns()]
+        for i, descriptor in enumerate(descriptors):
+            counter = int(os.pread(descriptor, 32, 0))
+            if last[i] is not None and counter < last[i]:
+                offsets[i] += domains[i][2]  # wrap-around at max_energy_range_uj
+            last[i] = counter
+            values.append(counter + offsets[i])
+        ring.push(values)
+        next_sample += interval_ns
+        delay = next_sample - time.monotonic_ns()
+        if delay < -interval_ns:
+            # fell behind by more than one interval (e.g. descheduled), continue on the regular grid
+            skipped = -delay // interval_ns
+            missed += skipped
+            next_sample += skipped * interval_ns
+            delay += skipped * interval_ns
+        if delay > 0:
+            stopped.wait(delay / 1e9)
+    for descriptor in descriptors:
+        os.close(descriptor)
+    return missed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Samples the RAPL energy counters of powercap at a high rate")
+    parser.add_argument("--interval-ms", type=float, default=DEFAULT_INTERVAL_MS)
+    parser.add_argument("--output", required=True, help="CSV file for the samples")
+    parser.add_argument("--powercap-dir", default=POWERCAP_DIR)
+    args = parser.parse_args()
+
+    domains = find_domains(args.powercap_dir)
+    if not domains:
+        print(f"No readable RAPL domains in {args.powercap_dir}", file=sys.stderr)
+        return 1
+    stopped = threading.Event()
+    for signum in (signal.SIGTERM, signal.SIGINT, signal.SIGHUP):
+        signal.signal(signum, lambda *_: stopped.set())
+
+    ring = RingBuffer(BLOCK_SAMPLES * RING_BLOCKS, 1 + len(domains))
+    with open(args.output, "w") as output:
+        output.write(",".join(["Timestamp (ns)"] + [f"{name} (micro joules)" for name, _, _ in domains]) + "\n")
+        writer = threading.Thread(target=write_blocks, args=(ring, output, stopped))
+        writer.start()
+        try:
+            missed = sample(domains, ring, int(args.interval_ms * 1_000_000), stopped)
+        finally:
+            # the writer drains the ring buffer and returns once the sampler has stopped
+            stopped.set()
+            with ring.condition:
+                ring.condition.notify()
+            writer.join()
+    print(f"{ring.head} samples, {missed} missed intervals, {ring.dropped} dropped by the ring buffer",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
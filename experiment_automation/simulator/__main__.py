@@ -0,0 +1,170 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from os.path import abspath, dirname
+
+sys.path.insert(0, dirname(dirname(abspath(__file__))))
+
+import benchmarkscript  # noqa: E402
+import timeline  # noqa: E402
+from simulator.hosts import FAILURE_DEFAULTS, HOST_PROFILES, SimulatedHost, write_executables  # noqa: E402
+from simulator.ssh import SimulatedSSHClient  # noqa: E402
+
+# Result files every worker is expected to fetch, per machine
+EXPECTED_FILES = {
+    "X86": ["renaissanceOutput_x86.csv", "procfsResults_x86", "raplResults_x86", "shellyReaderResults_x86",
+            "timer_x86.txt", "timeline_x86.json"],
+    "RISC": ["renaissanceOutput_risc.csv", "procfsResults_risc", "shellyReaderResults_risc", "timer_risc.txt",
+             "timeline_risc.json"],
+}
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Runs the benchmark workers of benchmarkscript.py against simulated x86 and RISC-V hosts"
+    )
+    parser.add_argument("--hosts", type=int, default=4, help="number of simulated hosts, alternating x86 and RISC-V")
+    parser.add_argument(
+        "--benchmarks",
+        nargs="+",
+        default=[bench for bench, _, _ in benchmarkscript.BENCHMARKS[:2]],
+        help="benchmarks run one after another on all hosts at once",
+    )
+    parser.add_argument("--iterations", type=int, help="iterations per benchmark (default: warm-up + steady-state)")
+    parser.add_argument(
+        "--time-scale",
+        type=float,
+        default=0.02,
+        help="factor applied to all simulated durations and sleeps (1 simulates in real time)",
+    )
+    parser.add_argument(
+        "--failures",
+        type=json.loads,
+        default={},
+        help=f"failures to inject on every host as JSON, keys: {', '.join(FAILURE_DEFAULTS)}",
+    )
+    parser.add_argument(
+        "--colocate",
+        type=int,
+        default=1,
+        help="Renaissance JVMs run at once on every host (co-location mode of benchmarkscript.py if above 1)",
+    )
+    parser.add_argument(
+        "--cores",
+        type=int,
+        help="CPUs left online on every host through hot-plug (scaling sweep of benchmarkscript.py)",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="seed of the first host, the others use seed + index")
+    parser.add_argument("--output-dir", default="simulation", help="directory for the results and the host sandboxes")
+    return parser.parse_args()
+
+
+def create_hosts(count, sandbox, bin_dir, time_scale, failures, seed):
+    profiles = list(HOST_PROFILES)
+    created = []
+    for index in range(count):
+        profile = profiles[index % len(profiles)]
+        name = f"sim-{profile.lower()}-{index:02d}"
+        created.append(SimulatedHost(name, profile, os.path.join(sandbox, name), bin_dir, time_scale, failures,
+                                     seed + index).start())
+    return created
+
+
+def create_worker(host, bm_params, results_folder, workloads=None, online_cores=None):
+    machine = benchmarkscript.MACHINE[host.machine]
+    return benchmarkscript.BenchmarkWorker(
+        machine,
+        host.name,
+        "sim",
+        None,
+        host.shelly.address,
+        "",
+        0,
+        host.profile["shelly_version"],
+        benchmarkscript.JVM_ARGS,
+        bm_params,
+        f"{results_folder}/{host.name}",
+        "Benchmark",
+        workloads,
+        online_cores and min(online_cores, host.profile["cores"]),
+    )
+
+
+def expected_files(machine, colocate, cores=None):
+    postfix = benchmarkscript.POSTFIX[benchmarkscript.MACHINE[machine]]
+    files = EXPECTED_FILES[machine]
+    if colocate > 1:
+        renaissance = f"renaissanceOutput{postfix}.csv"
+        files = [name for name in files if name != renaissance] + \
+            [f"renaissanceOutput{postfix}-{index}.csv" for index in range(colocate)] + \
+            [f"colocationProcfs{postfix}", f"colocation{postfix}.json"]
+    return files + [f"cpuOnline{postfix}.txt"] if cores else files
+
+
+def check_results(folder, machine, colocate=1, cores=None):
+    """Expected result files that are missing or empty in the folder of one worker."""
+    problems = []
+    for name in expected_files(machine, colocate, cores):
+        path = os.path.join(folder, name)
+        if not os.path.exists(path):
+            problems.append(f"{name} missing")
+        elif os.path.getsize(path) == 0:
+            problems.append(f"{name} empty")
+    return problems
+
+
+def main():
+    args = parse_args()
+    os.makedirs(args.output_dir, exist_ok=True)
+    os.chdir(args.output_dir)
+
+    # local (Shelly reader) and remote commands use the fake java and the scaled sleep
+    bin_dir = write_executables(abspath("bin"), args.time_scale)
+    os.environ["PATH"] = f"{bin_dir}:{os.environ.get('PATH', '')}"
+    os.environ["SIM_TIME_SCALE"] = str(args.time_scale)
+    benchmarkscript.SSH_CLIENT = SimulatedSSHClient
+
+    hosts = create_hosts(args.hosts, abspath("hosts"), bin_dir, args.time_scale, args.failures, args.seed)
+    campaign = time.strftime("%d-%m-%Y%H-%M-%S")
+    results_folders = []
+    failed = []
+    started = time.monotonic()
+    try:
+        for bench, warmup, steady in benchmarkscript.BENCHMARKS:
+            if bench not in args.benchmarks:
+                continue
+            configuration = "SIMULATED" if args.colocate == 1 else f"COLOCATED-{args.colocate}_SIMULATED"
+            if args.cores:
+                configuration = f"CORE-LIMITED-CPU-{args.cores}_{configuration}"
+            results_folder = f"gpl-{bench}_{configuration}/{campaign}"
+            bm_params = f"-r {args.iterations or warmup + steady} {bench}"
+            workloads = [bm_params] * args.colocate if args.colocate > 1 else None
+            workers = {host: create_worker(host, bm_params, results_folder, workloads, args.cores) for host in hosts}
+            logging.info(f"Running {bench} on {len(workers)} simulated hosts")
+            for worker in workers.values():
+                worker.start()
+            for host, worker in workers.items():
+                worker.join()
+                results_folders.append(f"{results_folder}/{host.name}")
+                problems = check_results(worker.results_folder, host.machine, args.colocate, args.cores)
+                if worker.exception:
+                    problems.insert(0, f"exception: {worker.exception}")
+                if problems:
+                    failed.append((bench, host.name, problems))
+    finally:
+        for host in hosts:
+            host.stop()
+
+    timeline.summarize_campaign(results_folders, f"simulation-timeline_{campaign}.csv")
+    runs = len(results_folders)
+    print(f"{runs} simulated runs on {len(hosts)} hosts in {time.monotonic() - started:.1f} s, "
+          f"{runs - len(failed)} complete")
+    for bench, host, problems in failed:
+        print(f"  {bench} on {host}: {'; '.join(problems)}")
+
+
+if __name__ == "__main__":
+    main()
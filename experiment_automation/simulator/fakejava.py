@@ -0,0 +1,266 @@
+import glob
+import json
+import os
+import random
+import re
+import sys
+import time
+import urllib.request
+
+# Printed by `java -version`, recorded in bm_params_sysinfo.txt
+JAVA_VERSION = 'openjdk version "21.0.7" 2025-04-15 (simulated)'
+# Sampling interval of the readers without a -Dsampling.interval.ms option
+DEFAULT_INTERVALS_MS = {"procfs": 1000, "rapl": 2000, "shelly": 1000}
+USER_HZ = 100
+# Shortest sampling interval of the generators and the Shelly reader after time scaling
+MIN_SAMPLING_INTERVAL_S = 0.05
+
+
+def _host():
+    """Configuration of the simulated host of a remote command, None for the local Shelly reader."""
+    return json.loads(os.environ["SIM_HOST"]) if "SIM_HOST" in os.environ else None
+
+
+def _sleep(host, seconds):
+    time_scale = host["time_scale"] if host else float(os.environ.get("SIM_TIME_SCALE", "1"))
+    time.sleep(max(seconds * time_scale, MIN_SAMPLING_INTERVAL_S))
+
+
+def _interval_s(jvm_options, reader):
+    for option in jvm_options:
+        match = re.fullmatch(r"-Dsampling\.interval\.ms=(\d+)", option)
+        if match:
+            return int(match.group(1)) / 1000
+    return DEFAULT_INTERVALS_MS[reader] / 1000
+
+
+def _load(host):
+    """Utilization of the simulated CPUs (0..1) and the share of every running benchmark JVM by pid."""
+    pids = {}
+    for path in glob.glob(os.path.join(host["root"], ".load-*")):
+        try:
+            with open(path) as f:
+                pids[int(path.rsplit("-", 1)[1])] = json.load(f)["utilization"]
+        except (OSError, ValueError, KeyError):
+            continue
+    return {"utilization": min(sum(pids.values()), 1.0), "pids": pids}
+
+
+def _online_cores(host):
+    """CPUs left online in the hot-plug files of the host (see SimulatedHost.write_cpu_tree)."""
+    online = 0
+    for path in glob.glob(os.path.join(host["root"], "cpu", "cpu[0-9]*")):
+        try:
+            with open(os.path.join(path, "online")) as f:
+                online += f.read().strip() == "1"
+        except FileNotFoundError:
+            online += 1
+    return online or host["profile"]["cores"]
+
+
+def _write_load(host, utilization, pid):
+    """One file per benchmark JVM, so co-located JVMs do not overwrite each other; 0 removes it."""
+    path = os.path.join(host["root"], f".load-{pid}")
+    if not utilization:
+        if os.path.exists(path):
+            os.remove(path)
+        return
+    with open(path + ".tmp", "w") as f:
+        json.dump({"utilization": utilization}, f)
+    os.replace(path + ".tmp", path)
+
+
+def procfs_reader(host, jvm_options, _):
+    """User and system ticks of the machine (/proc/stat) and of the benchmark process, like procfs-reader."""
+    interval_s = _interval_s(jvm_options, "procfs")
+    rng = random.Random(host["seed"])
+    cores = host["profile"]["cores"]
+    ticks = {"user": 100_000.0, "system": 20_000.0}
+    process = {}
+    last = time.time()
+    print("SourceFile,Timestamp,userTime (Ticks),systemTime (Ticks)", flush=True)
+    while True:
+        _sleep(host, interval_s)
+        now = time.time()
+        load = _load(host)
+        busy = (load["utilization"] + 0.01 + rng.uniform(0, 0.005)) * cores * USER_HZ * (now - last)
+        ticks["user"] += busy * 0.9
+        ticks["system"] += busy * 0.1
+        print(f"/proc/stat,{int(now * 1000)},{int(ticks['user'])},{int(ticks['system'])}")
+        for pid, utilization in sorted(load["pids"].items()):
+            pid_ticks = process.setdefault(pid, {"user": 0.0, "system": 0.0})
+            process_busy = utilization * cores * USER_HZ * (now - last)
+            pid_ticks["user"] += process_busy * 0.95
+            pid_ticks["system"] += process_busy * 0.05
+            print(f"/proc/{pid}/stat,{int(now * 1000)},{int(pid_ticks['user'])},{int(pid_ticks['system'])}")
+        sys.stdout.flush()
+        last = now
+
+
+def powercap_reader(host, jvm_options, _):
+    """Package and DRAM power and energy counters, like powercap-reader (RAPL)."""
+    interval_s = _interval_s(jvm_options, "rapl")
+    rng = random.Random(host["seed"])
+    profile = host["profile"]
+    if profile["rapl_idle_w"] is None:
+        print("powercap: no RAPL domains found", file=sys.stderr)
+        sys.exit(1)
+    energy = {"package": 40_000_000_000, "dram": 6_000_000_000}
+    last = time.time()
+    print("Timestamp,Domain,Power (Watts),DRAM Power (Watts), Energy (micro joules), DRAM Energy (micro joules)",
+          flush=True)
+    while True:
+        _sleep(host, interval_s)
+        now = time.time()
+        utilization = _load(host)["utilization"]
+        package_w = profile["rapl_idle_w"] + (profile["rapl_max_w"] - profile["rapl_idle_w"]) * utilization
+        package_w *= 1 + rng.gauss(0, 0.02)
+        dram_w = 0.75 * package_w
+        energy["package"] += int(package_w * (now - last) * 1_000_000)
+        energy["dram"] += int(dram_w * (now - last) * 1_000_000)
+        print(f"{int(now * 1000)},package-0,{package_w:.6f},{dram_w:.6f},{energy['package']},{energy['dram']}",
+              flush=True)
+        last = now
+
+
+def _gc_log_file(jvm_options):
+    for option in jvm_options:
+        match = re.match(r"-Xlog:.*:file=([^:]+)", option)
+        if match:
+            return match.group(1)
+    return None
+
+
+def _gc_log_lines(rng, vm_start_ms, uptime_ns, duration_ns, gc_id):
+    """Young pauses (and their safepoints) within one iteration, in the unified logging format of -Xlog:gc*."""
+    lines = []
+    for _ in range(rng.randint(1, 3)):
+        pause_ns = int(duration_ns * rng.uniform(0.005, 0.04))
+        end_ns = uptime_ns + int(rng.uniform(0.1, 1) * (duration_ns - pause_ns)) + pause_ns
+        end_s = vm_start_ms / 1000 + end_ns / 1e9
+        end = time.localtime(end_s)
+        prefix = (f"[{time.strftime('%Y-%m-%dT%H:%M:%S', end)}.{int(end_s * 1000) % 1000:03d}"
+                  f"{time.strftime('%z', end)}][{end_ns}ns][info]")
+        lines.append(f"{prefix}[gc          ] GC({gc_id}) Pause Young (Normal) (G1 Evacuation Pause) "
+                     f"{rng.randint(20, 200)}M->{rng.randint(2, 20)}M(256M) {pause_ns / 1e6:.3f}ms")
+        lines.append(f"{prefix}[safepoint   ] Safepoint \"G1CollectForAllocation\", Time since last: 1000000 ns, "
+                     f"Reaching safepoint: 20000 ns, Cleanup: 500 ns, At safepoint: {pause_ns} ns, "
+                     f"Total: {pause_ns + 20500} ns")
+        gc_id += 1
+    return lines, gc_id
+
+
+def renaissance(host, jvm_options, arguments):
+    """
+    Runs the iterations of one benchmark with the progress output and the --csv file of Renaissance,
+    loading the simulated CPUs while it runs. With an -Xlog:...:file= option, GC pauses are logged.
+    Co-located JVMs share the CPUs: with more demand than CPUs, every iteration is slowed down accordingly.
+    With CPUs taken offline, the iterations slow down following Amdahl's law with the parallel fraction of
+    the profile and load only the online share of the CPUs.
+    """
+    profile = host["profile"]
+    rng = random.Random(host["seed"] if host["seed"] is None else host["seed"] + os.getpid())
+    csv_file, repetitions, benchmark = None, 1, None
+    arguments = list(arguments)
+    while arguments:
+        argument = arguments.pop(0)
+        if argument == "--csv":
+            csv_file = arguments.pop(0)
+        elif argument == "-r":
+            repetitions = int(arguments.pop(0))
+        elif not argument.startswith("-"):
+            benchmark = argument
+    vm_start_ms = int(time.time() * 1000)
+    vm_start = time.monotonic()
+    _sleep(host, profile["startup_s"])
+    crash_at = rng.randrange(repetitions) if rng.random() < host["failures"]["benchmark_crash_rate"] else None
+    rows = []
+    gc_log, gc_id = [], 0
+    cores = profile["cores"]
+    online = min(_online_cores(host), cores)
+    parallel = profile["parallel_fraction"]
+    scaling = ((1 - parallel) + parallel / online) / ((1 - parallel) + parallel / cores)
+    demand = 0.95 * online / cores
+    _write_load(host, demand, os.getpid())
+    try:
+        for i in range(repetitions):
+            if i == crash_at:
+                print(f"Exception in thread \"main\" java.lang.OutOfMemoryError (simulated) in iteration {i}",
+                      flush=True)
+                return 1
+            print(f"====== {benchmark} (simulated) [default], iteration {i} started ======", flush=True)
+            uptime_ns = int((time.monotonic() - vm_start) * 1e9)
+            warmup = 1 + (profile["warmup_factor"] - 1) * 0.5 ** i
+            contention = max(len(_load(host)["pids"]) * demand, 1.0)
+            _write_load(host, demand / contention, os.getpid())
+            duration_s = profile["iteration_s"] * scaling * warmup * contention * max(rng.gauss(1, profile["jitter"]), 0.1)
+            started = time.monotonic()
+            _sleep(host, duration_s)
+            duration_ns = int((time.monotonic() - started) * 1e9)
+            rows.append(f"{benchmark},{duration_ns},{uptime_ns},{vm_start_ms}")
+            lines, gc_id = _gc_log_lines(rng, vm_start_ms, uptime_ns, duration_ns, gc_id)
+            gc_log.extend(lines)
+            print(f"====== {benchmark} (simulated) [default], iteration {i} completed "
+                  f"({duration_ns / 1e6:.3f} ms) ======", flush=True)
+    finally:
+        _write_load(host, 0.0, os.getpid())
+        if _gc_log_file(jvm_options):
+            with open(_gc_log_file(jvm_options), "w") as f:
+                f.write("".join(f"{line}\n" for line in gc_log))
+        if csv_file:
+            with open(csv_file, "w") as f:
+                f.write("benchmark,duration_ns,uptime_ns,vm_start_unix_ms\n")
+                f.write("".join(f"{row}\n" for row in rows))
+    return 0
+
+
+def shelly_reader(host, jvm_options, arguments):
+    """Polls a (fake) Shelly plug and prints ip, timestamp, power and energy, like shelly-power-reader."""
+    options = dict(zip(arguments[::2], arguments[1::2]))
+    address, version = options["-i"], options.get("-g", "1")
+    interval_s = _interval_s(jvm_options, "shelly")
+    path = "/meter/0" if version == "1" else "/rpc/Switch.GetStatus?id=0"
+    while True:
+        try:
+            with urllib.request.urlopen(f"http://{address}{path}", timeout=1) as response:
+                status = json.load(response)
+            if version == "1":
+                timestamp, power, energy = status["timestamp"], status["power"], status["total"]
+            else:
+                timestamp, power, energy = status["aenergy"]["minute_ts"], status["apower"], status["aenergy"]["total"]
+            print(f"{address.split(':')[0]},{timestamp},{power},{energy}", flush=True)
+        except (OSError, ValueError, KeyError) as e:
+            # the real reader logs failed requests and continues, leaving a gap in the data
+            print(f"Request to {address} failed: {e}", file=sys.stderr, flush=True)
+        _sleep(host, interval_s)
+
+
+READERS = {
+    "procfs-reader": procfs_reader,
+    "powercap-reader": powercap_reader,
+    "renaissance": renaissance,
+    "shelly-power-reader": shelly_reader,
+}
+
+
+def main(argv):
+    if "-version" in argv or "--version" in argv:
+        print(JAVA_VERSION, file=sys.stderr)
+        return 0
+    if "-jar" not in argv:
+        print("Usage: java [options] -jar <jar> [args...] (simulated)", file=sys.stderr)
+        return 1
+    index = argv.index("-jar")
+    jvm_options, jar, arguments = argv[:index], os.path.basename(argv[index + 1]), argv[index + 2:]
+    for prefix, reader in READERS.items():
+        if jar.startswith(prefix):
+            return reader(_host(), jvm_options, arguments)
+    print(f"Error: Unable to access jarfile {jar} (simulated)", file=sys.stderr)
+    return 1
+
+
+if __name__ == "__main__":
+    try:
+        sys.exit(main(sys.argv[1:]))
+    except (KeyboardInterrupt, BrokenPipeError):
+        sys.exit(1)
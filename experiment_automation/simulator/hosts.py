@@ -0,0 +1,191 @@
+import glob
+import json
+import os
+import random
+import stat
+import sys
+import time
+
+from simulator.shelly import ShellyServer
+
+# Hardware of the simulated hosts, modelled after the x86 and RISC-V machines of the paper
+HOST_PROFILES = {
+    "X86": {
+        "machine": "X86",
+        "cores": 4,
+        "idle_w": 12.0,
+        "max_w": 45.0,
+        "rapl_idle_w": 4.0,
+        "rapl_max_w": 28.0,
+        "shelly_version": "1",
+        "utc_offset_s": 7200,  # Gen1 Shelly devices report local time
+        "iteration_s": 0.8,  # steady-state duration of one Renaissance iteration with all cores online
+        "parallel_fraction": 0.9,  # Amdahl share of an iteration that scales with the online cores
+        "warmup_factor": 2.0,  # the first iteration takes this much longer, decaying over the warm-up
+        "jitter": 0.05,  # relative standard deviation of the iteration durations
+        "startup_s": 2.0,  # JVM startup until the first iteration
+    },
+    "RISC": {
+        "machine": "RISC",
+        "cores": 8,
+        "idle_w": 9.5,
+        "max_w": 14.0,
+        "rapl_idle_w": None,
+        "rapl_max_w": None,
+        "shelly_version": "2+",
+        "utc_offset_s": 0,
+        "iteration_s": 2.5,
+        "parallel_fraction": 0.8,
+        "warmup_factor": 1.5,
+        "jitter": 0.03,
+        "startup_s": 5.0,
+    },
+}
+
+# Failure injection, probabilities per operation unless noted otherwise
+FAILURE_DEFAULTS = {
+    "connect_failure_rate": 0.0,  # SSH connect raises an SSHException
+    "exec_failure_rate": 0.0,  # opening the channel of a remote command raises an SSHException
+    "benchmark_crash_rate": 0.0,  # per run, Renaissance exits with status 1 in a random iteration
+    "sftp_failure_rate": 0.0,  # per file, the transfer fails with an EOFError
+    "transfer_mbps": None,  # bandwidth limit of the SFTP transfers
+    "latency_s": 0.0,  # delay of every SSH operation
+    "shelly_error_rate": 0.0,  # per request, the Shelly answers with HTTP 500
+    "shelly_outage": None,  # [start_s, duration_s] after the start of the host in which the Shelly is unreachable
+}
+
+# Shortest sleep of the remote commands after time scaling
+MIN_SLEEP_S = 0.05
+
+_hosts = {}
+
+
+def register(host):
+    _hosts[host.name] = host
+
+
+def lookup(hostname):
+    return _hosts.get(hostname)
+
+
+def write_executables(bin_dir, time_scale):
+    """
+    Writes the fake java (dispatching on the jar to the generators of simulator.fakejava) and a sleep
+    scaled by the time scale into bin_dir, which is put in front of PATH for local and remote commands.
+    """
+    os.makedirs(bin_dir, exist_ok=True)
+    package_parent = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    scripts = {
+        "java": f'#!/bin/sh\nPYTHONPATH="{package_parent}" exec "{sys.executable}" -m simulator.fakejava "$@"\n',
+        # scaled, but not below the shortest sampling interval, so sampling loops do not flood the machine with forks
+        "sleep": f'#!/bin/sh\nexec /bin/sleep "$(awk -v s="$1" \'BEGIN {{ t = s * {time_scale}; '
+                 f'print (t < {MIN_SLEEP_S} ? {MIN_SLEEP_S} : t) }}\')"\n',
+    }
+    for name, content in scripts.items():
+        path = os.path.join(bin_dir, name)
+        with open(path, "w") as f:
+            f.write(content)
+        os.chmod(path, os.stat(path).st_mode | stat.S_IXUSR | stat.S_IXGRP | stat.S_IXOTH)
+    return bin_dir
+
+
+class SimulatedHost:
+    """
+    One simulated machine: a sandbox directory standing in for the home directory of the remote user,
+    a fake Shelly plug measuring it and the failures to inject.
+    """
+
+    def __init__(self, name, profile, root, bin_dir, time_scale=1.0, failures=None, seed=None):
+        self.name = name
+        self.profile = dict(HOST_PROFILES[profile])
+        self.root = os.path.abspath(root)
+        self.bin_dir = os.path.abspath(bin_dir)
+        self.time_scale = time_scale
+        self.failures = {**FAILURE_DEFAULTS, **(failures or {})}
+        self.seed = seed
+        self.random = random.Random(seed)
+        self.started = time.time()
+        self.shelly = None
+        os.makedirs(self.root, exist_ok=True)
+        self.write_cpu_tree()
+
+    @property
+    def machine(self):
+        return self.profile["machine"]
+
+    def start(self):
+        self.shelly = ShellyServer(self)
+        self.shelly.start()
+        register(self)
+        return self
+
+    def stop(self):
+        if self.shelly:
+            self.shelly.stop()
+
+    def fails(self, failure):
+        return self.random.random() < self.failures[failure]
+
+    def delay(self):
+        if self.failures["latency_s"]:
+            time.sleep(self.failures["latency_s"])
+
+    def in_shelly_outage(self):
+        outage = self.failures["shelly_outage"]
+        if not outage:
+            return False
+        elapsed = time.time() - self.started
+        return outage[0] <= elapsed < outage[0] + outage[1]
+
+    def write_cpu_tree(self):
+        """
+        CPU hot-plug files of the host below <root>/cpu like /sys/devices/system/cpu, all CPUs online and
+        cpu0 without an online file.
+        """
+        for cpu in range(self.profile["cores"]):
+            os.makedirs(os.path.join(self.root, "cpu", f"cpu{cpu}"), exist_ok=True)
+            if cpu:
+                with open(os.path.join(self.root, "cpu", f"cpu{cpu}", "online"), "w") as f:
+                    f.write("1\n")
+
+    def load(self):
+        """Utilization of the simulated CPUs (0..1), summed over the running benchmark JVMs (see fakejava)."""
+        utilization = 0.0
+        for path in glob.glob(os.path.join(self.root, ".load-*")):
+            try:
+                with open(path) as f:
+                    utilization += json.load(f)["utilization"]
+            except (OSError, ValueError, KeyError):
+                continue
+        return {"utilization": min(utilization, 1.0)}
+
+    def power(self):
+        load = self.load()
+        noise = self.random.gauss(0, 0.02 * self.profile["idle_w"])
+        return self.profile["idle_w"] + (self.profile["max_w"] - self.profile["idle_w"]) * load["utilization"] + noise
+
+    def environment(self):
+        """Environment of the remote commands, the generators read the host configuration from it."""
+        env = dict(os.environ)
+        env.update({
+            "PATH": f"{self.bin_dir}:{env.get('PATH', '')}",
+            "HOME": self.root,
+            "SIM_HOST": json.dumps({
+                "name": self.name,
+                "root": self.root,
+                "profile": self.profile,
+                "failures": self.failures,
+                "time_scale": self.time_scale,
+                "seed": self.seed,
+            }),
+        })
+        return env
+
+    def remote_path(self, path, user):
+        """Sandbox path of a path on the remote machine."""
+        home = f"/home/{user}"
+        if path == home or path.startswith(home + "/"):
+            return self.root + path[len(home):]
+        if os.path.isabs(path):
+            return os.path.join(self.root, path.lstrip("/"))
+        return os.path.join(self.root, path)
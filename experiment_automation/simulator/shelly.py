@@ -0,0 +1,92 @@
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+
+class _ShellyHandler(BaseHTTPRequestHandler):
+    """Subset of the Gen1 (/status, /meter/0) and Gen2+ (/rpc/...) HTTP API of a Shelly plug."""
+
+    def do_GET(self):
+        host = self.server.host
+        if host.in_shelly_outage():
+            # no answer at all, the reader runs into its timeout like with an unreachable device
+            time.sleep(2)
+            self.close_connection = True
+            return
+        if host.fails("shelly_error_rate"):
+            self.send_error(500, "Simulated Shelly error")
+            return
+        body = self.server.status(urlparse(self.path).path)
+        if body is None:
+            self.send_error(404)
+            return
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *_):
+        pass
+
+
+class ShellyServer(ThreadingHTTPServer):
+    """
+    Fake Shelly plug of one simulated host on a free local port, reporting the power of the host and
+    an energy counter integrated from it (Gen1 in watt-minutes with local timestamps, Gen2+ in watt-hours).
+    """
+
+    daemon_threads = True
+
+    def __init__(self, host):
+        super().__init__(("127.0.0.1", 0), _ShellyHandler)
+        self.host = host
+        self.thread = None
+        self._lock = threading.Lock()
+        self._energy_ws = 0.0
+        self._last = time.time()
+
+    @property
+    def address(self):
+        return f"{self.server_address[0]}:{self.server_address[1]}"
+
+    def start(self):
+        self.thread = threading.Thread(target=self.serve_forever, name=f"shelly-{self.host.name}", daemon=True)
+        self.thread.start()
+
+    def stop(self):
+        self.shutdown()
+        self.server_close()
+
+    def _measure(self):
+        with self._lock:
+            now = time.time()
+            power = max(self.host.power(), 0.0)
+            self._energy_ws += power * (now - self._last)
+            self._last = now
+            return now, round(power, 2), self._energy_ws
+
+    def _timestamp(self, now):
+        # scaled simulations sample faster than once per second, whole seconds would collapse the samples
+        return round(now, 3) if self.host.time_scale < 1 else int(now)
+
+    def status(self, path):
+        now, power, energy_ws = self._measure()
+        if self.host.profile["shelly_version"] == "1":
+            meter = {"power": power, "is_valid": True, "total": int(energy_ws / 60),
+                     "timestamp": self._timestamp(now + self.host.profile["utc_offset_s"])}
+            if path == "/meter/0":
+                return meter
+            if path == "/status":
+                return {"meters": [meter], "unixtime": int(now)}
+            return None
+        switch = {"id": 0, "output": True, "apower": power,
+                  "aenergy": {"total": round(energy_ws / 3600, 3), "minute_ts": self._timestamp(now)}}
+        if path == "/rpc/Switch.GetStatus":
+            return switch
+        if path == "/rpc/Shelly.GetStatus":
+            return {"sys": {"unixtime": int(now)}, "switch:0": switch}
+        return None
@@ -0,0 +1,147 @@
+import os
+import re
+import shutil
+import subprocess
+import tempfile
+import time
+
+import paramiko
+
+from simulator import hosts
+
+# pkill/pgrep of one host must not match the processes of the other hosts running on the same machine
+PROCESS_MATCHERS = re.compile(r"\b(pkill|pgrep)\b")
+TURBO_CONTROL = "/sys/devices/system/cpu/intel_pstate"
+CPU_HOTPLUG_DIR = "/sys/devices/system/cpu"
+
+
+class _Channel:
+    def __init__(self, process):
+        self.process = process
+
+    def recv_exit_status(self):
+        return self.process.wait()
+
+
+class _ChannelFile:
+    """Minimal paramiko ChannelFile: iterating yields decoded lines, read() returns the remaining bytes."""
+
+    def __init__(self, stream, channel, spooled=False):
+        self.stream = stream
+        self.channel = channel
+        self.spooled = spooled  # stderr is written to a temporary file, read from its start
+
+    def __iter__(self):
+        if self.spooled:
+            self.stream.seek(0)
+        for line in iter(self.stream.readline, b""):
+            yield line.decode(errors="replace")
+
+    def read(self):
+        if self.spooled:
+            self.stream.seek(0)
+        return self.stream.read()
+
+
+class SimulatedSSHClient:
+    """
+    Stand-in for paramiko.SSHClient that runs the remote commands of the orchestrator locally with bash in
+    the sandbox of a simulated host (see simulator.hosts), with the fake java and scaled sleep on the PATH.
+    """
+
+    def __init__(self):
+        self.host = None
+        self.user = None
+        self._process_groups = []
+
+    def set_missing_host_key_policy(self, policy):
+        pass
+
+    def load_system_host_keys(self, *_):
+        pass
+
+    def connect(self, hostname, username=None, key_filename=None, timeout=None, **_):
+        host = hosts.lookup(hostname)
+        if host is None:
+            raise paramiko.SSHException(f"Unknown simulated host {hostname}")
+        host.delay()
+        if host.fails("connect_failure_rate"):
+            raise paramiko.SSHException(f"Simulated connection failure to {hostname}")
+        self.host = host
+        self.user = username
+
+    def _require_connection(self):
+        if self.host is None:
+            raise paramiko.SSHException("SSH session not active")
+
+    def rewrite(self, command):
+        """Maps the remote paths to the sandbox and restricts pkill/pgrep to the processes of this host."""
+        command = command.replace(f"/home/{self.user}", self.host.root)
+        if TURBO_CONTROL in command:
+            os.makedirs(os.path.join(self.host.root, "intel_pstate"), exist_ok=True)
+            command = command.replace(TURBO_CONTROL, os.path.join(self.host.root, "intel_pstate"))
+        if f"{CPU_HOTPLUG_DIR}/cpu" in command and "/online" in command:
+            # only the hot-plug commands, the telemetry sampler keeps reading the frequencies of this machine
+            command = command.replace(CPU_HOTPLUG_DIR, os.path.join(self.host.root, "cpu"))
+        if self._process_groups:
+            groups = ",".join(str(pgid) for pgid in self._process_groups)
+            return PROCESS_MATCHERS.sub(lambda m: f"{m.group(1)} -g {groups}", command)
+        return PROCESS_MATCHERS.sub("true", command)
+
+    def exec_command(self, command, get_pty=False, **_):
+        self._require_connection()
+        self.host.delay()
+        if self.host.fails("exec_failure_rate"):
+            raise paramiko.SSHException("Simulated channel failure")
+        stderr = subprocess.STDOUT if get_pty else tempfile.TemporaryFile()
+        process = subprocess.Popen(
+            ["bash", "-c", self.rewrite(command)],
+            cwd=self.host.root,
+            env=self.host.environment(),
+            stdin=subprocess.DEVNULL,
+            stdout=subprocess.PIPE,
+            stderr=stderr,
+            start_new_session=True,  # own process group, used to scope pkill/pgrep to this host
+        )
+        self._process_groups.append(process.pid)
+        channel = _Channel(process)
+        stdout_file = _ChannelFile(process.stdout, channel)
+        # with a pty stderr is merged into stdout like on the real machines
+        stderr_file = _ChannelFile(tempfile.TemporaryFile() if get_pty else stderr, channel, spooled=True)
+        return None, stdout_file, stderr_file
+
+    def open_sftp(self):
+        self._require_connection()
+        self.host.delay()
+        return SimulatedSFTPClient(self.host, self.user)
+
+    def close(self):
+        self.host = None
+
+
+class SimulatedSFTPClient:
+    def __init__(self, host, user):
+        self.host = host
+        self.user = user
+
+    def listdir(self, path="."):
+        return os.listdir(self.host.remote_path(path, self.user))
+
+    def get(self, remotepath, localpath):
+        self.host.delay()
+        source = self.host.remote_path(remotepath, self.user)
+        if self.host.fails("sftp_failure_rate"):
+            raise EOFError(f"Simulated transfer failure of {remotepath}")
+        if self.host.failures["transfer_mbps"]:
+            time.sleep(os.path.getsize(source) * 8 / (self.host.failures["transfer_mbps"] * 1_000_000))
+        shutil.copyfile(source, localpath)
+
+    def put(self, localpath, remotepath):
+        self.host.delay()
+        target = self.host.remote_path(remotepath, self.user)
+        # the sandbox starts empty, on the real machines the folder holding the jars exists
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        shutil.copyfile(localpath, target)
+
+    def close(self):
+        pass
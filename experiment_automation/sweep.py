@@ -0,0 +1,244 @@
+import bisect
+import csv
+import logging
+import math
+import os
+import statistics
+
+import timeline
+
+SWEEP_MIN_STEADY = 3  # steady-state iterations of the first successive-halving round
+OBJECTIVES = ["duration", "energy"]
+
+
+# Steps between two Shelly samples above this make the energy of an iteration unknown
+# (as enviroinfo.energy.MAX_SAMPLE_GAP_S)
+MAX_SAMPLE_GAP_S = 5
+
+
+def _read_shelly(shelly_file, reference_start_s):
+    """
+    Timestamps and power of a shellyReaderResults_* file, lines that are not measurements are skipped.
+    Gen1 Shelly devices report local time instead of UTC, so the timestamps are shifted by the whole
+    number of hours between the first sample and reference_start_s (as enviroinfo.loaders.read_shelly).
+    """
+    timestamps_s, power_w = [], []
+    with open(shelly_file, newline="") as f:
+        for row in csv.reader(f):
+            try:
+                timestamp_s, power = float(row[1]), float(row[2])
+            except (IndexError, ValueError):
+                continue
+            timestamps_s.append(timestamp_s)
+            power_w.append(power)
+    if reference_start_s is not None and timestamps_s:
+        offset = round((timestamps_s[0] - reference_start_s) / 3600) * 3600
+        timestamps_s = [t - offset for t in timestamps_s]
+    return timestamps_s, power_w
+
+
+def _read_rapl_counter(machine_folder, postfix):
+    """
+    Timestamps in s and package energy counter in micro joules: the samples of rapl_sampler.py
+    (raplHighRate_*, every package domain summed) if recorded, the samples of powercap-reader otherwise
+    (as enviroinfo.energy.rapl_counter). Incomplete lines are skipped.
+    """
+    high_rate_file = os.path.join(machine_folder, f"raplHighRate{postfix}")
+    if os.path.exists(high_rate_file):
+        timestamps_s, counter_uj = [], []
+        with open(high_rate_file, newline="") as f:
+            reader = csv.reader(f)
+            header = [column.strip() for column in next(reader, [])]
+            packages = [i for i, column in enumerate(header) if column.startswith("package")]
+            for row in reader:
+                try:
+                    values = [int(row[i]) for i in [0] + packages]
+                except (IndexError, ValueError):
+                    continue
+                timestamps_s.append(values[0] / 1e9)
+                counter_uj.append(sum(values[1:]))
+        if packages and len(timestamps_s) > 1:
+            return timestamps_s, counter_uj
+    rapl_file = os.path.join(machine_folder, f"raplResults{postfix}")
+    if not os.path.exists(rapl_file):
+        return None
+    timestamps_s, counter_uj = [], []
+    with open(rapl_file, newline="") as f:
+        for row in csv.DictReader(f, skipinitialspace=True):
+            try:
+                timestamps_s.append(int(row["Timestamp"]) / 1000)
+                counter_uj.append(int(row["Energy (micro joules)"]))
+            except (KeyError, TypeError, ValueError):
+                continue
+    return timestamps_s, counter_uj
+
+
+def _interp(x, xs, ys):
+    """Linear interpolation of ys at x within the sorted xs (as numpy.interp)."""
+    i = min(max(bisect.bisect_right(xs, x) - 1, 0), len(xs) - 2)
+    if xs[i + 1] == xs[i]:
+        return ys[i + 1]
+    return ys[i] + (ys[i + 1] - ys[i]) * (x - xs[i]) / (xs[i + 1] - xs[i])
+
+
+def interval_energy(timestamps_s, power_w, starts_s, ends_s, max_gap_s=MAX_SAMPLE_GAP_S):
+    """
+    Energy in joules of each [start, end] interval from instantaneous power samples, the same
+    computation as enviroinfo.energy.interval_energy without numpy: the power is integrated with the
+    trapezoidal rule and the cumulative energy is interpolated at the interval bounds. Intervals
+    outside the sampled range or overlapping a gap of more than max_gap_s are None.
+    """
+    if len(timestamps_s) < 2:
+        return [None] * len(starts_s)
+    cumulative, gaps = [0.0], [0]
+    for i in range(1, len(timestamps_s)):
+        step = timestamps_s[i] - timestamps_s[i - 1]
+        cumulative.append(cumulative[-1] + step * (power_w[i] + power_w[i - 1]) / 2)
+        gaps.append(gaps[-1] + (step > max_gap_s))
+    energies = []
+    for start_s, end_s in zip(starts_s, ends_s):
+        # an interval covers the sample steps first..last
+        first = min(max(bisect.bisect_right(timestamps_s, start_s) - 1, 0), len(timestamps_s) - 2)
+        last = min(max(bisect.bisect_left(timestamps_s, end_s), 1), len(timestamps_s) - 1)
+        if start_s < timestamps_s[0] or end_s > timestamps_s[-1] or gaps[last] > gaps[first]:
+            energies.append(None)
+        else:
+            energies.append(_interp(end_s, timestamps_s, cumulative) - _interp(start_s, timestamps_s, cumulative))
+    return energies
+
+
+def counter_energy(timestamps_s, counter_uj, starts_s, ends_s):
+    """
+    Energy in joules of each [start, end] interval from a cumulative energy counter in micro joules,
+    interpolated between the samples (as enviroinfo.energy.counter_energy). Intervals outside the sampled
+    range or with a decreasing counter are None.
+    """
+    if len(timestamps_s) < 2:
+        return [None] * len(starts_s)
+    energies = []
+    for start_s, end_s in zip(starts_s, ends_s):
+        increase = _interp(end_s, timestamps_s, counter_uj) - _interp(start_s, timestamps_s, counter_uj)
+        if start_s < timestamps_s[0] or end_s > timestamps_s[-1] or increase < 0:
+            energies.append(None)
+        else:
+            energies.append(increase / 1_000_000)
+    return energies
+
+
+def _mean(values):
+    values = [v for v in values if v is not None]
+    return statistics.fmean(values) if values else None
+
+
+def summarize_run(machine_folder, postfix, warmup):
+    """
+    Steady-state duration and energy per iteration of one machine folder of a run, the energy is
+    averaged over the iterations with samples like in enviroinfo.metrics.run_metrics.
+
+    :param machine_folder: Local results folder of the machine (contains the fetched files)
+    :param postfix: File postfix of the machine (e.g. _x86)
+    :param warmup: Number of warm-up iterations to skip
+    :return: Dict with the summary, or None if the benchmark produced no steady-state iterations
+    """
+    renaissance_file = os.path.join(machine_folder, f"renaissanceOutput{postfix}.csv")
+    if not os.path.exists(renaissance_file):
+        return None
+    with open(renaissance_file, newline="") as f:
+        rows = list(csv.DictReader(f))[warmup:]
+    if not rows:
+        return None
+    starts_s = [(int(r["vm_start_unix_ms"]) + int(r["uptime_ns"]) / 1_000_000) / 1000 for r in rows]
+    durations_s = [int(r["duration_ns"]) / 1e9 for r in rows]
+    ends_s = [start_s + duration_s for start_s, duration_s in zip(starts_s, durations_s)]
+    summary = {
+        "iterations": len(rows),
+        "median_duration_s": statistics.median(durations_s),
+        "energy_per_iteration_j": None,
+        "rapl_energy_per_iteration_j": None,
+    }
+
+    shelly_file = os.path.join(machine_folder, f"shellyReaderResults{postfix}")
+    if os.path.exists(shelly_file):
+        timer_file = os.path.join(machine_folder, f"timer{postfix}.txt")
+        timer_start = timeline.read_timer(timer_file)[0] if os.path.exists(timer_file) else None
+        timestamps_s, power_w = _read_shelly(shelly_file, timer_start)
+        summary["energy_per_iteration_j"] = _mean(interval_energy(timestamps_s, power_w, starts_s, ends_s))
+
+    counter = _read_rapl_counter(machine_folder, postfix)
+    if counter:
+        summary["rapl_energy_per_iteration_j"] = _mean(counter_energy(*counter, starts_s, ends_s))
+    return summary
+
+
+def objective_value(summary, objective):
+    if summary is None:
+        return math.inf
+    if objective == "energy":
+        value = summary["energy_per_iteration_j"]
+        return math.inf if value is None else value
+    return summary["median_duration_s"]
+
+
+def halving_steady_iterations(candidates, steady):
+    """
+    Steady-state iterations of the next successive-halving round: the budget doubles every
+    round and the final round (a single candidate left) uses the full steady-state.
+    """
+    remaining_rounds = math.ceil(math.log2(max(candidates, 1)))
+    if remaining_rounds == 0:
+        return steady
+    return max(SWEEP_MIN_STEADY, steady // 2 ** remaining_rounds)
+
+
+def survivors(results, objective):
+    """Keeps the better half (rounded up) of the configurations of one round."""
+    ranked = sorted(results, key=lambda r: objective_value(r["summary"], objective))
+    return [r["configuration"] for r in ranked[: math.ceil(len(ranked) / 2)]]
+
+
+def rank(results, objective):
+    """
+    Ranks the sweep results per benchmark and machine. Configurations measured in several
+    successive-halving rounds are ranked by their last (largest) round.
+    """
+    latest = {}
+    for r in results:
+        latest[(r["benchmark"], r["machine"], r["configuration"])] = r
+    ranking = []
+    groups = sorted({(b, m) for b, m, _ in latest})
+    for benchmark, machine in groups:
+        group = [r for (b, m, _), r in latest.items() if b == benchmark and m == machine]
+        group.sort(key=lambda r: objective_value(r["summary"], objective))
+        for position, r in enumerate(group, start=1):
+            summary = r["summary"] or {}
+            ranking.append({
+                "benchmark": benchmark,
+                "machine": machine,
+                "rank": position,
+                "configuration": r["configuration"],
+                "jvm_args": r["jvm_args"],
+                "iterations": summary.get("iterations"),
+                "median_duration_s": summary.get("median_duration_s"),
+                "energy_per_iteration_j": summary.get("energy_per_iteration_j"),
+                "rapl_energy_per_iteration_j": summary.get("rapl_energy_per_iteration_j"),
+                "results_folder": r["results_folder"],
+            })
+    return ranking
+
+
+def write_ranking(ranking, path):
+    if not ranking:
+        logging.warning("JVM sweep produced no results")
+        return
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(ranking[0].keys()))
+        writer.writeheader()
+        writer.writerows(ranking)
+    for row in ranking:
+        energy = row["energy_per_iteration_j"]
+        logging.info(
+            f"[{row['machine']}] {row['benchmark']} #{row['rank']} {row['configuration']}: "
+            f"median {row['median_duration_s'] or float('nan'):.3f} s, "
+            f"{'n/a' if energy is None else f'{energy:.2f} J'} per iteration"
+        )
+    logging.info(f"JVM sweep ranking written to {path}")
@@ -0,0 +1,164 @@
+import csv
+import json
+import logging
+import os
+import re
+import statistics
+import time
+
+# Renaissance progress lines on stdout, e.g. "====== scrabble (functional) [default], iteration 0 started ======"
+ITERATION_STARTED = re.compile(r"iteration \d+ started")
+ITERATION_COMPLETED = re.compile(r"iteration \d+ completed")
+# Printed by the remote command around the idle windows before and after the benchmark
+IDLE_WINDOW_STARTED = "idle window started"
+IDLE_WINDOW_COMPLETED = "idle window completed"
+
+# Phases of a benchmark worker in the order they occur
+PHASES = [
+    "shelly_start",
+    "ssh_connect",
+    "remote_startup",  # monitors and Renaissance JVM until the first iteration starts
+    "idle_before",  # optional idle window with the monitors running
+    "jvm_startup",  # Renaissance JVM until the first iteration starts, after an idle window
+    "benchmark",  # first iteration started until the last iteration completed
+    "remote_shutdown",  # Renaissance teardown until the remote command exits
+    "idle_after",  # optional idle window after the Renaissance teardown
+    "kill",  # Shelly reader, remote pkill and turbo re-enable
+    "sftp_transfer",
+    "ssh_close",
+]
+
+
+class PhaseTimeline:
+    """
+    Consecutive phases of one worker with wall clock (for joining with the sensor data) and
+    monotonic timestamps (for durations unaffected by clock adjustments).
+    """
+
+    def __init__(self, host):
+        self.host = host
+        self.phases = []
+        self._current = None
+        self._last_completed = None  # (wall, monotonic) of the last completed iteration
+
+    def begin(self, phase):
+        """Ends the current phase and starts the next one."""
+        self.end()
+        self._current = {"phase": phase, "wall_start": time.time(), "monotonic_start": time.monotonic()}
+
+    def end(self):
+        if self._current is None:
+            return
+        phase, self._current = self._current, None
+        phase["wall_end"] = time.time()
+        phase["monotonic_end"] = time.monotonic()
+        phase["duration_s"] = phase["monotonic_end"] - phase["monotonic_start"]
+        self.phases.append(phase)
+        logging.info(f"[{self.host}] Phase {phase['phase']} took {phase['duration_s']:.2f} s")
+
+    def observe(self, line):
+        """
+        Switches between startup, idle windows, benchmark and shutdown based on a line of the remote output.
+        """
+        current = self._current["phase"] if self._current else None
+        if current == "remote_startup" and IDLE_WINDOW_STARTED in line:
+            self.begin("idle_before")
+        elif current == "idle_before" and IDLE_WINDOW_COMPLETED in line:
+            self.begin("jvm_startup")
+        elif current in ("remote_startup", "jvm_startup") and ITERATION_STARTED.search(line):
+            self.begin("benchmark")
+        elif current == "benchmark" and ITERATION_COMPLETED.search(line):
+            # the shutdown starts with the last completed iteration, which is only known afterwards
+            self._last_completed = (time.time(), time.monotonic())
+        elif current in ("jvm_startup", "benchmark") and IDLE_WINDOW_STARTED in line:
+            self.end_benchmark()
+            self.begin("idle_after")
+        elif current == "idle_after" and IDLE_WINDOW_COMPLETED in line:
+            self.end()
+
+    def end_benchmark(self):
+        """Ends the benchmark phase at the last completed iteration and starts the remote shutdown."""
+        if not self._current or self._current["phase"] != "benchmark":
+            return
+        if self._last_completed is None:
+            self.begin("remote_shutdown")
+            return
+        wall, monotonic = self._last_completed
+        phase = self._current
+        phase.update(wall_end=wall, monotonic_end=monotonic, duration_s=monotonic - phase["monotonic_start"])
+        self.phases.append(phase)
+        logging.info(f"[{self.host}] Phase benchmark took {phase['duration_s']:.2f} s")
+        self._current = {"phase": "remote_shutdown", "wall_start": wall, "monotonic_start": monotonic}
+
+    def write(self, path):
+        self.end()
+        with open(path, "w") as f:
+            json.dump({"host": self.host, "phases": self.phases}, f, indent=2)
+
+
+def read_timeline(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def read_timer(timer_file):
+    """Returns (start, end) from a timer_*.txt file, start is None for 'No start time'."""
+    with open(timer_file) as f:
+        lines = [line.strip() for line in f.read().splitlines() if line.strip()]
+    if len(lines) != 2:
+        return None, None
+    try:
+        start = float(lines[0])
+    except ValueError:
+        start = None
+    return start, float(lines[1])
+
+
+def summarize_campaign(run_folders, path):
+    """
+    Aggregates the timelines of all runs of a campaign per host and phase and writes them as CSV.
+
+    :param run_folders: Run folders (gpl-<bench>_<config>/<timestamp>) containing one folder per host
+    :return: Rows with count, total, mean and maximum duration and the share of the campaign wall-clock time
+    """
+    durations = {}
+    for folder in run_folders:
+        if not os.path.isdir(folder):
+            continue
+        for host in sorted(os.listdir(folder)):
+            host_folder = os.path.join(folder, host)
+            if not os.path.isdir(host_folder):
+                continue
+            for name in os.listdir(host_folder):
+                if not name.startswith("timeline") or not name.endswith(".json"):
+                    continue
+                for phase in read_timeline(os.path.join(host_folder, name))["phases"]:
+                    durations.setdefault((host, phase["phase"]), []).append(phase["duration_s"])
+
+    totals = {}
+    for (host, _), values in durations.items():
+        totals[host] = totals.get(host, 0.0) + sum(values)
+    order = {phase: i for i, phase in enumerate(PHASES)}
+    rows = []
+    for (host, phase), values in sorted(durations.items(), key=lambda item: (item[0][0], order.get(item[0][1], 99))):
+        rows.append({
+            "host": host,
+            "phase": phase,
+            "count": len(values),
+            "total_s": round(sum(values), 3),
+            "mean_s": round(statistics.mean(values), 3),
+            "max_s": round(max(values), 3),
+            "share_%": round(sum(values) / totals[host] * 100, 2) if totals[host] else 0.0,
+        })
+    if not rows:
+        logging.warning("No phase timelines found for the campaign summary")
+        return rows
+    with open(path, "w", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+        writer.writeheader()
+        writer.writerows(rows)
+    for row in rows:
+        logging.info(f"[{row['host']}] {row['phase']}: {row['total_s']:.1f} s total, "
+                     f"{row['mean_s']:.1f} s per run ({row['share_%']:.1f} %)")
+    logging.info(f"Campaign timeline summary written to {path}")
+    return rows
@@ -0,0 +1,24 @@
+import pandas as pd
+
+from enviroinfo.jvmevents import EVENT_KINDS, attribute_slow_iterations
+
+
+def _iterations(durations, gc_pause_s):
+    frame = pd.DataFrame({
+        'benchmark': 'reactors', 'configuration': 'SIMULATED', 'timestamp': '01-01-202500-00-00', 'arch': 'X86',
+        'iteration': range(len(durations)), 'steady_state': True, 'duration_s': durations,
+    })
+    for kind in EVENT_KINDS:
+        frame[f'{kind}_s'] = 0.0
+    frame['gc_pause_s'] = gc_pause_s
+    return frame
+
+
+def test_slow_iteration_without_events_is_unexplained():
+    iterations = attribute_slow_iterations(_iterations([1.0, 1.0, 1.0, 2.0], [0.0] * 4))
+    assert list(iterations['cause']) == ['', '', '', 'unexplained']
+
+
+def test_slow_iteration_covered_by_gc():
+    iterations = attribute_slow_iterations(_iterations([1.0, 1.0, 1.0, 2.0, 2.0], [0.0, 0.0, 0.0, 0.9, 0.0]))
+    assert list(iterations['cause']) == ['', '', '', 'gc', 'unexplained']
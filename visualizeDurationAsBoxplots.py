@@ -82,9 +82,6 @@ for file_info in csv_files:
 # Combine all data into one DataFrame
 df = pd.concat(data_list, axis=0, ignore_index=True)
 
-# Group data by timestamp, processor, and run
-agg_df = df.groupby(['duration_s', 'processor', 'run']).all().reset_index()
-
 # Define benchmark run order
 benchmark_order = ['akka-uct', 'fj-kmeans', 'reactors', 'future-genetic', 'mnemonics', 'par-mnemonics', 'rx-scrabble', 'scrabble']
 